@@ -6,7 +6,9 @@ __author__: str = "Старков Е.П."
 from pydantic import PostgresDsn
 from pydantic_settings import BaseSettings
 
-from dh_platform.consts.logger import LogLevel
+from dh_platform.consts.database import ReplicaBalanceStrategy
+from dh_platform.consts.logger import SLOW_REQUEST_THRESHOLD, LogFormat, LogLevel, LogQueueOverflow
+from dh_platform.consts.middleware import COMPRESSIBLE_CONTENT_TYPES
 from dh_platform.types import LogLevelType
 
 
@@ -22,26 +24,179 @@ class BaseAppSettings(BaseSettings):
     :type DB_POOL_SIZE: int
     :cvar DB_MAX_OVERFLOW: максимальное количество временных соединений поверх пула
     :type DB_MAX_OVERFLOW: int
+    :cvar DATABASE_REPLICA_URLS: адреса подключения к репликам БД для запросов на чтение
+    :type DATABASE_REPLICA_URLS: list[PostgresDsn]
+    :cvar DB_REPLICA_BALANCE_STRATEGY: стратегия распределения запросов между репликами
+    :type DB_REPLICA_BALANCE_STRATEGY: ReplicaBalanceStrategy
+    :cvar DB_REPLICA_RETRY_INTERVAL: через сколько секунд повторять попытку подключения к недоступной реплике
+    :type DB_REPLICA_RETRY_INTERVAL: int
+    :cvar DB_POOL_WARMUP: количество соединений, открываемых в пуле при запуске приложения
+    :type DB_POOL_WARMUP: int
+    :cvar DB_POOL_METRICS_ENABLED: сбор метрик пула соединений включен
+    :type DB_POOL_METRICS_ENABLED: bool
+    :cvar DB_SLOW_QUERY_THRESHOLD: время выполнения SQL запроса в секундах, после которого он пишется в лог.
+        0 - контроль отключен
+    :type DB_SLOW_QUERY_THRESHOLD: float
+    :cvar DB_SLOW_QUERY_EXPLAIN_RATE: доля медленных SELECT запросов, для которых снимается план EXPLAIN ANALYZE
+    :type DB_SLOW_QUERY_EXPLAIN_RATE: float
+    :cvar DB_QUERY_CACHE_ENABLED: кеширование результатов запросов с опцией query_cache включено
+    :type DB_QUERY_CACHE_ENABLED: bool
+    :cvar DB_QUERY_CACHE_SIZE: максимальное количество результатов в кеше
+    :type DB_QUERY_CACHE_SIZE: int
+    :cvar DB_QUERY_CACHE_TTL: время жизни результата в кеше по умолчанию в секундах
+    :type DB_QUERY_CACHE_TTL: int
 
     :cvar APP_NAME: название приложения
     :type APP_NAME: str
     :cvar DEBUG: режим отладки
     :type DEBUG: bool
+
+    :cvar COMPRESSION_ENABLED: сжатие ответов в setup_base_middleware включено
+    :type COMPRESSION_ENABLED: bool
+    :cvar COMPRESSION_MIN_SIZE: минимальный размер тела ответа в байтах для сжатия
+    :type COMPRESSION_MIN_SIZE: int
+    :cvar COMPRESSION_LEVEL: уровень сжатия gzip и deflate, от 1 до 9
+    :type COMPRESSION_LEVEL: int
+    :cvar COMPRESSION_ZSTD_LEVEL: уровень сжатия zstd, от 1 до 22
+    :type COMPRESSION_ZSTD_LEVEL: int
+    :cvar COMPRESSION_CONTENT_TYPES: сжимаемые типы содержимого. Значение, оканчивающееся на /, задает префикс
+    :type COMPRESSION_CONTENT_TYPES: list[str]
+    :cvar ETAG_ENABLED: вычисление ETag и ответы 304 в setup_base_middleware включены
+    :type ETAG_ENABLED: bool
+    :cvar RATE_LIMIT_ENABLED: ограничение частоты запросов в setup_base_middleware включено
+    :type RATE_LIMIT_ENABLED: bool
+    :cvar RATE_LIMIT_DEFAULT: лимит запросов с одного IP адреса по умолчанию, например "100/second"
+    :type RATE_LIMIT_DEFAULT: str | None
+    :cvar RATE_LIMIT_ROUTES: лимиты по шаблонам путей, например {"/auth/login": "5/minute"}
+    :type RATE_LIMIT_ROUTES: dict[str, str]
+    :cvar RATE_LIMIT_SHARED_PATH: файл разделяемой памяти для общих лимитов процессов на хосте.
+        None - лимиты считаются в памяти каждого процесса
+    :type RATE_LIMIT_SHARED_PATH: str | None
+    :cvar RATE_LIMIT_MAX_KEYS: максимальное количество ключей лимитов в памяти процесса
+    :type RATE_LIMIT_MAX_KEYS: int
+    :cvar SLOW_REQUEST_THRESHOLD: время обработки запроса в секундах, после которого запрос пишется в лог
+        как медленный
+    :type SLOW_REQUEST_THRESHOLD: float
+    :cvar ACCESS_LOG_SAMPLE_RATE: доля успешных запросов, попадающих в лог, от 0 до 1. Ответы 5xx, ошибки
+        и медленные запросы логируются всегда
+    :type ACCESS_LOG_SAMPLE_RATE: float
+    :cvar ACCESS_LOG_ROUTE_SAMPLE_RATES: доля успешных запросов, попадающих в лог, по шаблонам маршрутов
+    :type ACCESS_LOG_ROUTE_SAMPLE_RATES: dict[str, float]
+    :cvar HTTP_METRICS_ENABLED: сбор метрик HTTP запросов по маршрутам включен
+    :type HTTP_METRICS_ENABLED: bool
+    :cvar SERVER_TIMING_HEADER: этапы обработки запроса выводятся в заголовке ответа Server-Timing. Заголовок раскрывает
+        время внутренних этапов, поэтому по умолчанию выключен
+    :type SERVER_TIMING_HEADER: bool
+    :cvar CONCURRENCY_LIMIT_ENABLED: ограничение количества одновременно обрабатываемых запросов
+        в setup_base_middleware включено
+    :type CONCURRENCY_LIMIT_ENABLED: bool
+    :cvar CONCURRENCY_LIMIT: начальный лимит одновременно обрабатываемых запросов.
+        None - DB_POOL_SIZE + DB_MAX_OVERFLOW
+    :type CONCURRENCY_LIMIT: int | None
+    :cvar CONCURRENCY_MIN_LIMIT: минимальный лимит при адаптивном подборе
+    :type CONCURRENCY_MIN_LIMIT: int
+    :cvar CONCURRENCY_ADAPTIVE: лимит подбирается по времени обработки запросов (AIMD)
+    :type CONCURRENCY_ADAPTIVE: bool
+    :cvar CONCURRENCY_LATENCY_TARGET: время обработки запроса в секундах, превышение которого уменьшает лимит
+    :type CONCURRENCY_LATENCY_TARGET: float
+    :cvar CONCURRENCY_QUEUE_SIZE: максимальное количество запросов, ожидающих обработки
+    :type CONCURRENCY_QUEUE_SIZE: int
+    :cvar CONCURRENCY_QUEUE_TIMEOUT: максимальное время ожидания обработки в секундах
+    :type CONCURRENCY_QUEUE_TIMEOUT: float
+    :cvar CONCURRENCY_EXCLUDE_PATHS: пути, запросы к которым не ограничиваются (проверки состояния, метрики)
+    :type CONCURRENCY_EXCLUDE_PATHS: list[str]
+    :cvar COALESCING_ENABLED: объединение одинаковых одновременных GET запросов в setup_base_middleware включено
+    :type COALESCING_ENABLED: bool
+    :cvar COALESCING_TIMEOUT: максимальное время ожидания ответа объединенного запроса в секундах
+    :type COALESCING_TIMEOUT: float
+    :cvar PASSWORD_HASH_WORKERS: количество потоков хеширования и проверки паролей
+    :type PASSWORD_HASH_WORKERS: int
+    :cvar PASSWORD_HASH_MAX_PENDING: максимальное количество операций с паролями в обработке и очереди,
+        сверх него запросы получают 503
+    :type PASSWORD_HASH_MAX_PENDING: int
+    :cvar LOG_FILE_COMPRESSION_ENABLED: запись файла логов через буфер со сжатием ротированных файлов
+        и ограничением хранения по размеру и возрасту вместо количества файлов
+    :type LOG_FILE_COMPRESSION_ENABLED: bool
+    :cvar LOG_FILE_RETENTION_MB: суммарный размер сжатых ротированных файлов логов в мегабайтах
+    :type LOG_FILE_RETENTION_MB: int | None
+    :cvar LOG_FILE_RETENTION_DAYS: срок хранения ротированных файлов логов в днях
+    :type LOG_FILE_RETENTION_DAYS: int | None
+    :cvar LOG_FILE_FLUSH_INTERVAL: максимальное время хранения записей лога в буфере в секундах
+    :type LOG_FILE_FLUSH_INTERVAL: float
+    :cvar LOG_FORMAT: формат записей лога
+    :type LOG_FORMAT: LogFormat
+    :cvar LOG_EXCEPTION_DEDUP_INTERVAL: интервал в секундах, в течение которого похожие исключения после первого
+        не пишутся в лог, их количество пишется одной записью за интервал. 0 - подавление отключено
+    :type LOG_EXCEPTION_DEDUP_INTERVAL: float
+    :cvar LOG_QUEUE_ENABLED: запись логов в фоновом потоке через очередь, без ввода-вывода в потоке event loop
+    :type LOG_QUEUE_ENABLED: bool
+    :cvar LOG_QUEUE_SIZE: максимальное количество записей лога в очереди
+    :type LOG_QUEUE_SIZE: int
+    :cvar LOG_QUEUE_OVERFLOW: поведение при переполнении очереди записей лога
+    :type LOG_QUEUE_OVERFLOW: LogQueueOverflow
     """
 
     DATABASE_URL: PostgresDsn
     DB_ECHO: bool = False
     DB_POOL_SIZE: int = 20
     DB_MAX_OVERFLOW: int = 10
+    DATABASE_REPLICA_URLS: list[PostgresDsn] = []
+    DB_REPLICA_BALANCE_STRATEGY: ReplicaBalanceStrategy = ReplicaBalanceStrategy.ROUND_ROBIN
+    DB_REPLICA_RETRY_INTERVAL: int = 30
+    DB_POOL_WARMUP: int = 0
+    DB_POOL_METRICS_ENABLED: bool = True
+    DB_SLOW_QUERY_THRESHOLD: float = 0.5
+    DB_SLOW_QUERY_EXPLAIN_RATE: float = 0.0
+    DB_QUERY_CACHE_ENABLED: bool = False
+    DB_QUERY_CACHE_SIZE: int = 1024
+    DB_QUERY_CACHE_TTL: int = 60
 
     APP_NAME: str
     DEBUG: bool = False
 
+    COMPRESSION_ENABLED: bool = False
+    COMPRESSION_MIN_SIZE: int = 500
+    COMPRESSION_LEVEL: int = 6
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_CONTENT_TYPES: list[str] = list(COMPRESSIBLE_CONTENT_TYPES)
+    ETAG_ENABLED: bool = False
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_DEFAULT: str | None = "100/second"
+    RATE_LIMIT_ROUTES: dict[str, str] = {}
+    RATE_LIMIT_SHARED_PATH: str | None = None
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    SLOW_REQUEST_THRESHOLD: float = SLOW_REQUEST_THRESHOLD
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_ROUTE_SAMPLE_RATES: dict[str, float] = {}
+    HTTP_METRICS_ENABLED: bool = True
+    SERVER_TIMING_HEADER: bool = False
+    CONCURRENCY_LIMIT_ENABLED: bool = False
+    CONCURRENCY_LIMIT: int | None = None
+    CONCURRENCY_MIN_LIMIT: int = 1
+    CONCURRENCY_ADAPTIVE: bool = True
+    CONCURRENCY_LATENCY_TARGET: float = 1.0
+    CONCURRENCY_QUEUE_SIZE: int = 100
+    CONCURRENCY_QUEUE_TIMEOUT: float = 1.0
+    CONCURRENCY_EXCLUDE_PATHS: list[str] = ["/metrics"]
+    COALESCING_ENABLED: bool = False
+    COALESCING_TIMEOUT: float = 5.0
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 100
+
     LOG_NAME: str = "dh_app"
     LOG_LEVEL: LogLevelType = LogLevel.INFO
     LOG_FILE_SIZE_MB: int = 10
     LOG_DIRECTORY: str = "logs"
     SAVE_LOG_FILES: bool = True
+    LOG_FILE_COMPRESSION_ENABLED: bool = False
+    LOG_FILE_RETENTION_MB: int | None = 1024
+    LOG_FILE_RETENTION_DAYS: int | None = 30
+    LOG_FILE_FLUSH_INTERVAL: float = 1.0
+    LOG_FORMAT: LogFormat = LogFormat.TEXT
+    LOG_EXCEPTION_DEDUP_INTERVAL: float = 60.0
+    LOG_QUEUE_ENABLED: bool = False
+    LOG_QUEUE_SIZE: int = 10_000
+    LOG_QUEUE_OVERFLOW: LogQueueOverflow = LogQueueOverflow.DROP
 
     class Config:
         """Конфигурация получения настроек"""
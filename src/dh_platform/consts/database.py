@@ -0,0 +1,30 @@
+"""Константы для работы с БД"""
+
+__author__: str = "Старков Е.П."
+
+from enum import StrEnum
+
+# Максимальное количество параметров в одном запросе PostgreSQL
+MAX_SQL_PARAMS: int = 32767
+# Количество строк в одном запросе массовой вставки
+BULK_BATCH_SIZE: int = 1000
+# Количество строк, начиная с которого массовая вставка выполняется через COPY
+BULK_COPY_THRESHOLD: int = 10000
+# Количество строк, вычитываемых из серверного курсора за раз при потоковой выдаче
+STREAM_CHUNK_SIZE: int = 500
+# Опция выполнения запроса для кеширования результата: True - TTL по умолчанию, число - TTL в секундах
+QUERY_CACHE_OPTION: str = "query_cache"
+# Опция выполнения запроса, исключающая его из контроля медленных запросов
+SKIP_QUERY_LOG_OPTION: str = "skip_query_log"
+
+
+class ReplicaBalanceStrategy(StrEnum):
+    """
+    Стратегии распределения запросов на чтение между репликами
+
+    :cvar ROUND_ROBIN: реплики выбираются по очереди
+    :cvar LEAST_CONNECTIONS: выбирается реплика с наименьшим количеством занятых соединений
+    """
+
+    ROUND_ROBIN = "round_robin"
+    LEAST_CONNECTIONS = "least_connections"
@@ -16,6 +16,8 @@ class ErrorCode(StrEnum):
     :cvar FORBIDDEN: ошибка отсутствия доступа
     :cvar DATABASE_ERROR: ошибка при работе с базой данных
     :cvar SERVICE_UNAVAILABLE: ошибка недоступности сервиса
+    :cvar NOT_MODIFIED: ресурс не изменился с версии, известной клиенту
+    :cvar TOO_MANY_REQUESTS: превышен лимит запросов
     """
 
     CUSTOM_ERROR = "custom_error"
@@ -25,3 +27,5 @@ class ErrorCode(StrEnum):
     FORBIDDEN = "forbidden"
     DATABASE_ERROR = "database_error"
     SERVICE_UNAVAILABLE = "service_unavailable"
+    NOT_MODIFIED = "not_modified"
+    TOO_MANY_REQUESTS = "too_many_requests"
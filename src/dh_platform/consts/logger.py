@@ -6,6 +6,8 @@ from enum import StrEnum
 
 # Делитель для перевода информации
 FILE_SIZE_DELIMITER: int = 1024
+# Время обработки запроса в секундах, после которого запрос считается медленным
+SLOW_REQUEST_THRESHOLD: float = 1.0
 
 
 class LogLevel(StrEnum):
@@ -22,3 +24,27 @@ class LogLevel(StrEnum):
     INFO = "INFO"
     WARN = "WARN"
     ERROR = "ERROR"
+
+
+class LogQueueOverflow(StrEnum):
+    """
+    Поведение при переполнении очереди записей лога
+
+    :cvar DROP: запись отбрасывается, количество отброшенных записей пишется в лог позже
+    :cvar BLOCK: вызов логирования ждет освобождения места в очереди
+    """
+
+    DROP = "drop"
+    BLOCK = "block"
+
+
+class LogFormat(StrEnum):
+    """
+    Формат записей лога
+
+    :cvar TEXT: текстовая строка
+    :cvar JSON: JSON объект на строку со всеми полями extra
+    """
+
+    TEXT = "text"
+    JSON = "json"
@@ -0,0 +1,30 @@
+"""Константы middleware"""
+
+__author__: str = "Старков Е.П."
+
+from enum import StrEnum
+
+# Типы содержимого, ответы с которыми сжимаются по умолчанию. Значение, оканчивающееся на /, задает префикс
+COMPRESSIBLE_CONTENT_TYPES: tuple[str, ...] = (
+    "application/json",
+    "application/x-ndjson",
+    "application/problem+json",
+    "application/xml",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+
+
+class ContentEncoding(StrEnum):
+    """
+    Алгоритмы сжатия тела ответа в порядке предпочтения
+
+    :cvar ZSTD: Zstandard. Доступен при установленном пакете zstandard
+    :cvar GZIP: gzip
+    :cvar DEFLATE: deflate в формате zlib
+    """
+
+    ZSTD = "zstd"
+    GZIP = "gzip"
+    DEFLATE = "deflate"
@@ -3,9 +3,20 @@
 
 __author__: str = "Старков Е.П."
 
-from sqlalchemy import Integer
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any
+
+from sqlalchemy import Integer, Table, func, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+from dh_platform.consts.database import BULK_BATCH_SIZE, BULK_COPY_THRESHOLD, MAX_SQL_PARAMS
+from dh_platform.excerptions import ValidationException
+
+# Колонки, которые не перезаписываются при upsert
+_UPSERT_IMMUTABLE_COLUMNS: frozenset[str] = frozenset({"ID", "UUID", "created_at", "created_by"})
+
 
 class BaseModel(DeclarativeBase):
     """
@@ -41,3 +52,235 @@ class BaseModel(DeclarativeBase):
     def to_dict(self) -> dict:
         """Конвертация объекта в словарь"""
         return {c.name: getattr(self, c.name) for c in self.__table__.columns}
+
+    @classmethod
+    async def bulk_insert(
+        cls,
+        session: AsyncSession,
+        rows: Sequence[dict[str, Any]],
+        batch_size: int = BULK_BATCH_SIZE,
+        use_copy: bool | None = None,
+    ) -> int:
+        """
+        Массовая вставка записей многострочными INSERT ... VALUES без создания ORM объектов. Колонки, отсутствующие
+        в строке, заполняются значениями по умолчанию (server_default, default)
+
+        :param session: сессия БД
+        :type session: AsyncSession
+        :param rows: данные записей
+        :type rows: Sequence[dict[str, Any]]
+        :param batch_size: количество строк в одном запросе
+        :type batch_size: int
+        :param use_copy: вставка через COPY. По умолчанию включается от BULK_COPY_THRESHOLD строк для asyncpg
+        :type use_copy: bool | None
+        :return: количество вставленных записей
+        :rtype: int
+
+        .. code-block:: python
+        >>> async def import_users(db: AsyncSession, data: list[dict]) -> None:
+        >>>     await User.bulk_insert(db, [{"name": item["name"], "surname": item["surname"]} for item in data])
+        >>>     await db.commit()
+        """
+        if not rows:
+            return 0
+
+        if use_copy is None:
+            use_copy = len(rows) >= BULK_COPY_THRESHOLD and session.get_bind().dialect.driver == "asyncpg"
+
+        if use_copy:
+            return await cls.bulk_copy(session, rows)
+
+        table: Table = cls.__table__
+
+        for batch in cls._batches(rows, batch_size):
+            await session.execute(insert(table).values(batch))
+
+        return len(rows)
+
+    @classmethod
+    async def bulk_upsert(
+        cls,
+        session: AsyncSession,
+        rows: Sequence[dict[str, Any]],
+        conflict_column: str = "ID",
+        update_columns: Iterable[str] | None = None,
+        batch_size: int = BULK_BATCH_SIZE,
+    ) -> int:
+        """
+        Массовая вставка или обновление записей через INSERT ... ON CONFLICT. ID, UUID и поля создания при
+        конфликте не перезаписываются, updated_at обновляется автоматически
+
+        :param session: сессия БД
+        :type session: AsyncSession
+        :param rows: данные записей
+        :type rows: Sequence[dict[str, Any]]
+        :param conflict_column: уникальная колонка для определения конфликта: ID или UUID
+        :type conflict_column: str
+        :param update_columns: колонки для обновления при конфликте. По умолчанию - все переданные
+        :type update_columns: Iterable[str] | None
+        :param batch_size: количество строк в одном запросе
+        :type batch_size: int
+        :return: количество обработанных записей
+        :rtype: int
+
+        .. code-block:: python
+        >>> async def sync_users(db: AsyncSession, data: list[dict]) -> None:
+        >>>     await User.bulk_upsert(db, data, conflict_column="UUID")
+        >>>     await db.commit()
+        """
+        if not rows:
+            return 0
+
+        table: Table = cls.__table__
+        allowed: set[str] | None = set(update_columns) if update_columns is not None else None
+
+        for batch in cls._batches(rows, batch_size):
+            statement = pg_insert(table).values(batch)
+            values: dict[str, Any] = {
+                key: statement.excluded[key]
+                for key in batch[0]
+                if key != conflict_column
+                and key not in _UPSERT_IMMUTABLE_COLUMNS
+                and (allowed is None or key in allowed)
+            }
+
+            if values and "updated_at" in table.c and "updated_at" not in values:
+                values["updated_at"] = func.now()
+
+            if values:
+                statement = statement.on_conflict_do_update(index_elements=[conflict_column], set_=values)
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=[conflict_column])
+
+            await session.execute(statement)
+
+        return len(rows)
+
+    @classmethod
+    async def bulk_update(cls, session: AsyncSession, rows: Sequence[dict[str, Any]]) -> int:
+        """
+        Массовое обновление записей по ID. Каждая строка должна содержать ID и изменяемые колонки
+
+        :param session: сессия БД
+        :type session: AsyncSession
+        :param rows: данные записей
+        :type rows: Sequence[dict[str, Any]]
+        :return: количество обработанных записей
+        :rtype: int
+        :raises ValidationException: в строке отсутствует ID
+
+        .. code-block:: python
+        >>> async def reorder(db: AsyncSession, ids: list[int]) -> None:
+        >>>     await Item.bulk_update(db, [{"ID": item_id, "order": index} for index, item_id in enumerate(ids)])
+        >>>     await db.commit()
+        """
+        if not rows:
+            return 0
+
+        if any("ID" not in row for row in rows):
+            raise ValidationException({"Error": "Для массового обновления в каждой записи требуется ID"})
+
+        await session.execute(update(cls), list(rows))
+
+        return len(rows)
+
+    @classmethod
+    async def bulk_copy(cls, session: AsyncSession, rows: Sequence[dict[str, Any]]) -> int:
+        """
+        Массовая вставка через PostgreSQL COPY (только драйвер asyncpg). Выполняется в транзакции сессии,
+        кеш запросов по таблице сбрасывается при ее фиксации. Значения default на стороне Python (например UUID)
+        вычисляются перед отправкой, server_default заполняется БД
+
+        :param session: сессия БД
+        :type session: AsyncSession
+        :param rows: данные записей
+        :type rows: Sequence[dict[str, Any]]
+        :return: количество вставленных записей
+        :rtype: int
+        """
+        if not rows:
+            return 0
+
+        table: Table = cls.__table__
+        session_connection = await session.connection()
+        # Адаптер asyncpg открывает транзакцию только при первом запросе через курсор, а COPY выполняется
+        # в обход курсора. Без этого запроса каждый COPY фиксировался бы сразу и не отменялся rollback сессии
+        await session_connection.exec_driver_sql("SELECT 1")
+        connection = await session_connection.get_raw_connection()
+
+        for columns, group in cls._group_by_columns(cls._with_python_defaults(rows)):
+            await connection.driver_connection.copy_records_to_table(
+                table.name,
+                schema_name=table.schema,
+                columns=list(columns),
+                records=[tuple(row[column] for column in columns) for row in group],
+            )
+
+        # COPY выполняется в обход сессии: таблица отмечается измененной для кеша запросов (CachedSession),
+        # чтобы его записи по таблице сбрасывались при фиксации транзакции
+        changed_tables: set[str] | None = getattr(session.sync_session, "changed_tables", None)
+        if changed_tables is not None:
+            changed_tables.add(table.fullname)
+
+        return len(rows)
+
+    @classmethod
+    def _batches(cls, rows: Sequence[dict[str, Any]], batch_size: int) -> Iterator[list[dict[str, Any]]]:
+        """
+        Разбиение строк на пачки с одинаковым набором колонок. Размер пачки ограничен лимитом параметров запроса
+
+        :param rows: данные записей
+        :type rows: Sequence[dict[str, Any]]
+        :param batch_size: желаемое количество строк в пачке
+        :type batch_size: int
+        :return: пачки строк
+        :rtype: Iterator[list[dict[str, Any]]]
+        """
+        for columns, group in cls._group_by_columns(rows):
+            size: int = max(1, min(batch_size, MAX_SQL_PARAMS // max(1, len(columns))))
+
+            for start in range(0, len(group), size):
+                yield group[start : start + size]
+
+    @staticmethod
+    def _group_by_columns(rows: Iterable[dict[str, Any]]) -> Iterator[tuple[tuple[str, ...], list[dict[str, Any]]]]:
+        """
+        Группировка строк по набору колонок. Многострочный VALUES требует одинаковых колонок во всех строках,
+        а отсутствующие колонки должны получать значения по умолчанию, а не NULL
+
+        :param rows: данные записей
+        :type rows: Iterable[dict[str, Any]]
+        :return: набор колонок и строки с этим набором
+        :rtype: Iterator[tuple[tuple[str, ...], list[dict[str, Any]]]]
+        """
+        groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+
+        yield from groups.items()
+
+    @classmethod
+    def _with_python_defaults(cls, rows: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        """
+        Заполнение отсутствующих колонок значениями default на стороне Python
+
+        :param rows: данные записей
+        :type rows: Iterable[dict[str, Any]]
+        :return: строки с заполненными значениями по умолчанию
+        :rtype: Iterator[dict[str, Any]]
+        """
+        defaults = [
+            (column.name, column.default)
+            for column in cls.__table__.columns
+            if column.default is not None and (column.default.is_scalar or column.default.is_callable)
+        ]
+
+        for row in rows:
+            missing = [(name, default) for name, default in defaults if name not in row]
+
+            if not missing:
+                yield row
+                continue
+
+            yield row | {name: default.arg if default.is_scalar else default.arg(None) for name, default in missing}
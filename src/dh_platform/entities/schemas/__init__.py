@@ -14,3 +14,4 @@ from .mixins import (
     TimestampSchemaMixin,
     UUIDSchemaMixin,
 )
+from .pagination import CursorPageSchema
@@ -0,0 +1,40 @@
+"""Модуль схем данных для постраничной навигации"""
+
+__author__: str = "Старков Е.П."
+
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+ItemT = TypeVar("ItemT")
+
+
+class CursorPageSchema(BaseModel, Generic[ItemT]):
+    """
+    Страница данных при навигации по курсору
+
+    :cvar items: записи страницы
+    :type items: list[ItemT]
+    :cvar next_cursor: курсор следующей страницы. None, если страница последняя
+    :type next_cursor: str | None
+    :cvar prev_cursor: курсор предыдущей страницы. None, если страница первая
+    :type prev_cursor: str | None
+    :cvar limit: размер страницы
+    :type limit: int
+
+    .. code-block:: python
+    >>> from dh_platform.entities.schemas import BaseSchema, CursorPageSchema
+    >>>
+    >>>
+    >>> class UserBaseData(BaseSchema):
+    >>>     name: str
+    >>>
+    >>> @app.get("/users", response_model=CursorPageSchema[UserBaseData])
+    >>> async def list_users(...):
+    >>>     ...
+    """
+
+    items: list[ItemT]
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+    limit: int
@@ -6,7 +6,9 @@ from .custom_errors import (
     DatabaseException,
     ForbiddenException,
     NotFoundException,
+    NotModifiedException,
     ServiceUnavailableException,
+    TooManyRequestsException,
     UnauthorizedException,
     ValidationException,
 )
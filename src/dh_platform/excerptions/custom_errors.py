@@ -182,10 +182,54 @@ class ServiceUnavailableException(CustomHTTPException):
     >>>         })
     """
 
-    def __init__(self, details: ExceptionDetailsType | None = None):
+    def __init__(self, details: ExceptionDetailsType | None = None, retry_after: int | None = None):
         super().__init__(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Внутренняя ошибка сервиса",
             code=ErrorCode.SERVICE_UNAVAILABLE,
             details=details,
+            headers={"Retry-After": str(retry_after)} if retry_after is not None else None,
+        )
+
+
+class NotModifiedException(CustomHTTPException):
+    """
+    Ресурс не изменился. Обработчик исключений отвечает 304 без тела
+
+    .. code-block:: python
+    >>> from dh_platform.excerptions import NotModifiedException
+    >>>
+    >>> def check_etag(request: Request, etag: str) -> None:
+    >>>     if request.headers.get("If-None-Match") == etag:
+    >>>         raise NotModifiedException(etag)
+    """
+
+    def __init__(self, etag: str):
+        super().__init__(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            detail="Ресурс не изменился",
+            code=ErrorCode.NOT_MODIFIED,
+            headers={"ETag": etag},
+        )
+
+
+class TooManyRequestsException(CustomHTTPException):
+    """
+    Превышен лимит запросов
+
+    .. code-block:: python
+    >>> from dh_platform.excerptions import TooManyRequestsException
+    >>>
+    >>> def check_export_quota(user_id: int) -> None:
+    >>>     if Export.count_today(user_id) >= 10:
+    >>>         raise TooManyRequestsException(retry_after=3600)
+    """
+
+    def __init__(self, retry_after: int | None = None, details: ExceptionDetailsType | None = None):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Превышен лимит запросов",
+            code=ErrorCode.TOO_MANY_REQUESTS,
+            details=details,
+            headers={"Retry-After": str(retry_after)} if retry_after is not None else None,
         )
@@ -4,20 +4,75 @@ __author__: str = "Старков Е.П."
 
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
+from dh_platform.types.common import ExceptionDetailsType
 from dh_platform.utils import logger
 
 from .custom_errors import CustomHTTPException
 
 
+def error_response(
+    status_code: int,
+    code: str,
+    message: str,
+    details: ExceptionDetailsType | list | None = None,
+    headers: dict[str, str] | None = None,
+) -> JSONResponse:
+    """
+    Ответ с ошибкой в формате {"error": {"code", "message", "details"}}. Используется обработчиками исключений и
+    middleware, которые отвечают до обработчиков исключений приложения
+
+    :param status_code: HTTP код ошибки
+    :type status_code: int
+    :param code: текстовый код ошибки
+    :type code: str
+    :param message: текст сообщения об ошибке
+    :type message: str
+    :param details: дополнительные данные об ошибке. None - поле не выводится
+    :type details: ExceptionDetailsType | list | None
+    :param headers: заголовки ответа
+    :type headers: dict[str, str] | None
+    :return: ответ с ошибкой
+    :rtype: JSONResponse
+    """
+    error: dict = {"code": code, "message": message}
+    if details is not None:
+        error["details"] = details
+
+    return JSONResponse(status_code=status_code, content={"error": error}, headers=headers)
+
+
+def exception_response(exc: CustomHTTPException) -> JSONResponse:
+    """
+    Ответ с ошибкой по кастомному исключению без вызова обработчиков приложения. Используется в middleware,
+    которые выполняются до обработчиков исключений
+
+    :param exc: исключение
+    :type exc: CustomHTTPException
+    :return: ответ с ошибкой
+    :rtype: JSONResponse
+
+    .. code-block:: python
+    >>> from dh_platform.excerptions import ServiceUnavailableException
+    >>> from dh_platform.excerptions.handlers import exception_response
+    >>>
+    >>> await exception_response(ServiceUnavailableException(retry_after=1))(scope, receive, send)
+    """
+    return error_response(exc.status_code, exc.code, exc.detail, exc.details, exc.headers)
+
+
 def setup_exception_handlers(app: FastAPI):
     """Настройка обработчиков исключений"""
 
     @app.exception_handler(CustomHTTPException)
     async def custom_http_exception_handler(request: Request, exc: CustomHTTPException):
         """Обработчик кастомных HTTP исключений"""
+        if exc.status_code == status.HTTP_304_NOT_MODIFIED:
+            # Ответ 304 не содержит тела
+            return Response(status_code=exc.status_code, headers=exc.headers)
+
         logger.warning(
             "Custom HTTP exception",
             extra={
@@ -27,11 +82,7 @@ def setup_exception_handlers(app: FastAPI):
             },
         )
 
-        return JSONResponse(
-            status_code=exc.status_code,
-            content={"error": {"code": exc.code, "message": exc.detail, "details": exc.details}},
-            headers=exc.headers,
-        )
+        return exception_response(exc)
 
     @app.exception_handler(StarletteHTTPException)
     async def http_exception_handler(request: Request, exc: StarletteHTTPException):
@@ -45,9 +96,7 @@ def setup_exception_handlers(app: FastAPI):
             },
         )
 
-        return JSONResponse(
-            status_code=exc.status_code, content={"error": {"code": "http_error", "message": exc.detail}}
-        )
+        return error_response(exc.status_code, "http_error", exc.detail)
 
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -66,10 +115,7 @@ def setup_exception_handlers(app: FastAPI):
             },
         )
 
-        return JSONResponse(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            content={"error": {"code": "validation_error", "message": "Validation failed", "details": errors}},
-        )
+        return error_response(status.HTTP_422_UNPROCESSABLE_ENTITY, "validation_error", "Validation failed", errors)
 
     @app.exception_handler(Exception)
     async def global_exception_handler(request: Request, exc: Exception):
@@ -84,7 +130,4 @@ def setup_exception_handlers(app: FastAPI):
             exc_info=True,
         )
 
-        return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={"error": {"code": "internal_error", "message": "Internal server error"}},
-        )
+        return error_response(status.HTTP_500_INTERNAL_SERVER_ERROR, "internal_error", "Internal server error")
@@ -1,19 +1,57 @@
+# pylint: disable=too-many-arguments
 """Пакет промежуточного ПО"""
 
 __author__: str = "Старков Е.П."
 
 from fastapi import FastAPI
 
+from dh_platform.config import base_settings
+
+from .coalescing import CoalescingMiddleware
+from .compression import CompressionMiddleware
+from .concurrency import ConcurrencyLimitMiddleware
+from .etag import ETagMiddleware, conditional_etag, etag_matches, make_weak_etag
 from .logging import LoggingMiddleware, RequestIDMiddleware
+from .rate_limit import (
+    MemoryRateLimitStore,
+    RateLimit,
+    RateLimitMiddleware,
+    RateLimitStore,
+    SharedMemoryRateLimitStore,
+    client_ip_key,
+    request_origin_key,
+)
+from .request import RequestMiddleware
 from .timing import TimingMiddleware
 
 
-def setup_base_middleware(app: FastAPI) -> None:
+def setup_base_middleware(
+    app: FastAPI,
+    *,
+    compression: bool = base_settings.COMPRESSION_ENABLED,
+    etag: bool = base_settings.ETAG_ENABLED,
+    rate_limit: bool = base_settings.RATE_LIMIT_ENABLED,
+    coalescing: bool = base_settings.COALESCING_ENABLED,
+    concurrency_limit: bool = base_settings.CONCURRENCY_LIMIT_ENABLED,
+) -> None:
     """
-    Устанавливает базовые middleware для приложения
+    Устанавливает базовые middleware для приложения. Request ID, замер времени и логирование запросов
+    выполняются одним ASGI middleware RequestMiddleware. Флаги middleware передаются только по имени
 
     :param app: экземпляр приложения
     :type app: FastAPI
+    :param compression: подключить сжатие ответов. Параметры сжатия задаются настройками COMPRESSION_*
+    :type compression: bool
+    :param etag: подключить ETag и ответы 304 на условные GET запросы
+    :type etag: bool
+    :param rate_limit: подключить ограничение частоты запросов. Лимиты задаются настройками RATE_LIMIT_*
+    :type rate_limit: bool
+    :param coalescing: подключить объединение одинаковых одновременных GET запросов для всех путей.
+        Для отдельных путей CoalescingMiddleware подключается явно с параметром routes
+    :type coalescing: bool
+    :param concurrency_limit: подключить ограничение количества одновременно обрабатываемых запросов.
+        Параметры задаются настройками CONCURRENCY_*, запросы к CONCURRENCY_EXCLUDE_PATHS не ограничиваются
+    :type concurrency_limit: bool
 
     .. code-block:: python
     >>> from fastapi import FastAPI
@@ -22,6 +60,27 @@ def setup_base_middleware(app: FastAPI) -> None:
     >>> app_inst: FastAPI = FastAPI()
     >>> setup_base_middleware(app_inst)
     """
-    app.add_middleware(LoggingMiddleware)
-    app.add_middleware(RequestIDMiddleware)
-    app.add_middleware(TimingMiddleware)
+    # Объединенные запросы получают исходный ответ, ETag и сжатие выполняются для каждого запроса отдельно
+    if coalescing:
+        app.add_middleware(CoalescingMiddleware)
+    # ETag вычисляется по исходному телу, поэтому middleware ETag подключается внутри сжатия
+    if etag:
+        app.add_middleware(ETagMiddleware)
+    if compression:
+        app.add_middleware(CompressionMiddleware)
+    if rate_limit:
+        app.add_middleware(
+            RateLimitMiddleware,
+            default=RateLimit.parse(base_settings.RATE_LIMIT_DEFAULT) if base_settings.RATE_LIMIT_DEFAULT else None,
+            routes={path: RateLimit.parse(limit) for path, limit in base_settings.RATE_LIMIT_ROUTES.items()},
+            store=(
+                SharedMemoryRateLimitStore(base_settings.RATE_LIMIT_SHARED_PATH)
+                if base_settings.RATE_LIMIT_SHARED_PATH
+                else MemoryRateLimitStore(base_settings.RATE_LIMIT_MAX_KEYS)
+            ),
+        )
+    # Перегрузка отсекается до всех остальных этапов обработки, но с логированием и метриками RequestMiddleware
+    if concurrency_limit:
+        app.add_middleware(ConcurrencyLimitMiddleware, exclude_paths=base_settings.CONCURRENCY_EXCLUDE_PATHS)
+
+    app.add_middleware(RequestMiddleware)
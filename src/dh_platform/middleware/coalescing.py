@@ -0,0 +1,229 @@
+# pylint: disable=too-few-public-methods
+"""Модуль объединения одинаковых одновременных запросов"""
+
+__author__: str = "Старков Е.П."
+
+import asyncio
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from dh_platform.config import base_settings
+from dh_platform.utils import logger
+
+# Методы, запросы с которыми объединяются
+_COALESCE_METHODS: frozenset[str] = frozenset({"GET", "HEAD"})
+# Заголовки, от которых по умолчанию зависит ответ
+_DEFAULT_VARY_HEADERS: tuple[str, ...] = ("authorization", "cookie", "accept", "accept-encoding", "accept-language")
+
+_RequestKey = tuple[str, str, bytes, tuple[bytes, ...]]
+
+
+@dataclass(slots=True)
+class _CapturedResponse:
+    """
+    Ответ ведущего запроса для передачи ожидающим
+
+    :ivar status: код ответа
+    :type status: int
+    :ivar headers: заголовки ответа
+    :type headers: list[tuple[bytes, bytes]]
+    :ivar body: части тела ответа
+    :type body: list[bytes]
+    :ivar size: размер тела ответа
+    :type size: int
+    """
+
+    status: int = 0
+    headers: list[tuple[bytes, bytes]] = field(default_factory=list)
+    body: list[bytes] = field(default_factory=list)
+    size: int = 0
+
+
+# Результат ведущего запроса, завершившегося исключением без ответа: ведущим становится один из ожидающих
+_LEADER_FAILED: _CapturedResponse = _CapturedResponse()
+
+
+class CoalescingMiddleware:
+    """
+    ASGI middleware объединения одинаковых одновременных GET запросов (single-flight). Пока выполняется запрос,
+    такие же запросы (метод, путь, параметры и заголовки vary_headers) ждут его ответ и не выполняют обработчик.
+    Ответ передается ожидающим с любым кодом, в том числе 5xx, чтобы ошибка не вызывала повторное выполнение
+    обработчика всеми ожидающими. Если ведущий запрос завершился исключением, ведущим становится первый
+    из ожидающих, остальные ждут его ответ. Если ответ больше max_body_size или ожидание превысило timeout,
+    ожидающие запросы выполняются самостоятельно.
+
+    Подключается явно и только для эндпоинтов, ответ которых не зависит от пользователя сверх vary_headers
+
+    :ivar app: ASGI приложение
+    :type app: ASGIApp
+    :ivar timeout: максимальное время ожидания ответа ведущего запроса в секундах
+    :type timeout: float
+    :ivar max_body_size: максимальный размер тела ответа, передаваемого ожидающим
+    :type max_body_size: int
+    :ivar _vary_headers: заголовки, входящие в ключ запроса
+    :type _vary_headers: tuple[bytes, ...]
+    :ivar _routes: шаблоны путей, запросы к которым объединяются. None - все GET запросы
+    :type _routes: list[re.Pattern] | None
+    :ivar _in_flight: выполняющиеся ведущие запросы по ключам
+    :type _in_flight: dict[_RequestKey, asyncio.Future]
+
+    .. code-block:: python
+    >>> from fastapi import FastAPI
+    >>> from dh_platform.middleware import CoalescingMiddleware
+    >>>
+    >>> app: FastAPI = FastAPI()
+    >>> app.add_middleware(CoalescingMiddleware, routes=["/catalog/{category_id}", "/rates"], timeout=3)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Sequence[str] | None = None,
+        vary_headers: Sequence[str] = _DEFAULT_VARY_HEADERS,
+        timeout: float = base_settings.COALESCING_TIMEOUT,
+        max_body_size: int = 1024 * 1024,
+    ) -> None:
+        """
+        Инициализация middleware
+
+        :param app: ASGI приложение
+        :type app: ASGIApp
+        :param routes: шаблоны путей в формате маршрутов FastAPI. None - все GET запросы
+        :type routes: Sequence[str] | None
+        :param vary_headers: заголовки, от которых зависит ответ
+        :type vary_headers: Sequence[str]
+        :param timeout: максимальное время ожидания ответа ведущего запроса в секундах
+        :type timeout: float
+        :param max_body_size: максимальный размер тела ответа, передаваемого ожидающим
+        :type max_body_size: int
+        """
+        self.app: ASGIApp = app
+        self.timeout: float = timeout
+        self.max_body_size: int = max_body_size
+        self._vary_headers: tuple[bytes, ...] = tuple(header.lower().encode("latin-1") for header in vary_headers)
+        self._routes: list[re.Pattern] | None = (
+            [compile_path(route)[0] for route in routes] if routes is not None else None
+        )
+        self._in_flight: dict[_RequestKey, asyncio.Future] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обработка запроса
+
+        :param scope: параметры соединения
+        :type scope: Scope
+        :param receive: получение сообщений запроса
+        :type receive: Receive
+        :param send: отправка сообщений ответа
+        :type send: Send
+        """
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in _COALESCE_METHODS
+            or (self._routes is not None and not any(route.match(scope["path"]) for route in self._routes))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key: _RequestKey = self._key(scope)
+
+        while (leader := self._in_flight.get(key)) is not None:
+            try:
+                captured: _CapturedResponse | None = await asyncio.wait_for(asyncio.shield(leader), self.timeout)
+            except asyncio.TimeoutError:
+                captured = None
+                logger.warning("Истекло ожидание объединенного запроса", extra={"path": scope["path"]})
+
+            if captured is None:
+                await self.app(scope, receive, send)
+                return
+            if captured is not _LEADER_FAILED:
+                await self._replay(captured, send)
+                return
+
+        await self._lead(key, scope, receive, send)
+
+    @staticmethod
+    async def _replay(captured: _CapturedResponse, send: Send) -> None:
+        """
+        Отправка сохраненного ответа ведущего запроса
+
+        :param captured: ответ ведущего запроса
+        :type captured: _CapturedResponse
+        :param send: отправка сообщений ответа
+        :type send: Send
+        """
+        await send({"type": "http.response.start", "status": captured.status, "headers": captured.headers})
+        for index, chunk in enumerate(captured.body):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(captured.body) - 1})
+        if not captured.body:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    def _key(self, scope: Scope) -> _RequestKey:
+        """
+        Ключ запроса
+
+        :param scope: параметры соединения
+        :type scope: Scope
+        :return: метод, путь, строка параметров и значения заголовков vary_headers
+        :rtype: _RequestKey
+        """
+        headers: dict[bytes, bytes] = dict(scope["headers"])
+        return (
+            scope["method"],
+            scope["path"],
+            scope["query_string"],
+            tuple(headers.get(name, b"") for name in self._vary_headers),
+        )
+
+    async def _lead(self, key: _RequestKey, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Выполнение ведущего запроса с сохранением ответа для ожидающих
+
+        :param key: ключ запроса
+        :type key: _RequestKey
+        :param scope: параметры соединения
+        :type scope: Scope
+        :param receive: получение сообщений запроса
+        :type receive: Receive
+        :param send: отправка сообщений ответа
+        :type send: Send
+        """
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        captured: _CapturedResponse | None = _CapturedResponse()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal captured
+
+            if captured is not None:
+                if message["type"] == "http.response.start":
+                    captured.status = message["status"]
+                    captured.headers = list(message.get("headers", []))
+                elif message["type"] == "http.response.body":
+                    body: bytes = message.get("body", b"")
+                    captured.size += len(body)
+                    if captured.size > self.max_body_size:
+                        captured = None
+                    elif body:
+                        captured.body.append(body)
+
+            await send(message)
+
+        failed: bool = True
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+            failed = False
+        finally:
+            del self._in_flight[key]
+            # Ведущий запрос удален из _in_flight до передачи результата: первый из ожидающих при ошибке
+            # регистрируется новым ведущим раньше, чем остальные проверят _in_flight
+            if failed or (captured is not None and captured.status == 0):
+                future.set_result(_LEADER_FAILED)
+            else:
+                future.set_result(captured)
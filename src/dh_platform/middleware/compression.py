@@ -0,0 +1,313 @@
+# pylint: disable=too-few-public-methods
+"""Модуль ASGI middleware сжатия тела ответа"""
+
+__author__: str = "Старков Е.П."
+
+import zlib
+from collections.abc import Sequence
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from dh_platform.config import base_settings
+from dh_platform.consts.middleware import ContentEncoding
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# Алгоритмы сжатия, доступные в текущем окружении, в порядке предпочтения
+AVAILABLE_ENCODINGS: tuple[ContentEncoding, ...] = tuple(
+    encoding for encoding in ContentEncoding if encoding != ContentEncoding.ZSTD or zstandard is not None
+)
+# Коды ответов, тело которых не сжимается
+_SKIP_STATUS_CODES: frozenset[int] = frozenset({204, 206, 304})
+
+
+def negotiate_encoding(
+    accept_encoding: str, available: Sequence[ContentEncoding] = AVAILABLE_ENCODINGS
+) -> ContentEncoding | None:
+    """
+    Выбор алгоритма сжатия по заголовку Accept-Encoding. При равных весах выбирается алгоритм,
+    стоящий раньше в available
+
+    :param accept_encoding: значение заголовка Accept-Encoding
+    :type accept_encoding: str
+    :param available: доступные алгоритмы в порядке предпочтения
+    :type available: Sequence[ContentEncoding]
+    :return: алгоритм сжатия или None, если клиент не принимает ни один из доступных
+    :rtype: ContentEncoding | None
+
+    .. code-block:: python
+    >>> from dh_platform.middleware.compression import negotiate_encoding
+    >>>
+    >>> print(negotiate_encoding("deflate, gzip;q=0.8")) # deflate
+    """
+    weights: dict[str, float] = {}
+
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        weight: float = 1.0
+        key, _, value = params.partition("=")
+
+        if key.strip().lower() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+
+        if name := name.strip().lower():
+            weights[name] = weight
+
+    wildcard: float = weights.get("*", 0.0)
+    best: ContentEncoding | None = None
+    best_weight: float = 0.0
+
+    for encoding in available:
+        weight = weights.get(encoding, wildcard)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+
+    return best
+
+
+class _StreamCompressor:
+    """
+    Потоковое сжатие тела ответа. Каждая часть сбрасывается в выходной поток, чтобы клиент получал данные
+    по мере генерации ответа
+
+    :ivar _compressor: объект сжатия zlib или zstandard
+    :ivar _sync_flush: режим сброса промежуточной части
+    :type _sync_flush: int
+    """
+
+    __slots__ = ("_compressor", "_sync_flush")
+
+    def __init__(self, encoding: ContentEncoding, level: int, zstd_level: int) -> None:
+        """
+        Инициализация сжатия
+
+        :param encoding: алгоритм сжатия
+        :type encoding: ContentEncoding
+        :param level: уровень сжатия gzip и deflate
+        :type level: int
+        :param zstd_level: уровень сжатия zstd
+        :type zstd_level: int
+        """
+        if encoding == ContentEncoding.ZSTD:
+            self._compressor = zstandard.ZstdCompressor(level=zstd_level).compressobj()
+            self._sync_flush: int = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            wbits: int = 16 + zlib.MAX_WBITS if encoding == ContentEncoding.GZIP else zlib.MAX_WBITS
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, wbits)
+            self._sync_flush = zlib.Z_SYNC_FLUSH
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """
+        Сжатие части тела ответа
+
+        :param data: часть тела ответа
+        :type data: bytes
+        :param final: последняя часть
+        :type final: bool
+        :return: сжатые данные
+        :rtype: bytes
+        """
+        compressed: bytes = self._compressor.compress(data)
+        return compressed + (self._compressor.flush() if final else self._compressor.flush(self._sync_flush))
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware сжатия тела ответа. Алгоритм выбирается по заголовку Accept-Encoding: zstd (при установленном
+    пакете zstandard), gzip или deflate. Сжимаются только ответы с типом содержимого из content_types и размером
+    не меньше minimum_size. Потоковые ответы сжимаются по частям без накопления всего тела
+
+    :ivar app: ASGI приложение
+    :type app: ASGIApp
+    :ivar minimum_size: минимальный размер тела ответа в байтах для сжатия
+    :type minimum_size: int
+    :ivar level: уровень сжатия gzip и deflate, от 1 до 9
+    :type level: int
+    :ivar zstd_level: уровень сжатия zstd, от 1 до 22
+    :type zstd_level: int
+    :ivar content_types: сжимаемые типы содержимого. Значение, оканчивающееся на /, задает префикс
+    :type content_types: tuple[str, ...]
+
+    .. code-block:: python
+    >>> from fastapi import FastAPI
+    >>> from dh_platform.middleware import CompressionMiddleware
+    >>>
+    >>> app: FastAPI = FastAPI()
+    >>> app.add_middleware(CompressionMiddleware, minimum_size=1024, level=5)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = base_settings.COMPRESSION_MIN_SIZE,
+        level: int = base_settings.COMPRESSION_LEVEL,
+        zstd_level: int = base_settings.COMPRESSION_ZSTD_LEVEL,
+        content_types: Sequence[str] = tuple(base_settings.COMPRESSION_CONTENT_TYPES),
+    ) -> None:
+        """
+        Инициализация middleware
+
+        :param app: ASGI приложение
+        :type app: ASGIApp
+        :param minimum_size: минимальный размер тела ответа в байтах для сжатия
+        :type minimum_size: int
+        :param level: уровень сжатия gzip и deflate, от 1 до 9
+        :type level: int
+        :param zstd_level: уровень сжатия zstd, от 1 до 22
+        :type zstd_level: int
+        :param content_types: сжимаемые типы содержимого
+        :type content_types: Sequence[str]
+        """
+        self.app: ASGIApp = app
+        self.minimum_size: int = minimum_size
+        self.level: int = level
+        self.zstd_level: int = zstd_level
+        self.content_types: tuple[str, ...] = tuple(content_type.lower() for content_type in content_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обработка запроса
+
+        :param scope: параметры соединения
+        :type scope: Scope
+        :param receive: получение сообщений запроса
+        :type receive: Receive
+        :param send: отправка сообщений ответа
+        :type send: Send
+        """
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding: str = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+
+        encoding: ContentEncoding | None = negotiate_encoding(accept_encoding) if accept_encoding else None
+
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _CompressionSender(self, send, encoding))
+
+    def is_compressible(self, message: Message) -> bool:
+        """
+        Проверка, подлежит ли ответ сжатию
+
+        :param message: сообщение http.response.start
+        :type message: Message
+        :return: ответ подлежит сжатию
+        :rtype: bool
+        """
+        if message["status"] < 200 or message["status"] in _SKIP_STATUS_CODES:
+            return False
+
+        content_type: str = ""
+        for name, value in message.get("headers", []):
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.decode("latin-1").partition(";")[0].strip().lower()
+
+        return any(
+            content_type == allowed or (allowed.endswith("/") and content_type.startswith(allowed))
+            for allowed in self.content_types
+        )
+
+
+class _CompressionSender:
+    """
+    Отправка ответа со сжатием. Начало ответа задерживается до накопления minimum_size байт тела,
+    чтобы маленькие ответы отправлялись без сжатия
+
+    :ivar _middleware: middleware сжатия с параметрами
+    :type _middleware: CompressionMiddleware
+    :ivar _send: отправка сообщений ответа
+    :type _send: Send
+    :ivar _encoding: алгоритм сжатия
+    :type _encoding: ContentEncoding
+    :ivar _start: отложенное сообщение http.response.start
+    :type _start: Message | None
+    :ivar _buffer: накопленное тело ответа до принятия решения о сжатии
+    :type _buffer: bytearray
+    :ivar _compressor: потоковое сжатие, если ответ сжимается
+    :type _compressor: _StreamCompressor | None
+    :ivar _passthrough: ответ передается без изменений
+    :type _passthrough: bool
+    """
+
+    __slots__ = ("_middleware", "_send", "_encoding", "_start", "_buffer", "_compressor", "_passthrough")
+
+    def __init__(self, middleware: CompressionMiddleware, send: Send, encoding: ContentEncoding) -> None:
+        self._middleware: CompressionMiddleware = middleware
+        self._send: Send = send
+        self._encoding: ContentEncoding = encoding
+        self._start: Message | None = None
+        self._buffer: bytearray = bytearray()
+        self._compressor: _StreamCompressor | None = None
+        self._passthrough: bool = False
+
+    async def __call__(self, message: Message) -> None:
+        """
+        Отправка сообщения ответа
+
+        :param message: сообщение ответа
+        :type message: Message
+        """
+        if self._passthrough or message["type"] not in ("http.response.start", "http.response.body"):
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            if self._middleware.is_compressible(message):
+                self._start = message
+            else:
+                self._passthrough = True
+                await self._send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self._compressor is not None:
+            compressed: bytes = self._compressor.compress(body, not more_body)
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        self._buffer += body
+
+        if len(self._buffer) < self._middleware.minimum_size:
+            if not more_body:
+                # Все тело ответа меньше порога - отправка без сжатия
+                self._passthrough = True
+                await self._send(self._start)
+                await self._send({"type": "http.response.body", "body": bytes(self._buffer), "more_body": False})
+            return
+
+        self._compressor = _StreamCompressor(self._encoding, self._middleware.level, self._middleware.zstd_level)
+        compressed = self._compressor.compress(bytes(self._buffer), not more_body)
+        self._buffer = bytearray()
+
+        headers: MutableHeaders = MutableHeaders(raw=list(self._start.get("headers", [])))
+        headers["Content-Encoding"] = self._encoding
+        headers.add_vary_header("Accept-Encoding")
+        # Сильный ETag описывает исходное тело, после сжатия он становится слабым
+        if (etag := headers.get("ETag")) is not None and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(compressed))
+
+        await self._send({**self._start, "headers": headers.raw})
+        await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
@@ -0,0 +1,231 @@
+# pylint: disable=too-many-instance-attributes, too-many-arguments, too-many-positional-arguments
+"""Модуль ограничения количества одновременно обрабатываемых запросов"""
+
+__author__: str = "Старков Е.П."
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from dh_platform.config import base_settings
+from dh_platform.excerptions import ServiceUnavailableException
+from dh_platform.excerptions.handlers import exception_response
+
+from .metrics import http_concurrency_limit, http_requests_shed
+
+# Коды ответов, сигнализирующие о перегрузке
+_OVERLOAD_STATUS_CODES: frozenset[int] = frozenset({503, 504})
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    ASGI middleware ограничения количества одновременно обрабатываемых запросов (load shedding). Запросы сверх лимита
+    ждут в очереди не дольше queue_timeout, при переполнении очереди или истечении ожидания сразу получают 503
+    с заголовком Retry-After.
+
+    В адаптивном режиме лимит подбирается по алгоритму AIMD: после запроса быстрее latency_target лимит
+    увеличивается на 1/limit (примерно на единицу за каждые limit запросов), после медленного запроса или ответа
+    503/504 уменьшается в backoff раз, но не чаще раза за latency_target
+
+    :ivar app: ASGI приложение
+    :type app: ASGIApp
+    :ivar min_limit: минимальный лимит
+    :type min_limit: int
+    :ivar max_limit: максимальный лимит
+    :type max_limit: int
+    :ivar adaptive: лимит подбирается по времени обработки запросов
+    :type adaptive: bool
+    :ivar latency_target: время обработки запроса в секундах, превышение которого считается признаком перегрузки
+    :type latency_target: float
+    :ivar backoff: множитель уменьшения лимита
+    :type backoff: float
+    :ivar queue_size: максимальное количество ожидающих запросов
+    :type queue_size: int
+    :ivar queue_timeout: максимальное время ожидания в очереди в секундах
+    :type queue_timeout: float
+    :ivar _limit: текущий лимит (дробный для плавного увеличения)
+    :type _limit: float
+    :ivar _in_flight: количество обрабатываемых запросов
+    :type _in_flight: int
+    :ivar _waiters: ожидающие запросы
+    :type _waiters: deque[asyncio.Future]
+
+    .. code-block:: python
+    >>> from fastapi import FastAPI
+    >>> from dh_platform.middleware import ConcurrencyLimitMiddleware
+    >>>
+    >>> app: FastAPI = FastAPI()
+    >>> app.add_middleware(ConcurrencyLimitMiddleware, limit=30, queue_size=50, queue_timeout=0.5)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limit: int | None = base_settings.CONCURRENCY_LIMIT,
+        min_limit: int = base_settings.CONCURRENCY_MIN_LIMIT,
+        max_limit: int | None = None,
+        adaptive: bool = base_settings.CONCURRENCY_ADAPTIVE,
+        latency_target: float = base_settings.CONCURRENCY_LATENCY_TARGET,
+        backoff: float = 0.9,
+        queue_size: int = base_settings.CONCURRENCY_QUEUE_SIZE,
+        queue_timeout: float = base_settings.CONCURRENCY_QUEUE_TIMEOUT,
+        exclude_paths: Sequence[str] = (),
+    ) -> None:
+        """
+        Инициализация middleware
+
+        :param app: ASGI приложение
+        :type app: ASGIApp
+        :param limit: начальный лимит. None - DB_POOL_SIZE + DB_MAX_OVERFLOW, чтобы запросы отклонялись раньше,
+            чем закончатся соединения пула
+        :type limit: int | None
+        :param min_limit: минимальный лимит
+        :type min_limit: int
+        :param max_limit: максимальный лимит. None - равен начальному
+        :type max_limit: int | None
+        :param adaptive: лимит подбирается по времени обработки запросов
+        :type adaptive: bool
+        :param latency_target: время обработки запроса в секундах, превышение которого считается признаком перегрузки
+        :type latency_target: float
+        :param backoff: множитель уменьшения лимита
+        :type backoff: float
+        :param queue_size: максимальное количество ожидающих запросов
+        :type queue_size: int
+        :param queue_timeout: максимальное время ожидания в очереди в секундах
+        :type queue_timeout: float
+        :param exclude_paths: пути, запросы к которым не ограничиваются (проверки состояния, метрики)
+        :type exclude_paths: Sequence[str]
+        """
+        if limit is None:
+            limit = base_settings.DB_POOL_SIZE + base_settings.DB_MAX_OVERFLOW
+
+        self.app: ASGIApp = app
+        self.min_limit: int = min_limit
+        self.max_limit: int = max_limit if max_limit is not None else limit
+        self.adaptive: bool = adaptive
+        self.latency_target: float = latency_target
+        self.backoff: float = backoff
+        self.queue_size: int = queue_size
+        self.queue_timeout: float = queue_timeout
+        self._exclude_paths: frozenset[str] = frozenset(exclude_paths)
+        self._limit: float = float(limit)
+        self._in_flight: int = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease: float = 0.0
+        self._limit_gauge = http_concurrency_limit.labels()
+        self._limit_gauge.set(self.limit)
+
+    @property
+    def limit(self) -> int:
+        """Текущий лимит одновременно обрабатываемых запросов"""
+        return max(self.min_limit, int(self._limit))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обработка запроса
+
+        :param scope: параметры соединения
+        :type scope: Scope
+        :param receive: получение сообщений запроса
+        :type receive: Receive
+        :param send: отправка сообщений ответа
+        :type send: Send
+        """
+        if scope["type"] != "http" or scope["path"] in self._exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if (reason := await self._acquire()) is not None:
+            http_requests_shed.labels(reason).inc()
+            exc = ServiceUnavailableException(
+                {"reason": reason, "limit": self.limit}, retry_after=max(1, math.ceil(self.queue_timeout))
+            )
+            await exception_response(exc)(scope, receive, send)
+            return
+
+        status_code: int = 500
+        start: float = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper if self.adaptive else send)
+        finally:
+            self._in_flight -= 1
+            if self.adaptive:
+                self._adjust(time.perf_counter() - start, status_code)
+            self._wake()
+
+    async def _acquire(self) -> str | None:
+        """
+        Получение места для обработки запроса
+
+        :return: причина отказа или None, если место получено
+        :rtype: str | None
+        """
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return None
+
+        if len(self._waiters) >= self.queue_size:
+            return "queue_full"
+
+        waiter: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            # Место могло быть выдано одновременно с истечением ожидания
+            if not waiter.done() or waiter.cancelled():
+                return "queue_timeout"
+        except asyncio.CancelledError:
+            # Место могло быть выдано одновременно с отменой запроса
+            if waiter.done() and not waiter.cancelled():
+                self._in_flight -= 1
+                self._wake()
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+
+        return None
+
+    def _wake(self) -> None:
+        """Передача освободившихся мест ожидающим запросам в порядке очереди"""
+        while self._waiters and self._in_flight < self.limit:
+            waiter: asyncio.Future = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    def _adjust(self, duration: float, status_code: int) -> None:
+        """
+        Подбор лимита по результату запроса
+
+        :param duration: время обработки запроса в секундах
+        :type duration: float
+        :param status_code: код ответа
+        :type status_code: int
+        """
+        if duration > self.latency_target or status_code in _OVERLOAD_STATUS_CODES:
+            now: float = time.monotonic()
+            if now - self._last_decrease >= self.latency_target:
+                self._last_decrease = now
+                self._limit = max(float(self.min_limit), self._limit * self.backoff)
+        else:
+            self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+
+        self._limit_gauge.set(self.limit)
@@ -0,0 +1,244 @@
+# pylint: disable=too-few-public-methods
+"""Модуль ETag и условных GET запросов"""
+
+__author__: str = "Старков Е.П."
+
+import hashlib
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from typing import Any
+
+from fastapi import Depends, Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from dh_platform.consts import ENCODING
+from dh_platform.excerptions import NotModifiedException
+
+# Методы, для которых выполняется проверка If-None-Match
+_CONDITIONAL_METHODS: frozenset[str] = frozenset({"GET", "HEAD"})
+# Заголовки, сохраняемые в ответе 304
+_NOT_MODIFIED_HEADERS: frozenset[bytes] = frozenset(
+    {b"etag", b"cache-control", b"content-location", b"date", b"expires", b"vary"}
+)
+
+
+def make_weak_etag(*parts: Any) -> str:
+    """
+    Слабый ETag по версии ресурса, например TimestampMixin.updated_at. Для списков в версию стоит включать
+    количество записей, чтобы удаление тоже меняло ETag
+
+    :param parts: составляющие версии ресурса
+    :return: слабый ETag
+    :rtype: str
+
+    .. code-block:: python
+    >>> from dh_platform.middleware import make_weak_etag
+    >>>
+    >>> response.headers["ETag"] = make_weak_etag(user.updated_at)
+    """
+    raw: str = "|".join(part.isoformat() if isinstance(part, datetime) else str(part) for part in parts)
+    return f'W/"{hashlib.sha1(raw.encode(ENCODING), usedforsecurity=False).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Проверка заголовка If-None-Match. Используется слабое сравнение, как того требует RFC 9110 для If-None-Match
+
+    :param if_none_match: значение заголовка If-None-Match
+    :type if_none_match: str | None
+    :param etag: текущий ETag ресурса
+    :type etag: str
+    :return: ресурс не изменился
+    :rtype: bool
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    etag = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+def conditional_etag(version: Callable[..., Any]) -> Callable[..., Awaitable[str | None]]:
+    """
+    Зависимость для условного GET запроса по дешевому запросу версии ресурса. Если версия совпадает с
+    If-None-Match, обработка прерывается ответом 304 до выполнения основного запроса к БД
+
+    :param version: зависимость, возвращающая версию ресурса (например, updated_at) или None, если версии нет.
+        Кортеж раскладывается на составляющие ETag
+    :type version: Callable[..., Any]
+    :return: зависимость, возвращающая ETag ресурса
+    :rtype: Callable[..., Awaitable[str | None]]
+
+    .. code-block:: python
+    >>> from fastapi import Depends
+    >>> from sqlalchemy import func, select
+    >>> from dh_platform.middleware import conditional_etag
+    >>> from dh_platform.source.database import get_read_db
+    >>>
+    >>> async def users_version(db: AsyncSession = Depends(get_read_db)):
+    >>>     return tuple((await db.execute(select(func.max(User.updated_at), func.count(User.ID)))).one())
+    >>>
+    >>> @app.get("/users", dependencies=[Depends(conditional_etag(users_version))])
+    >>> async def get_users(db: AsyncSession = Depends(get_read_db)):
+    >>>     ...
+    """
+
+    async def dependency(request: Request, response: Response, current: Any = Depends(version)) -> str | None:
+        if current is None:
+            return None
+
+        etag: str = make_weak_etag(*current) if isinstance(current, tuple) else make_weak_etag(current)
+
+        if request.method in _CONDITIONAL_METHODS and etag_matches(request.headers.get("if-none-match"), etag):
+            raise NotModifiedException(etag)
+
+        response.headers["ETag"] = etag
+        return etag
+
+    return dependency
+
+
+class ETagMiddleware:
+    """
+    ASGI middleware ETag. Для успешных ответов на GET запросы без ETag вычисляется сильный ETag по телу ответа.
+    ETag, заданный обработчиком (например, make_weak_etag или conditional_etag), не перезаписывается.
+    При совпадении с If-None-Match тело не отправляется, клиент получает 304.
+
+    Потоковые ответы передаются без буферизации, ETag для них не вычисляется
+
+    .. code-block:: python
+    >>> from fastapi import FastAPI
+    >>> from dh_platform.middleware import ETagMiddleware
+    >>>
+    >>> app: FastAPI = FastAPI()
+    >>> app.add_middleware(ETagMiddleware)
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Инициализация middleware
+
+        :param app: ASGI приложение
+        :type app: ASGIApp
+        """
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обработка запроса
+
+        :param scope: параметры соединения
+        :type scope: Scope
+        :param receive: получение сообщений запроса
+        :type receive: Receive
+        :param send: отправка сообщений ответа
+        :type send: Send
+        """
+        if scope["type"] != "http" or scope["method"] not in _CONDITIONAL_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match: str | None = None
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+                break
+
+        await self.app(scope, receive, _ETagSender(send, if_none_match, scope["method"] == "HEAD"))
+
+
+class _ETagSender:
+    """
+    Отправка ответа с проверкой ETag. Начало ответа без ETag задерживается до получения тела
+
+    :ivar _send: отправка сообщений ответа
+    :type _send: Send
+    :ivar _if_none_match: значение заголовка If-None-Match
+    :type _if_none_match: str | None
+    :ivar _is_head: запрос HEAD, тело ответа пустое и ETag по нему не вычисляется
+    :type _is_head: bool
+    :ivar _start: отложенное сообщение http.response.start
+    :type _start: Message | None
+    :ivar _not_modified: отправлен ответ 304, дальнейшие части тела отбрасываются
+    :type _not_modified: bool
+    """
+
+    __slots__ = ("_send", "_if_none_match", "_is_head", "_start", "_not_modified")
+
+    def __init__(self, send: Send, if_none_match: str | None, is_head: bool) -> None:
+        self._send: Send = send
+        self._if_none_match: str | None = if_none_match
+        self._is_head: bool = is_head
+        self._start: Message | None = None
+        self._not_modified: bool = False
+
+    async def __call__(self, message: Message) -> None:
+        """
+        Отправка сообщения ответа
+
+        :param message: сообщение ответа
+        :type message: Message
+        """
+        if self._not_modified:
+            return
+
+        if message["type"] == "http.response.start":
+            etag: str | None = Headers(raw=message.get("headers", [])).get("etag")
+
+            if message["status"] != 200:
+                await self._send(message)
+            elif etag is not None:
+                if etag_matches(self._if_none_match, etag):
+                    await self._send_not_modified(message)
+                else:
+                    await self._send(message)
+            elif self._is_head:
+                await self._send(message)
+            else:
+                self._start = message
+            return
+
+        if message["type"] != "http.response.body" or self._start is None:
+            await self._send(message)
+            return
+
+        start: Message = self._start
+        self._start = None
+        body: bytes = message.get("body", b"")
+
+        if message.get("more_body", False):
+            # Потоковый ответ отправляется без ETag
+            await self._send(start)
+            await self._send(message)
+            return
+
+        etag = f'"{hashlib.sha1(body, usedforsecurity=False).hexdigest()}"'
+        headers: MutableHeaders = MutableHeaders(raw=list(start.get("headers", [])))
+        headers["ETag"] = etag
+        start = {**start, "headers": headers.raw}
+
+        if etag_matches(self._if_none_match, etag):
+            await self._send_not_modified(start)
+            return
+
+        await self._send(start)
+        await self._send(message)
+
+    async def _send_not_modified(self, start: Message) -> None:
+        """
+        Отправка ответа 304 без тела
+
+        :param start: исходное сообщение http.response.start
+        :type start: Message
+        """
+        self._not_modified = True
+        headers: list[tuple[bytes, bytes]] = [
+            (name, value) for name, value in start.get("headers", []) if name.lower() in _NOT_MODIFIED_HEADERS
+        ]
+
+        await self._send({"type": "http.response.start", "status": 304, "headers": headers})
+        await self._send({"type": "http.response.body", "body": b"", "more_body": False})
@@ -9,7 +9,7 @@ import uuid
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from dh_platform.utils import logger
+from dh_platform.utils import RequestContext, logger, request_context_var, request_id_var
 
 
 class LoggingMiddleware(BaseHTTPMiddleware):
@@ -106,10 +106,17 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
         """
         request_id: str = request.headers.get("X-Request-ID", str(uuid.uuid4()))
 
-        # Добавляем request_id в state
+        # Добавляем request_id в state и контекст выполнения запроса
         request.state.request_id = request_id
+        token = request_id_var.set(request_id)
+        context_token = request_context_var.set(RequestContext(request_id, request.scope))
+
+        try:
+            response: Response = await call_next(request)
+        finally:
+            request_context_var.reset(context_token)
+            request_id_var.reset(token)
 
-        response: Response = await call_next(request)
         response.headers["X-Request-ID"] = request_id
 
         return response
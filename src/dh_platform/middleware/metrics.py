@@ -0,0 +1,75 @@
+"""Модуль метрик HTTP запросов"""
+
+__author__: str = "Старков Е.П."
+
+from starlette.types import Scope
+
+from dh_platform.utils import Counter, Gauge, Histogram, log_buckets, metrics_registry
+
+# Метка маршрута для запросов, не совпавших ни с одним маршрутом
+UNMATCHED_ROUTE: str = "<unmatched>"
+
+http_request_duration: Histogram = metrics_registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Время обработки HTTP запроса",
+        ["method", "route"],
+        buckets=log_buckets(0.001, 2, 15),
+    )
+)
+http_requests: Counter = metrics_registry.register(
+    Counter("http_requests_total", "Количество HTTP запросов", ["method", "route", "status"])
+)
+http_request_errors: Counter = metrics_registry.register(
+    Counter("http_request_errors_total", "Количество HTTP запросов, завершенных ошибкой 5xx", ["method", "route"])
+)
+http_requests_in_flight: Gauge = metrics_registry.register(
+    Gauge("http_requests_in_flight", "Количество HTTP запросов в обработке")
+)
+http_concurrency_limit: Gauge = metrics_registry.register(
+    Gauge("http_concurrency_limit", "Лимит одновременно обрабатываемых HTTP запросов")
+)
+http_requests_shed: Counter = metrics_registry.register(
+    Counter("http_requests_shed_total", "Количество HTTP запросов, отклоненных из-за перегрузки", ["reason"])
+)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Шаблон маршрута запроса. Метрики размечаются шаблоном, а не адресом, чтобы количество меток было ограничено.
+    Для маршрутов подключенных приложений (app.mount) шаблон дополняется путем подключения: root_path
+    без root_path приложения верхнего уровня (app_root_path)
+
+    :param scope: параметры соединения после обработки запроса приложением
+    :type scope: Scope
+    :return: шаблон пути маршрута, например /users/{user_id} или /v2/users/{user_id}
+    :rtype: str
+    """
+    path: str | None = getattr(scope.get("route"), "path", None)
+    if path is None:
+        return UNMATCHED_ROUTE
+
+    root_path: str = scope.get("root_path", "")
+    app_root_path: str = scope.get("app_root_path", root_path)
+
+    return root_path[len(app_root_path) :] + path if root_path.startswith(app_root_path) else path
+
+
+def observe_request(method: str, route: str, status_code: int, duration: float) -> None:
+    """
+    Учет завершенного HTTP запроса
+
+    :param method: метод запроса
+    :type method: str
+    :param route: шаблон маршрута
+    :type route: str
+    :param status_code: код ответа
+    :type status_code: int
+    :param duration: время обработки в секундах
+    :type duration: float
+    """
+    http_request_duration.labels(method, route).observe(duration)
+    http_requests.labels(method, route, str(status_code)).inc()
+
+    if status_code >= 500:
+        http_request_errors.labels(method, route).inc()
@@ -0,0 +1,425 @@
+# pylint: disable=too-few-public-methods
+"""Модуль ограничения частоты запросов"""
+
+__author__: str = "Старков Е.П."
+
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Collection, Mapping
+from dataclasses import dataclass
+
+from fastapi import Request, status
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from dh_platform.consts import ENCODING
+from dh_platform.consts.exception import ErrorCode
+from dh_platform.excerptions.handlers import error_response
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # Windows: общее хранилище лимитов недоступно, остальной модуль работает
+    fcntl = None
+
+# Длительность периодов лимита в секундах
+_PERIODS: dict[str, int] = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+# Формат ячейки таблицы общего хранилища: хеш ключа и теоретическое время прихода следующего запроса
+_SLOT: struct.Struct = struct.Struct("<Qd")
+# Количество проверяемых ячеек при поиске ключа в общем хранилище
+_MAX_PROBES: int = 8
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    """
+    Лимит запросов: не больше requests запросов за period секунд с возможностью израсходовать весь лимит сразу
+
+    :ivar requests: количество запросов
+    :type requests: int
+    :ivar period: период в секундах
+    :type period: float
+    """
+
+    requests: int
+    period: float
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """
+        Разбор лимита из строки вида "100/minute" или "10/5second"
+
+        :param value: строка лимита
+        :type value: str
+        :return: лимит
+        :rtype: RateLimit
+
+        .. code-block:: python
+        >>> from dh_platform.middleware import RateLimit
+        >>>
+        >>> print(RateLimit.parse("100/minute")) # RateLimit(requests=100, period=60)
+        """
+        match: re.Match | None = re.fullmatch(r"\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*", value)
+        if match is None:
+            raise ValueError(f"Некорректный лимит запросов: {value}")
+
+        requests, multiplier, period = match.groups()
+        return cls(int(requests), int(multiplier or 1) * _PERIODS[period])
+
+    @property
+    def interval(self) -> float:
+        """Интервал между запросами при равномерной нагрузке в секундах"""
+        return self.period / self.requests
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    """
+    Результат проверки лимита
+
+    :ivar allowed: запрос разрешен
+    :type allowed: bool
+    :ivar remaining: количество оставшихся запросов
+    :type remaining: int
+    :ivar retry_after: через сколько секунд запрос будет разрешен
+    :type retry_after: float
+    """
+
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+def _check(tat: float | None, now: float, limit: RateLimit) -> tuple[RateLimitResult, float]:
+    """
+    Проверка лимита по алгоритму GCRA (эквивалент token bucket с хранением одного числа на ключ)
+
+    :param tat: теоретическое время прихода следующего запроса или None для нового ключа
+    :type tat: float | None
+    :param now: текущее время
+    :type now: float
+    :param limit: лимит
+    :type limit: RateLimit
+    :return: результат проверки и новое значение tat
+    :rtype: tuple[RateLimitResult, float]
+    """
+    interval: float = limit.interval
+    current: float = now if tat is None else max(tat, now)
+    # Вычитается запас на всплеск: current + interval - period при лимите в один запрос из-за округления
+    # может оказаться больше current и отклонить первый запрос
+    allow_at: float = current - (limit.period - interval)
+
+    if now < allow_at:
+        return RateLimitResult(False, 0, allow_at - now), current
+
+    return RateLimitResult(True, int((now - allow_at) / interval), 0.0), current + interval
+
+
+class RateLimitStore(ABC):
+    """Хранилище состояния лимитов"""
+
+    @abstractmethod
+    def hit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        """
+        Учет запроса
+
+        :param key: ключ лимита
+        :type key: str
+        :param limit: лимит
+        :type limit: RateLimit
+        :return: результат проверки
+        :rtype: RateLimitResult
+        """
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Хранилище лимитов в памяти процесса. На ключ хранится одно число, при превышении max_keys вытесняются
+    давно не использованные ключи, поэтому память ограничена. Каждый процесс uvicorn считает лимиты отдельно
+
+    :ivar _max_keys: максимальное количество ключей
+    :type _max_keys: int
+    :ivar _values: теоретическое время следующего запроса по ключам в порядке использования
+    :type _values: OrderedDict[str, float]
+    """
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        """
+        Инициализация хранилища
+
+        :param max_keys: максимальное количество ключей
+        :type max_keys: int
+        """
+        self._max_keys: int = max_keys
+        self._values: OrderedDict[str, float] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def hit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        with self._lock:
+            result, self._values[key] = _check(self._values.get(key), time.monotonic(), limit)
+            self._values.move_to_end(key)
+
+            if len(self._values) > self._max_keys:
+                self._values.popitem(last=False)
+
+        return result
+
+
+class SharedMemoryRateLimitStore(RateLimitStore):
+    """
+    Хранилище лимитов в разделяемой памяти для нескольких процессов uvicorn на одном хосте. Состояние хранится
+    в файле фиксированного размера (рекомендуется размещать в /dev/shm), отображенном в память, в виде хеш-таблицы
+    с открытой адресацией. Доступ синхронизируется блокировкой файла. При заполнении таблицы вытесняется ключ
+    с наименьшим временем, то есть давно исчерпавший свой лимит
+
+    :ivar _slots: количество ячеек таблицы
+    :type _slots: int
+    :ivar _fd: дескриптор файла хранилища
+    :type _fd: int
+    :ivar _memory: отображение файла в память
+    :type _memory: mmap.mmap
+
+    .. code-block:: python
+    >>> from dh_platform.middleware import RateLimitMiddleware, SharedMemoryRateLimitStore
+    >>>
+    >>> app.add_middleware(RateLimitMiddleware, store=SharedMemoryRateLimitStore("/dev/shm/my_app_rate_limit"))
+    """
+
+    def __init__(self, path: str, slots: int = 65536) -> None:
+        """
+        Инициализация хранилища. Файл создается первым процессом, остальные подключаются к нему
+
+        :param path: путь к файлу хранилища
+        :type path: str
+        :param slots: количество ячеек таблицы. Должно совпадать во всех процессах
+        :type slots: int
+        :raises RuntimeError: платформа без fcntl (Windows)
+        """
+        if fcntl is None:
+            raise RuntimeError("SharedMemoryRateLimitStore недоступен на платформе без fcntl")
+
+        self._slots: int = slots
+        self._fd: int = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size: int = slots * _SLOT.size
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size != size:
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        self._memory: mmap.mmap = mmap.mmap(self._fd, size)
+        self._lock: threading.Lock = threading.Lock()
+
+    def hit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        # Нулевой хеш обозначает свободную ячейку
+        key_hash: int = int.from_bytes(hashlib.blake2b(key.encode(ENCODING), digest_size=8).digest(), "little") or 1
+        now: float = time.time()
+
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                offset: int = self._find_slot(key_hash)
+                stored_hash, tat = _SLOT.unpack_from(self._memory, offset)
+                result, new_tat = _check(tat if stored_hash == key_hash else None, now, limit)
+                _SLOT.pack_into(self._memory, offset, key_hash, new_tat)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        return result
+
+    def _find_slot(self, key_hash: int) -> int:
+        """
+        Поиск ячейки ключа. Вызывается под блокировкой
+
+        :param key_hash: хеш ключа
+        :type key_hash: int
+        :return: смещение ячейки ключа, свободной ячейки или ячейки для вытеснения
+        :rtype: int
+        """
+        oldest_offset: int = 0
+        oldest_tat: float = math.inf
+
+        for probe in range(_MAX_PROBES):
+            offset: int = ((key_hash + probe) % self._slots) * _SLOT.size
+            stored_hash, tat = _SLOT.unpack_from(self._memory, offset)
+
+            if stored_hash in (key_hash, 0):
+                return offset
+            if tat < oldest_tat:
+                oldest_offset, oldest_tat = offset, tat
+
+        return oldest_offset
+
+    def close(self) -> None:
+        """Закрытие хранилища"""
+        self._memory.close()
+        os.close(self._fd)
+
+
+def client_ip_key(request: Request) -> str | None:
+    """
+    Ключ лимита по IP адресу клиента
+
+    :param request: запрос
+    :type request: Request
+    :return: IP адрес клиента
+    :rtype: str | None
+    """
+    return request.client.host if request.client else None
+
+
+def request_origin_key(origins: Collection[str], separator: str = ":") -> Callable[[Request], str | None]:
+    """
+    Функция ключа лимита по источнику запроса - префиксу X-Request-ID до separator, который выставляет вызывающий
+    сервис, например billing:3f2a0c1e-.... Заголовок задается клиентом, поэтому источником считаются только
+    известные сервисы из origins, для остальных запросов ключом является IP адрес клиента. Иначе произвольные
+    значения заголовка давали бы каждому запросу отдельный лимит
+
+    :param origins: известные источники запросов
+    :type origins: Collection[str]
+    :param separator: разделитель источника и идентификатора запроса
+    :type separator: str
+    :return: функция получения ключа клиента
+    :rtype: Callable[[Request], str | None]
+
+    .. code-block:: python
+    >>> from fastapi import FastAPI
+    >>> from dh_platform.middleware import RateLimit, RateLimitMiddleware, request_origin_key
+    >>>
+    >>> app: FastAPI = FastAPI()
+    >>> app.add_middleware(
+    >>>     RateLimitMiddleware, default=RateLimit.parse("50/second"), key_func=request_origin_key({"billing"})
+    >>> )
+    """
+    known: frozenset[str] = frozenset(origins)
+
+    def key_func(request: Request) -> str | None:
+        origin, found, _ = request.headers.get("x-request-id", "").partition(separator)
+        if found and origin in known:
+            return f"origin{separator}{origin}"
+
+        return client_ip_key(request)
+
+    return key_func
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware ограничения частоты запросов. Лимит выбирается по первому совпавшему шаблону пути из routes,
+    иначе применяется default. Превышение лимита возвращает 429 в формате ошибок приложения с заголовком Retry-After
+
+    :ivar app: ASGI приложение
+    :type app: ASGIApp
+    :ivar default: лимит по умолчанию. None - запросы без лимита для пути не ограничиваются
+    :type default: RateLimit | None
+    :ivar key_func: функция получения ключа клиента. None в результате отключает ограничение для запроса
+    :type key_func: Callable[[Request], str | None]
+    :ivar store: хранилище состояния лимитов
+    :type store: RateLimitStore
+
+    .. code-block:: python
+    >>> from fastapi import FastAPI
+    >>> from dh_platform.middleware import RateLimit, RateLimitMiddleware
+    >>>
+    >>> app: FastAPI = FastAPI()
+    >>> app.add_middleware(
+    >>>     RateLimitMiddleware,
+    >>>     default=RateLimit.parse("100/second"),
+    >>>     routes={"/auth/login": RateLimit.parse("5/minute"), "/users/{user_id}/export": RateLimit.parse("1/hour")},
+    >>> )
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default: RateLimit | None = None,
+        routes: Mapping[str, RateLimit] | None = None,
+        key_func: Callable[[Request], str | None] = client_ip_key,
+        store: RateLimitStore | None = None,
+    ) -> None:
+        """
+        Инициализация middleware
+
+        :param app: ASGI приложение
+        :type app: ASGIApp
+        :param default: лимит по умолчанию
+        :type default: RateLimit | None
+        :param routes: лимиты по шаблонам путей в формате маршрутов FastAPI
+        :type routes: Mapping[str, RateLimit] | None
+        :param key_func: функция получения ключа клиента
+        :type key_func: Callable[[Request], str | None]
+        :param store: хранилище состояния лимитов. По умолчанию - в памяти процесса
+        :type store: RateLimitStore | None
+        """
+        self.app: ASGIApp = app
+        self.default: RateLimit | None = default
+        self.key_func: Callable[[Request], str | None] = key_func
+        self.store: RateLimitStore = store if store is not None else MemoryRateLimitStore()
+        self._routes: list[tuple[re.Pattern, str, RateLimit]] = [
+            (compile_path(path)[0], path, limit) for path, limit in (routes or {}).items()
+        ]
+
+    def _resolve(self, path: str) -> tuple[str, RateLimit] | None:
+        """
+        Поиск лимита для пути
+
+        :param path: путь запроса
+        :type path: str
+        :return: шаблон пути и лимит или None, если путь не ограничивается
+        :rtype: tuple[str, RateLimit] | None
+        """
+        for pattern, template, limit in self._routes:
+            if pattern.match(path):
+                return template, limit
+
+        return ("*", self.default) if self.default is not None else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обработка запроса
+
+        :param scope: параметры соединения
+        :type scope: Scope
+        :param receive: получение сообщений запроса
+        :type receive: Receive
+        :param send: отправка сообщений ответа
+        :type send: Send
+        """
+        if scope["type"] != "http" or (resolved := self._resolve(scope["path"])) is None:
+            await self.app(scope, receive, send)
+            return
+
+        template, limit = resolved
+
+        if (client_key := self.key_func(Request(scope))) is None:
+            await self.app(scope, receive, send)
+            return
+
+        result: RateLimitResult = self.store.hit(f"{template}|{client_key}", limit)
+
+        if result.allowed:
+            await self.app(scope, receive, send)
+            return
+
+        response = error_response(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            ErrorCode.TOO_MANY_REQUESTS,
+            "Превышен лимит запросов",
+            {"limit": limit.requests, "period": limit.period},
+            headers={
+                "Retry-After": str(math.ceil(result.retry_after)),
+                "X-RateLimit-Limit": str(limit.requests),
+                "X-RateLimit-Remaining": "0",
+            },
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,290 @@
+# pylint: disable=too-few-public-methods, too-many-instance-attributes
+"""Модуль ASGI middleware обработки запроса: Request ID, замер времени этапов и логирование"""
+
+__author__: str = "Старков Е.П."
+
+import logging
+import random
+import time
+import uuid
+from collections.abc import Mapping
+
+from starlette.datastructures import URL
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from dh_platform.config import base_settings
+from dh_platform.consts import ENCODING
+from dh_platform.consts.logger import LogLevel
+from dh_platform.utils import (
+    RequestContext,
+    ServerTiming,
+    instrument_route_timing,
+    logger,
+    request_context_var,
+    request_id_var,
+    server_timing_var,
+)
+
+from .metrics import http_requests_in_flight, observe_request, route_template
+
+# Заголовок идентификатора запроса в формате ASGI
+_REQUEST_ID_HEADER: bytes = b"x-request-id"
+
+
+class RequestMiddleware:
+    """
+    ASGI middleware, объединяющий RequestIDMiddleware, TimingMiddleware и LoggingMiddleware в один проход.
+    Заголовки X-Request-ID, X-Process-Time и Server-Timing добавляются в сообщение http.response.start, поэтому
+    тело ответа, в том числе StreamingResponse, передается без промежуточной буферизации и дополнительных задач.
+
+    Этапы запроса собираются в ServerTiming: db - SQL запросы, handler - функция эндпоинта, serialize - валидация
+    response_model и приведение результата к JSON (см. instrument_route_timing), render - формирование тела
+    ответа (при маршрутах TimedRoute), а также этапы timing_span из кода приложения. Этапы выводятся в заголовке
+    Server-Timing и в логе завершения запроса.
+
+    Контекст запроса (RequestContext) доступен через get_request_context и добавляется во все записи лога
+    на время обработки запроса.
+
+    На запрос пишется одна запись лога после отправки ответа. Успешные запросы попадают в лог с долей sample_rate
+    (для маршрутов из route_sample_rates - с долей маршрута), ответы 5xx, исключения и медленные запросы - всегда.
+    Адрес запроса и остальные поля записи вычисляются, только если запись будет записана.
+
+    При HTTP_METRICS_ENABLED время обработки, количество запросов, ошибок и запросов в обработке учитываются
+    в метриках с меткой шаблона маршрута независимо от доли логирования
+
+    :ivar app: ASGI приложение
+    :type app: ASGIApp
+    :ivar sample_rate: доля успешных запросов, попадающих в лог, от 0 до 1
+    :type sample_rate: float
+    :ivar route_sample_rates: доля успешных запросов, попадающих в лог, по шаблонам маршрутов
+    :type route_sample_rates: dict[str, float]
+
+    .. code-block:: python
+    >>> from fastapi import FastAPI
+    >>> from dh_platform.middleware import RequestMiddleware
+    >>>
+    >>> app: FastAPI = FastAPI()
+    >>> app.add_middleware(RequestMiddleware, sample_rate=0.01, route_sample_rates={"/payments/{payment_id}": 1.0})
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = base_settings.ACCESS_LOG_SAMPLE_RATE,
+        route_sample_rates: Mapping[str, float] | None = None,
+    ) -> None:
+        """
+        Инициализация middleware
+
+        :param app: ASGI приложение
+        :type app: ASGIApp
+        :param sample_rate: доля успешных запросов, попадающих в лог, от 0 до 1
+        :type sample_rate: float
+        :param route_sample_rates: доля успешных запросов, попадающих в лог, по шаблонам маршрутов.
+            None - ACCESS_LOG_ROUTE_SAMPLE_RATES
+        :type route_sample_rates: Mapping[str, float] | None
+        """
+        if route_sample_rates is None:
+            route_sample_rates = base_settings.ACCESS_LOG_ROUTE_SAMPLE_RATES
+
+        self.app: ASGIApp = app
+        self.sample_rate: float = sample_rate
+        self.route_sample_rates: dict[str, float] = dict(route_sample_rates)
+        self._log_all: bool = base_settings.DEBUG and base_settings.LOG_LEVEL == LogLevel.DEBUG
+        self._server_timing_header: bool = base_settings.SERVER_TIMING_HEADER
+        self._slow_threshold: float = base_settings.SLOW_REQUEST_THRESHOLD
+        self._metrics_enabled: bool = base_settings.HTTP_METRICS_ENABLED
+        self._in_flight = http_requests_in_flight.labels()
+
+        instrument_route_timing()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Обработка запроса
+
+        :param scope: параметры соединения
+        :type scope: Scope
+        :param receive: получение сообщений запроса
+        :type receive: Receive
+        :param send: отправка сообщений ответа
+        :type send: Send
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing: ServerTiming = ServerTiming()
+        start_time: float = timing.start
+        request_id: str = _request_id(scope)
+
+        # request.state.request_id и request.state.timer, как в RequestIDMiddleware и TimingMiddleware
+        state: dict = scope.setdefault("state", {})
+        state["request_id"] = request_id
+        state["timer"] = {"start": start_time}
+
+        status_code: int = 500
+        finished: bool = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, finished
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = self._response_start(message, request_id, timing)
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                await send(message)
+                finished = True
+                self._finish(scope, status_code, state["timer"], timing)
+                return
+
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        context_token = request_context_var.set(RequestContext(request_id, scope))
+        timing_token = server_timing_var.set(timing)
+        if self._metrics_enabled:
+            self._in_flight.inc()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            logger.error(
+                "Ошибка запроса",
+                extra={
+                    **_request_fields(scope),
+                    "route": route_template(scope),
+                    "error": str(e),
+                    "execution_time": f"{time.perf_counter() - start_time:.3f}s",
+                    **timing.as_dict(),
+                },
+                exc_info=True,
+            )
+            raise
+        finally:
+            server_timing_var.reset(timing_token)
+            request_context_var.reset(context_token)
+            request_id_var.reset(token)
+
+            if self._metrics_enabled:
+                self._in_flight.dec()
+                # Ответ не отправлен полностью: ошибка или разрыв соединения клиентом
+                if not finished:
+                    observe_request(
+                        scope["method"], route_template(scope), status_code, time.perf_counter() - start_time
+                    )
+
+    def _response_start(self, message: Message, request_id: str, timing: ServerTiming) -> Message:
+        """
+        Начало ответа с заголовками X-Request-ID, X-Process-Time и Server-Timing
+
+        :param message: сообщение http.response.start
+        :type message: Message
+        :param request_id: идентификатор запроса
+        :type request_id: str
+        :param timing: этапы запроса
+        :type timing: ServerTiming
+        :return: сообщение с добавленными заголовками
+        :rtype: Message
+        """
+        now: float = time.perf_counter()
+        headers: list[tuple[bytes, bytes]] = [
+            *message.get("headers", []),
+            (_REQUEST_ID_HEADER, request_id.encode(ENCODING)),
+            (b"x-process-time", f"{now - timing.start:.3f}".encode(ENCODING)),
+        ]
+        if self._server_timing_header:
+            headers.append((b"server-timing", timing.header(now - timing.start).encode(ENCODING)))
+
+        return {**message, "headers": headers}
+
+    def _finish(self, scope: Scope, status_code: int, timer: dict[str, float], timing: ServerTiming) -> None:
+        """
+        Учет в метриках и логирование завершения запроса после отправки последней части тела ответа
+
+        :param scope: параметры соединения
+        :type scope: Scope
+        :param status_code: код ответа
+        :type status_code: int
+        :param timer: время начала запроса, дополняется временем окончания и выполнения
+        :type timer: dict[str, float]
+        :param timing: этапы запроса
+        :type timing: ServerTiming
+        """
+        end_time: float = time.perf_counter()
+        execution_time: float = end_time - timer["start"]
+        timer["end"] = end_time
+        timer["execution_time"] = execution_time
+        route: str = route_template(scope)
+
+        if self._metrics_enabled:
+            observe_request(scope["method"], route, status_code, execution_time)
+
+        slow: bool = execution_time > self._slow_threshold
+
+        if status_code >= 500:
+            level: int = logging.ERROR
+            message: str = "Запрос завершен с ошибкой"
+        elif slow:
+            level = logging.WARNING
+            message = "Обнаружен медленный запрос"
+        elif self._log_all or random.random() < self.route_sample_rates.get(route, self.sample_rate):
+            level = logging.INFO
+            message = "Запрос завершен"
+        else:
+            return
+
+        if not logger.isEnabledFor(level):
+            return
+
+        extra: dict = {
+            **_request_fields(scope),
+            "route": route,
+            "status_code": status_code,
+            "execution_time": f"{execution_time:.3f}s",
+            **timing.as_dict(),
+        }
+        if slow:
+            extra["threshold"] = f"{self._slow_threshold}s"
+
+        logger.log(level, message, extra=extra)
+
+
+def _request_id(scope: Scope) -> str:
+    """
+    Идентификатор запроса из заголовка X-Request-ID или новый UUID
+
+    :param scope: параметры соединения
+    :type scope: Scope
+    :return: идентификатор запроса
+    :rtype: str
+    """
+    for name, value in scope["headers"]:
+        if name == _REQUEST_ID_HEADER and value:
+            return value.decode("latin-1")
+
+    return str(uuid.uuid4())
+
+
+def _request_fields(scope: Scope) -> dict[str, str]:
+    """
+    Поля запроса для записи лога
+
+    :param scope: параметры соединения
+    :type scope: Scope
+    :return: метод, адрес, адрес клиента и User-Agent
+    :rtype: dict[str, str]
+    """
+    client: tuple[str, int] | None = scope.get("client")
+    user_agent: str = ""
+
+    for name, value in scope["headers"]:
+        if name == b"user-agent":
+            user_agent = value.decode("latin-1")
+            break
+
+    return {
+        "method": scope["method"],
+        "url": str(URL(scope=scope)),
+        "client": client[0] if client else "Неизвестный",
+        "user_agent": user_agent,
+    }
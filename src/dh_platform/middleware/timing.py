@@ -58,16 +58,16 @@ class TimingMiddleware(BaseHTTPMiddleware):
         response.headers["X-Process-Time"] = f"{execution_time:.3f}"
 
         # Логируем медленные запросы
-        if execution_time > 1.0 or (
+        if execution_time > base_settings.SLOW_REQUEST_THRESHOLD or (
             base_settings.DEBUG and base_settings.LOG_LEVEL == LogLevel.DEBUG
-        ):  # Больше 1 секунды
+        ):
             logger.warning(
                 "Обнаружен медленный запрос",
                 extra={
                     "method": request.method,
                     "url": str(request.url),
                     "execution_time": f"{execution_time:.3f}s",
-                    "threshold": "1.0s",
+                    "threshold": f"{base_settings.SLOW_REQUEST_THRESHOLD}s",
                 },
             )
 
@@ -2,4 +2,7 @@
 
 __author__: str = "Старков Е.П."
 
-from .dependency import get_db
+from .dependency import db_lifespan, get_db, get_read_db, get_transaction_db, session_manager
+from .pagination import KeysetPaginator
+from .repository import Repository
+from .streaming import stream_query_response
@@ -0,0 +1,291 @@
+# pylint: disable=too-few-public-methods
+"""Модуль кеширования результатов запросов к БД"""
+
+__author__: str = "Старков Е.П."
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from collections.abc import Set as AbstractSet
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import FrozenResult, Result
+from sqlalchemy.orm import ORMExecuteState, Session, loading, object_mapper
+from sqlalchemy.sql.util import find_tables
+
+from dh_platform.consts.database import QUERY_CACHE_OPTION
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    """
+    Запись кеша
+
+    :ivar data: сериализованный замороженный результат запроса
+    :type data: bytes
+    :ivar tables: таблицы, участвующие в запросе
+    :type tables: frozenset[str]
+    :ivar expires_at: время (monotonic) истечения записи
+    :type expires_at: float
+    """
+
+    data: bytes
+    tables: frozenset[str]
+    expires_at: float
+
+
+class QueryCache:
+    """
+    Кеш результатов запросов с вытеснением по LRU и времени жизни. Ключ строится по ключу кеша компиляции
+    SQLAlchemy и значениям параметров. Результаты хранятся сериализованными, поэтому каждое чтение получает
+    собственные копии ORM объектов, не связанные с сессией, заполнившей кеш. Записи инвалидируются при фиксации
+    транзакции, изменившей таблицы запроса. Кеш локален для процесса: изменения, сделанные другими процессами,
+    становятся видны по истечении TTL
+
+    :ivar _max_size: максимальное количество записей
+    :type _max_size: int
+    :ivar _default_ttl: время жизни записи по умолчанию в секундах
+    :type _default_ttl: float
+    :ivar _entries: записи кеша в порядке использования
+    :type _entries: OrderedDict[Hashable, _CacheEntry]
+    :ivar _keys_by_table: ключи записей по таблицам
+    :type _keys_by_table: dict[str, set[Hashable]]
+    :ivar hits: количество попаданий в кеш
+    :type hits: int
+    :ivar misses: количество промахов
+    :type misses: int
+    """
+
+    def __init__(self, max_size: int = 1024, default_ttl: float = 60) -> None:
+        """
+        Инициализация кеша
+
+        :param max_size: максимальное количество записей
+        :type max_size: int
+        :param default_ttl: время жизни записи по умолчанию в секундах
+        :type default_ttl: float
+        """
+        self._max_size: int = max_size
+        self._default_ttl: float = default_ttl
+        self._entries: OrderedDict[Hashable, _CacheEntry] = OrderedDict()
+        self._keys_by_table: dict[str, set[Hashable]] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def default_ttl(self) -> float:
+        """Время жизни записи по умолчанию в секундах"""
+        return self._default_ttl
+
+    def get(self, key: Hashable) -> FrozenResult | None:
+        """
+        Получение результата из кеша
+
+        :param key: ключ запроса
+        :type key: Hashable
+        :return: копия результата или None, если его нет или время жизни истекло
+        :rtype: FrozenResult | None
+        """
+        with self._lock:
+            entry: _CacheEntry | None = self._entries.get(key)
+
+            if entry is None or entry.expires_at <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            data: bytes = entry.data
+
+        return pickle.loads(data)
+
+    def put(self, key: Hashable, result: FrozenResult, tables: frozenset[str], ttl: float | None = None) -> None:
+        """
+        Сохранение копии результата в кеш
+
+        :param key: ключ запроса
+        :type key: Hashable
+        :param result: замороженный результат запроса
+        :type result: FrozenResult
+        :param tables: таблицы, участвующие в запросе
+        :type tables: frozenset[str]
+        :param ttl: время жизни записи в секундах. По умолчанию - default_ttl
+        :type ttl: float | None
+        """
+        expires_at: float = time.monotonic() + (self._default_ttl if ttl is None else ttl)
+        data: bytes = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = _CacheEntry(data=data, tables=tables, expires_at=expires_at)
+            for table in tables:
+                self._keys_by_table.setdefault(table, set()).add(key)
+
+            while len(self._entries) > self._max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tables: AbstractSet[str]) -> None:
+        """
+        Удаление записей, использующих указанные таблицы
+
+        :param tables: названия таблиц
+        :type tables: AbstractSet[str]
+        """
+        with self._lock:
+            for table in tables:
+                for key in self._keys_by_table.pop(table, set()):
+                    self._remove(key)
+
+    def clear(self) -> None:
+        """Очистка кеша"""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable) -> None:
+        """
+        Удаление записи с очисткой индекса таблиц. Вызывается под блокировкой
+
+        :param key: ключ запроса
+        :type key: Hashable
+        """
+        entry: _CacheEntry | None = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        for table in entry.tables:
+            keys: set[Hashable] | None = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
+
+
+class CachedSession(Session):
+    """
+    Сессия с кешированием результатов запросов. Кешируются только запросы с опцией выполнения query_cache
+
+    :ivar query_cache: кеш результатов запросов
+    :type query_cache: QueryCache | None
+    :ivar changed_tables: таблицы, измененные в текущей транзакции
+    :type changed_tables: set[str]
+
+    .. code-block:: python
+    >>> from sqlalchemy import select
+    >>>
+    >>> # Результат кешируется на DB_QUERY_CACHE_TTL секунд
+    >>> countries = (await db.scalars(select(Country).execution_options(query_cache=True))).all()
+    >>> # Результат кешируется на 300 секунд
+    >>> currencies = (await db.scalars(select(Currency).execution_options(query_cache=300))).all()
+    """
+
+    def __init__(self, *args: Any, query_cache: QueryCache | None = None, **kwargs: Any) -> None:
+        """
+        Инициализация сессии
+
+        :param query_cache: кеш результатов запросов
+        :type query_cache: QueryCache | None
+        """
+        super().__init__(*args, **kwargs)
+        self.query_cache: QueryCache | None = query_cache
+        self.changed_tables: set[str] = set()
+
+
+def _statement_tables(statement: Any) -> frozenset[str]:
+    """
+    Названия таблиц, участвующих в запросе
+
+    :param statement: запрос
+    :type statement: Any
+    :return: названия таблиц
+    :rtype: frozenset[str]
+    """
+    return frozenset(table.fullname for table in find_tables(statement, check_columns=True, include_crud=True))
+
+
+def _cache_key(state: ORMExecuteState) -> Hashable | None:
+    """
+    Ключ кеша по ключу кеша компиляции SQLAlchemy и значениям параметров запроса. Запрос не компилируется:
+    ключ компиляции строится по структуре запроса, как для кеша скомпилированных запросов
+
+    :param state: состояние выполнения запроса
+    :type state: ORMExecuteState
+    :return: ключ или None, если запрос не может быть закеширован
+    :rtype: Hashable | None
+    """
+    if not isinstance(state.parameters, dict | None):
+        return None
+
+    # Тот же ключ, по которому SQLAlchemy кеширует скомпилированные запросы
+    cache_key = state.statement._generate_cache_key()  # pylint: disable=protected-access
+    if cache_key is None:
+        return None
+
+    # Значения параметров могут быть нехешируемыми (списки для IN), поэтому в ключ входит их представление
+    values: list[Any] = [bind.effective_value for bind in cache_key.bindparams]
+    params: list[tuple[str, Any]] = sorted((state.parameters or {}).items())
+
+    return cache_key.key, repr(values), repr(params)
+
+
+@event.listens_for(CachedSession, "do_orm_execute")
+def _on_execute(state: ORMExecuteState) -> Result | None:
+    """Выдача результатов из кеша и учет таблиц, изменяемых запросами DML"""
+    session: CachedSession = state.session
+
+    if state.is_insert or state.is_update or state.is_delete:
+        session.changed_tables.update(_statement_tables(state.statement))
+        return None
+
+    ttl: bool | float | None = state.execution_options.get(QUERY_CACHE_OPTION)
+    if not state.is_select or session.query_cache is None or ttl is None or ttl is False:
+        return None
+
+    tables: frozenset[str] = _statement_tables(state.statement)
+    # Таблицы, измененные в незафиксированной транзакции, читаются мимо кеша
+    if tables & session.changed_tables or (key := _cache_key(state)) is None:
+        return None
+
+    frozen: FrozenResult | None = session.query_cache.get(key)
+    if frozen is None:
+        frozen = state.invoke_statement().freeze()
+        session.query_cache.put(key, frozen, tables, None if ttl is True else float(ttl))
+        # Объекты результата уже принадлежат текущей сессии, в кеше хранится их копия
+        return frozen()
+
+    # Копии объектов из кеша не изменялись и не связаны с сессиями, поэтому добавляются без загрузки из БД
+    return loading.merge_frozen_result(session, state.statement, frozen, load=False)()
+
+
+@event.listens_for(CachedSession, "after_flush")
+def _on_flush(session: CachedSession, _flush_context: Any) -> None:
+    """Учет таблиц, измененных при сохранении ORM объектов"""
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        session.changed_tables.update(table.fullname for table in object_mapper(instance).tables)
+
+
+@event.listens_for(CachedSession, "after_commit")
+def _on_commit(session: CachedSession) -> None:
+    """Инвалидация записей кеша по таблицам, измененным в зафиксированной транзакции"""
+    if session.changed_tables and session.query_cache is not None:
+        session.query_cache.invalidate(session.changed_tables)
+
+    session.changed_tables = set()
+
+
+@event.listens_for(CachedSession, "after_rollback")
+def _on_rollback(session: CachedSession) -> None:
+    """Сброс таблиц, изменения которых отменены"""
+    session.changed_tables = set()
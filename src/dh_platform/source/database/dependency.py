@@ -2,14 +2,42 @@
 
 __author__: str = "Старков Е.П."
 
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
 
+from fastapi import FastAPI
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from dh_platform.config import base_settings
 from dh_platform.source.database.session_manager import DatabaseSessionManager
 
-session_manager: DatabaseSessionManager = DatabaseSessionManager(base_settings.DATABASE_URL)
+# Подключения к БД создаются при первом обращении или в db_lifespan
+session_manager: DatabaseSessionManager = DatabaseSessionManager(
+    base_settings.DATABASE_URL, base_settings.DATABASE_REPLICA_URLS
+)
+
+
+@asynccontextmanager
+async def db_lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """
+    Lifespan приложения для подключения к БД: создает подключения и открывает DB_POOL_WARMUP соединений при запуске,
+    закрывает подключения при остановке
+
+    :param _app: экземпляр приложения
+    :type _app: FastAPI
+
+    .. code-block:: python
+    >>> from fastapi import FastAPI
+    >>> from dh_platform.source.database import db_lifespan
+    >>>
+    >>> app: FastAPI = FastAPI(lifespan=db_lifespan)
+    """
+    await session_manager.start(warmup=base_settings.DB_POOL_WARMUP)
+
+    try:
+        yield
+    finally:
+        await session_manager.connection_close()
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -26,3 +54,38 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     async with session_manager.get_session() as session:
         yield session
+
+
+async def get_transaction_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI dependency для получения асинхронной сессии БД с одной транзакцией на запрос. Транзакция фиксируется
+    после успешного выполнения эндпоинта и откатывается при ошибке, commit в эндпоинте не требуется
+
+    :return: генератор асинхронной сессии подключения к БД
+
+    .. code-block:: python
+    >>> from dh_platform.source.database import get_transaction_db
+    >>>
+    >>> @app.post("/orders")
+    >>> async def create_order(data: OrderData, db: AsyncSession = Depends(get_transaction_db)):
+    >>>     db.add(Order(**data.model_dump()))
+    """
+    async with session_manager.get_transaction_session() as session:
+        yield session
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI dependency для получения асинхронной сессии БД только для чтения. Запросы выполняются на репликах из
+    DATABASE_REPLICA_URLS, при их недоступности - на основной БД
+
+    :return: генератор асинхронной сессии подключения к БД
+
+    .. code-block:: python
+    >>> from dh_platform.source.database import get_read_db
+    >>>
+    >>> async def endpoint(db: AsyncSession = Depends(get_read_db)):
+    >>>     ...
+    """
+    async with session_manager.get_read_session() as session:
+        yield session
@@ -0,0 +1,139 @@
+"""Модуль метрик пула соединений с БД"""
+
+__author__: str = "Старков Е.П."
+
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, Pool
+
+from dh_platform.utils import Counter, Gauge, Histogram, log_buckets, metrics_registry
+
+# Ключ времени установки соединения в ConnectionPoolEntry.info
+_CONNECTED_AT_KEY: str = "dh_connected_at"
+
+pool_checkout_wait: Histogram = metrics_registry.register(
+    Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Время ожидания соединения из пула",
+        ["pool"],
+        buckets=log_buckets(0.0005, 2, 16),
+    )
+)
+pool_checkouts: Counter = metrics_registry.register(
+    Counter("db_pool_checkouts_total", "Количество выдач соединений из пула", ["pool"])
+)
+pool_connections_created: Counter = metrics_registry.register(
+    Counter("db_pool_connections_created_total", "Количество установленных соединений с БД", ["pool"])
+)
+pool_invalidations: Counter = metrics_registry.register(
+    Counter("db_pool_invalidations_total", "Количество инвалидированных соединений", ["pool", "soft"])
+)
+pool_connection_lifetime: Histogram = metrics_registry.register(
+    Histogram(
+        "db_pool_connection_lifetime_seconds",
+        "Время жизни закрытых соединений с БД",
+        ["pool"],
+        buckets=log_buckets(1, 2, 16),
+    )
+)
+pool_size: Gauge = metrics_registry.register(Gauge("db_pool_size", "Размер пула соединений", ["pool"]))
+pool_checked_out: Gauge = metrics_registry.register(
+    Gauge("db_pool_checked_out", "Количество соединений, выданных из пула", ["pool"])
+)
+pool_overflow: Gauge = metrics_registry.register(
+    Gauge("db_pool_overflow", "Количество открытых соединений сверх размера пула", ["pool"])
+)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений с замером времени ожидания соединения. В SQLAlchemy нет события перед выдачей соединения,
+    поэтому время ожидания измеряется вокруг получения соединения из очереди пула
+
+    :ivar metrics_name: название пула в метках метрик
+    :type metrics_name: str
+    """
+
+    metrics_name: str = "default"
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        """Получение соединения из пула с замером времени ожидания"""
+        start: float = time.perf_counter()
+
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.labels(self.metrics_name).observe(time.perf_counter() - start)
+
+    def recreate(self) -> "InstrumentedAsyncQueuePool":
+        """Пересоздание пула (engine.dispose) с сохранением названия пула"""
+        pool: InstrumentedAsyncQueuePool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def instrument_pool(engine: AsyncEngine, name: str) -> None:
+    """
+    Подключение метрик к пулу соединений
+
+    :param engine: подключение к БД
+    :type engine: AsyncEngine
+    :param name: название пула в метках метрик
+    :type name: str
+
+    .. code-block:: python
+    >>> from sqlalchemy.ext.asyncio import create_async_engine
+    >>> from dh_platform.source.database.metrics import InstrumentedAsyncQueuePool, instrument_pool
+    >>>
+    >>> engine = create_async_engine("postgresql+asyncpg://host/db", poolclass=InstrumentedAsyncQueuePool)
+    >>> instrument_pool(engine, "primary")
+    """
+    pool: Pool = engine.sync_engine.pool
+
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        pool.metrics_name = name
+
+    checkouts = pool_checkouts.labels(name)
+    created = pool_connections_created.labels(name)
+    lifetime = pool_connection_lifetime.labels(name)
+
+    # Пул пересоздается при engine.dispose, поэтому показатели читаются из текущего пула подключения:
+    # lambda нужна для позднего связывания, ссылка на метод pool.size указывала бы на старый пул
+    if hasattr(pool, "size"):
+        pool_size.labels(name).set_function(
+            lambda: engine.sync_engine.pool.size()  # pylint: disable=unnecessary-lambda
+        )
+    if hasattr(pool, "checkedout"):
+        pool_checked_out.labels(name).set_function(
+            lambda: engine.sync_engine.pool.checkedout()  # pylint: disable=unnecessary-lambda
+        )
+    if hasattr(pool, "overflow"):
+        # overflow() отрицателен, пока пул не заполнен
+        pool_overflow.labels(name).set_function(lambda: max(0, engine.sync_engine.pool.overflow()))
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(_dbapi_connection: Any, record: ConnectionPoolEntry) -> None:
+        record.info[_CONNECTED_AT_KEY] = time.monotonic()
+        created.inc()
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(_dbapi_connection: Any, _record: ConnectionPoolEntry, _proxy: Any) -> None:
+        checkouts.inc()
+
+    @event.listens_for(pool, "close")
+    def _on_close(_dbapi_connection: Any, record: ConnectionPoolEntry) -> None:
+        if (connected_at := record.info.pop(_CONNECTED_AT_KEY, None)) is not None:
+            lifetime.observe(time.monotonic() - connected_at)
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(_dbapi_connection: Any, _record: ConnectionPoolEntry, _exception: BaseException | None) -> None:
+        pool_invalidations.labels(name, "false").inc()
+
+    @event.listens_for(pool, "soft_invalidate")
+    def _on_soft_invalidate(
+        _dbapi_connection: Any, _record: ConnectionPoolEntry, _exception: BaseException | None
+    ) -> None:
+        pool_invalidations.labels(name, "true").inc()
@@ -0,0 +1,234 @@
+"""Модуль постраничной навигации по курсору (keyset pagination)"""
+
+__author__: str = "Старков Е.П."
+
+import uuid
+from collections.abc import Callable
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import ColumnElement, Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from dh_platform.consts import MAX_NAV_LIMIT
+from dh_platform.entities.models import BaseModel
+from dh_platform.entities.schemas import CursorPageSchema
+from dh_platform.excerptions import ValidationException
+from dh_platform.utils import decode_cursor, encode_cursor
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Разбор значений курсора, записанных JSONEncoder строкой, по типам колонок. datetime проверяется раньше date
+_CURSOR_PARSERS: tuple[tuple[type, Callable[[Any], Any]], ...] = (
+    (datetime, datetime.fromisoformat),
+    (date, date.fromisoformat),
+    (uuid.UUID, uuid.UUID),
+    (Decimal, lambda value: Decimal(str(value))),
+)
+
+# Направления курсора: следующая и предыдущая страница
+_NEXT: str = "n"
+_PREV: str = "p"
+
+
+class KeysetPaginator(Generic[ModelT]):
+    """
+    Постраничная навигация по курсору. Вместо OFFSET строит условие WHERE (колонка, ID) > (...), поэтому стоимость
+    получения любой страницы одинакова при наличии индекса по (колонка, ID)
+
+    :ivar _model: модель сущности
+    :type _model: type[ModelT]
+    :ivar _column: колонка сортировки
+    :type _column: InstrumentedAttribute
+    :ivar _descending: сортировка по убыванию
+    :type _descending: bool
+
+    .. code-block:: python
+    >>> from dh_platform.source.database import KeysetPaginator, get_read_db
+    >>> from dh_platform.utils import get_cursor_pagination_params
+    >>>
+    >>> paginator: KeysetPaginator[User] = KeysetPaginator(User, order_by="created_at", descending=True)
+    >>>
+    >>> @app.get("/users")
+    >>> async def list_users(nav=Depends(get_cursor_pagination_params), db=Depends(get_read_db)):
+    >>>     return await paginator.paginate(db, cursor=nav["cursor"], limit=nav["limit"])
+    """
+
+    def __init__(self, model: type[ModelT], order_by: str = "ID", descending: bool = False) -> None:
+        """
+        Инициализация навигации
+
+        :param model: модель сущности
+        :type model: type[ModelT]
+        :param order_by: колонка сортировки: ID, created_at (TimestampMixin), order (OrderMixin) или любая другая
+        :type order_by: str
+        :param descending: сортировка по убыванию
+        :type descending: bool
+        """
+        self._model: type[ModelT] = model
+        self._order_by: str = order_by
+        self._column: InstrumentedAttribute = getattr(model, order_by)
+        self._descending: bool = descending
+
+    def build_statement(self, statement: Select | None = None, cursor: str | None = None, limit: int = 100) -> Select:
+        """
+        Построение запроса страницы. Запрос выбирает на одну запись больше limit для определения наличия
+        следующей страницы
+
+        :param statement: базовый запрос с фильтрами. По умолчанию - все записи модели
+        :type statement: Select | None
+        :param cursor: курсор страницы
+        :type cursor: str | None
+        :param limit: размер страницы, от 1 до MAX_NAV_LIMIT
+        :type limit: int
+        :return: запрос страницы
+        :rtype: Select
+        """
+        direction, values = self._parse_cursor(cursor)
+        return self._build(statement, direction, values, min(MAX_NAV_LIMIT, max(1, limit)))
+
+    async def paginate(
+        self,
+        session: AsyncSession,
+        statement: Select | None = None,
+        cursor: str | None = None,
+        limit: int = MAX_NAV_LIMIT,
+    ) -> CursorPageSchema:
+        """
+        Получение страницы записей
+
+        :param session: сессия БД
+        :type session: AsyncSession
+        :param statement: базовый запрос с фильтрами. По умолчанию - все записи модели
+        :type statement: Select | None
+        :param cursor: курсор страницы
+        :type cursor: str | None
+        :param limit: размер страницы, от 1 до MAX_NAV_LIMIT
+        :type limit: int
+        :return: страница с курсорами следующей и предыдущей страниц
+        :rtype: CursorPageSchema
+        """
+        limit = min(MAX_NAV_LIMIT, max(1, limit))
+        direction, values = self._parse_cursor(cursor)
+        rows: list[ModelT] = list((await session.scalars(self._build(statement, direction, values, limit))).all())
+
+        has_more: bool = len(rows) > limit
+        rows = rows[:limit]
+
+        next_cursor: str | None = None
+        prev_cursor: str | None = None
+
+        if direction == _PREV:
+            rows.reverse()
+            if rows:
+                next_cursor = self._encode(_NEXT, rows[-1])
+                prev_cursor = self._encode(_PREV, rows[0]) if has_more else None
+        elif rows:
+            next_cursor = self._encode(_NEXT, rows[-1]) if has_more else None
+            prev_cursor = self._encode(_PREV, rows[0]) if cursor else None
+
+        return CursorPageSchema(items=rows, next_cursor=next_cursor, prev_cursor=prev_cursor, limit=limit)
+
+    def _build(self, statement: Select | None, direction: str, values: list[Any] | None, limit: int) -> Select:
+        """
+        Построение запроса страницы по разобранному курсору
+
+        :param statement: базовый запрос
+        :type statement: Select | None
+        :param direction: направление навигации
+        :type direction: str
+        :param values: значения курсора
+        :type values: list[Any] | None
+        :param limit: размер страницы
+        :type limit: int
+        :return: запрос страницы
+        :rtype: Select
+        """
+        statement = statement if statement is not None else select(self._model)
+        # При движении назад сортировка и сравнение инвертируются, результат разворачивается в paginate
+        descending: bool = self._descending != (direction == _PREV)
+        keys: list[InstrumentedAttribute] = self._keys()
+
+        if values is not None:
+            left: ColumnElement = keys[0] if len(keys) == 1 else tuple_(*keys)
+            right: Any = values[0] if len(keys) == 1 else tuple_(*values)
+            statement = statement.where(left < right if descending else left > right)
+
+        return statement.order_by(*(key.desc() if descending else key.asc() for key in keys)).limit(limit + 1)
+
+    def _keys(self) -> list[InstrumentedAttribute]:
+        """Колонки ключа навигации. ID добавляется для уникальности порядка"""
+        if self._order_by == "ID":
+            return [self._model.ID]
+
+        return [self._column, self._model.ID]
+
+    def _encode(self, direction: str, row: ModelT) -> str:
+        """
+        Создание курсора по записи
+
+        :param direction: направление навигации
+        :type direction: str
+        :param row: запись, от которой строится курсор
+        :type row: ModelT
+        :return: курсор
+        :rtype: str
+        """
+        values: list[Any] = [getattr(row, key.key) for key in self._keys()]
+        # Decimal записывается строкой: JSONEncoder приводит его к float с потерей точности
+        return encode_cursor([direction, *(str(value) if isinstance(value, Decimal) else value for value in values)])
+
+    def _parse_cursor(self, cursor: str | None) -> tuple[str, list[Any] | None]:
+        """
+        Разбор курсора с приведением значений к типам колонок
+
+        :param cursor: курсор
+        :type cursor: str | None
+        :return: направление навигации и значения ключа
+        :rtype: tuple[str, list[Any] | None]
+        :raises ValidationException: курсор поврежден или создан для другой сортировки
+        """
+        if not cursor:
+            return _NEXT, None
+
+        keys: list[InstrumentedAttribute] = self._keys()
+
+        try:
+            direction, *raw_values = decode_cursor(cursor)
+            if direction not in (_NEXT, _PREV) or len(raw_values) != len(keys):
+                raise ValueError("Некорректный курсор")
+
+            values: list[Any] = [self._to_python(key, value) for key, value in zip(keys, raw_values)]
+        except (TypeError, ValueError) as ex:
+            raise ValidationException({"cursor": str(ex)}) from ex
+
+        return direction, values
+
+    @staticmethod
+    def _to_python(key: InstrumentedAttribute, value: Any) -> Any:
+        """
+        Приведение значения из JSON к типу колонки
+
+        :param key: колонка
+        :type key: InstrumentedAttribute
+        :param value: значение из курсора
+        :type value: Any
+        :return: значение для сравнения в запросе
+        :rtype: Any
+        """
+        try:
+            python_type: type = key.type.python_type
+        except NotImplementedError:
+            python_type = object
+
+        # Для типов без python_type (пользовательские типы колонок) значение передается как есть
+        if value is None or python_type is object:
+            return value
+
+        for base, parse in _CURSOR_PARSERS:
+            if issubclass(python_type, base):
+                return parse(value)
+
+        return python_type(value)
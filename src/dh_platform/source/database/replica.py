@@ -0,0 +1,120 @@
+"""Модуль распределения запросов на чтение между репликами БД"""
+
+__author__: str = "Старков Е.П."
+
+import itertools
+import time
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from dh_platform.consts.database import ReplicaBalanceStrategy
+
+
+class ReplicaBalancer:
+    """
+    Балансировщик подключений к репликам БД
+
+    :ivar _engines: подключения к репликам
+    :type _engines: list[AsyncEngine]
+    :ivar _strategy: стратегия выбора реплики
+    :type _strategy: ReplicaBalanceStrategy
+    :ivar _retry_interval: время в секундах, на которое недоступная реплика исключается из выбора
+    :type _retry_interval: float
+    :ivar _down_until: время (monotonic), до которого реплика считается недоступной
+    :type _down_until: dict[AsyncEngine, float]
+
+    .. code-block:: python
+    >>> from sqlalchemy.ext.asyncio import create_async_engine
+    >>> from dh_platform.source.database.replica import ReplicaBalancer
+    >>>
+    >>> balancer: ReplicaBalancer = ReplicaBalancer(
+    >>>     [
+    >>>         create_async_engine("postgresql+asyncpg://replica1/db"),
+    >>>         create_async_engine("postgresql+asyncpg://replica2/db"),
+    >>>     ]
+    >>> )
+    >>> for engine in balancer.candidates():
+    >>>     ...
+    """
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        strategy: ReplicaBalanceStrategy = ReplicaBalanceStrategy.ROUND_ROBIN,
+        retry_interval: float = 30,
+    ) -> None:
+        """
+        Инициализация балансировщика
+
+        :param engines: подключения к репликам
+        :type engines: list[AsyncEngine]
+        :param strategy: стратегия выбора реплики
+        :type strategy: ReplicaBalanceStrategy
+        :param retry_interval: время в секундах, на которое недоступная реплика исключается из выбора
+        :type retry_interval: float
+        """
+        self._engines: list[AsyncEngine] = engines
+        self._strategy: ReplicaBalanceStrategy = strategy
+        self._retry_interval: float = retry_interval
+        self._down_until: dict[AsyncEngine, float] = {}
+        self._counter: itertools.count = itertools.count()
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        """Все подключения к репликам"""
+        return self._engines
+
+    def candidates(self) -> list[AsyncEngine]:
+        """
+        Реплики в порядке попыток подключения согласно стратегии. Недоступные реплики пропускаются
+
+        :return: список доступных реплик
+        :rtype: list[AsyncEngine]
+        """
+        now: float = time.monotonic()
+        alive: list[AsyncEngine] = [engine for engine in self._engines if self._down_until.get(engine, 0.0) <= now]
+
+        if not alive:
+            return []
+
+        if self._strategy == ReplicaBalanceStrategy.LEAST_CONNECTIONS:
+            return sorted(alive, key=self._checked_out)
+
+        shift: int = next(self._counter) % len(alive)
+        return alive[shift:] + alive[:shift]
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        """
+        Пометка реплики недоступной на время retry_interval
+
+        :param engine: подключение к реплике
+        :type engine: AsyncEngine
+        """
+        self._down_until[engine] = time.monotonic() + self._retry_interval
+
+    def mark_up(self, engine: AsyncEngine) -> None:
+        """
+        Пометка реплики доступной
+
+        :param engine: подключение к реплике
+        :type engine: AsyncEngine
+        """
+        self._down_until.pop(engine, None)
+
+    async def dispose(self) -> None:
+        """Закрытие подключений ко всем репликам"""
+        for engine in self._engines:
+            await engine.dispose()
+
+    @staticmethod
+    def _checked_out(engine: AsyncEngine) -> int:
+        """
+        Количество занятых соединений пула реплики
+
+        :param engine: подключение к реплике
+        :type engine: AsyncEngine
+        :return: количество соединений, выданных из пула
+        :rtype: int
+        """
+        checked_out = getattr(engine.sync_engine.pool, "checkedout", None)
+        return checked_out() if checked_out else 0
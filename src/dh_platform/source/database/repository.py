@@ -0,0 +1,215 @@
+"""Модуль базового репозитория сущностей"""
+
+__author__: str = "Старков Е.П."
+
+import uuid
+from collections.abc import Callable
+from typing import ClassVar, Generic, TypeVar
+
+from sqlalchemy import ColumnElement, Executable, bindparam, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dh_platform.entities.models import ActiveMixin, BaseModel, SoftDeleteMixin
+from dh_platform.excerptions import NotFoundException, ValidationException
+from dh_platform.utils import get_pagination_params
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class Repository(Generic[ModelT]):
+    """
+    Базовый репозиторий с типовыми операциями над сущностями. Запросы строятся один раз на модель и режим
+    фильтрации и переиспользуются с параметрами, поэтому ключ кеша компиляции SQLAlchemy не пересчитывается
+    на каждом запросе.
+
+    Для моделей с SoftDeleteMixin удаленные записи исключаются из выборок, а delete выполняет мягкое удаление.
+    Для моделей с ActiveMixin при only_active=True исключаются деактивированные записи.
+
+    :cvar _statements: кеш построенных запросов: (модель, операция, with_deleted, only_active) -> запрос
+    :type _statements: dict[tuple[type[BaseModel], str, bool, bool], Executable]
+    :ivar model: модель сущности
+    :type model: type[ModelT]
+    :ivar session: сессия БД
+    :type session: AsyncSession
+
+    .. code-block:: python
+    >>> from dh_platform.source.database import Repository, get_db
+    >>>
+    >>> @app.get("/users/{user_id}")
+    >>> async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
+    >>>     return await Repository(User, db).get_or_raise(user_id)
+    >>>
+    >>> # Собственный репозиторий с дополнительными запросами
+    >>> class UserRepository(Repository[User]):
+    >>>     def __init__(self, session: AsyncSession):
+    >>>         super().__init__(User, session)
+    """
+
+    _statements: ClassVar[dict[tuple[type[BaseModel], str, bool, bool], Executable]] = {}
+
+    def __init__(
+        self,
+        model: type[ModelT],
+        session: AsyncSession,
+        with_deleted: bool = False,
+        only_active: bool = False,
+    ) -> None:
+        """
+        Инициализация репозитория
+
+        :param model: модель сущности
+        :type model: type[ModelT]
+        :param session: сессия БД
+        :type session: AsyncSession
+        :param with_deleted: включать в выборки мягко удаленные записи (SoftDeleteMixin)
+        :type with_deleted: bool
+        :param only_active: исключать из выборок деактивированные записи (ActiveMixin)
+        :type only_active: bool
+        """
+        self.model: type[ModelT] = model
+        self.session: AsyncSession = session
+        self._with_deleted: bool = with_deleted
+        self._only_active: bool = only_active
+
+    async def get(self, entity_id: int) -> ModelT | None:
+        """
+        Получение записи по ID
+
+        :param entity_id: идентификатор записи
+        :type entity_id: int
+        :return: запись или None, если не найдена
+        :rtype: ModelT | None
+        """
+        statement: Executable = self._statement("get", self._build_get)
+        return (await self.session.scalars(statement, {"entity_id": entity_id})).first()
+
+    async def get_or_raise(self, entity_id: int) -> ModelT:
+        """
+        Получение записи по ID с ошибкой при отсутствии
+
+        :param entity_id: идентификатор записи
+        :type entity_id: int
+        :return: запись
+        :rtype: ModelT
+        :raises NotFoundException: запись не найдена
+        """
+        if (entity := await self.get(entity_id)) is None:
+            raise NotFoundException({"ID": entity_id})
+
+        return entity
+
+    async def get_list(self, skip: int = 0, limit: int = 100) -> list[ModelT]:
+        """
+        Получение списка записей, упорядоченного по ID
+
+        :param skip: с какой записи нужно начать вычитывание
+        :type skip: int
+        :param limit: сколько записей нужно вычитать. Не более MAX_NAV_LIMIT
+        :type limit: int
+        :return: список записей
+        :rtype: list[ModelT]
+        """
+        statement: Executable = self._statement("get_list", self._build_list)
+        return list((await self.session.scalars(statement, get_pagination_params(skip, limit))).all())
+
+    async def count(self) -> int:
+        """
+        Количество записей
+
+        :return: количество записей с учетом фильтров репозитория
+        :rtype: int
+        """
+        statement: Executable = self._statement("count", self._build_count)
+        return (await self.session.execute(statement)).scalar_one()
+
+    async def delete(self, entity_id: int, deleted_by: uuid.UUID | None = None) -> bool:
+        """
+        Удаление записи по ID. Для моделей с SoftDeleteMixin выполняется мягкое удаление
+
+        :param entity_id: идентификатор записи
+        :type entity_id: int
+        :param deleted_by: автор удаления. Обязателен для моделей с SoftDeleteMixin
+        :type deleted_by: uuid.UUID | None
+        :return: запись была удалена
+        :rtype: bool
+        :raises ValidationException: не передан автор мягкого удаления
+        """
+        if not self._soft_delete:
+            statement: Executable = self._statement("delete", self._build_delete)
+            return (await self.session.execute(statement, {"entity_id": entity_id})).rowcount > 0
+
+        if deleted_by is None:
+            raise ValidationException({"deleted_by": "Не указан автор удаления"})
+
+        statement = self._statement("soft_delete", self._build_soft_delete)
+        return (await self.session.execute(statement, {"entity_id": entity_id, "deleter": deleted_by})).rowcount > 0
+
+    @property
+    def _soft_delete(self) -> bool:
+        """Модель поддерживает мягкое удаление"""
+        return issubclass(self.model, SoftDeleteMixin)
+
+    def _statement(self, operation: str, builder: Callable[[], Executable]) -> Executable:
+        """
+        Получение запроса из кеша с построением при первом обращении
+
+        :param operation: название операции
+        :type operation: str
+        :param builder: функция построения запроса
+        :type builder: Callable[[], Executable]
+        :return: запрос
+        :rtype: Executable
+        """
+        key: tuple[type[BaseModel], str, bool, bool] = (self.model, operation, self._with_deleted, self._only_active)
+
+        if (statement := self._statements.get(key)) is None:
+            statement = self._statements[key] = builder()
+
+        return statement
+
+    def _filters(self) -> list[ColumnElement[bool]]:
+        """Условия отбора записей по миксинам модели"""
+        filters: list[ColumnElement[bool]] = []
+
+        if self._soft_delete and not self._with_deleted:
+            filters.append(self.model.deleted_at.is_(None))
+
+        if self._only_active and issubclass(self.model, ActiveMixin):
+            filters.append(self.model.deactivated_at.is_(None))
+
+        return filters
+
+    def _build_get(self) -> Executable:
+        """Запрос получения записи по ID"""
+        return select(self.model).where(self.model.ID == bindparam("entity_id"), *self._filters()).limit(1)
+
+    def _build_list(self) -> Executable:
+        """Запрос получения списка записей"""
+        return (
+            select(self.model)
+            .where(*self._filters())
+            .order_by(self.model.ID)
+            .offset(bindparam("skip"))
+            .limit(bindparam("limit"))
+        )
+
+    def _build_count(self) -> Executable:
+        """Запрос количества записей"""
+        return select(func.count()).select_from(self.model).where(*self._filters())
+
+    def _build_delete(self) -> Executable:
+        """Запрос удаления записи"""
+        return (
+            delete(self.model)
+            .where(self.model.ID == bindparam("entity_id"))
+            .execution_options(synchronize_session=False)
+        )
+
+    def _build_soft_delete(self) -> Executable:
+        """Запрос мягкого удаления записи"""
+        return (
+            update(self.model)
+            .where(self.model.ID == bindparam("entity_id"), self.model.deleted_at.is_(None))
+            .values(deleted_at=func.now(), deleted_by=bindparam("deleter"))
+            .execution_options(synchronize_session=False)
+        )
@@ -2,46 +2,194 @@
 
 __author__: str = "Старков Е.П."
 
+import asyncio
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
 from pydantic import PostgresDsn
-from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from dh_platform.config import base_settings
+from dh_platform.utils import logger
+
+from .cache import CachedSession, QueryCache
+from .metrics import InstrumentedAsyncQueuePool, instrument_pool
+from .replica import ReplicaBalancer
+from .slow_query import SlowQueryDetector
+from .timing import install_query_timing
 
 
 class DatabaseSessionManager:
     """
-    Класс для работы с сессиями подключений к БД
+    Класс для работы с сессиями подключений к БД. Подключения создаются при первом обращении или при вызове start,
+    поэтому создание менеджера не требует доступа к БД
 
+    :ivar _url: адрес для подключения к БД
+    :type _url: PostgresDsn
+    :ivar _replica_urls: адреса подключения к репликам БД
+    :type _replica_urls: list[PostgresDsn]
     :ivar _engine: подключение к БД
-    :type _engine: AsyncEngine
+    :type _engine: AsyncEngine | None
+    :ivar _read_engine: подключение к основной БД в режиме только для чтения
+    :type _read_engine: AsyncEngine | None
+    :ivar _replicas: балансировщик подключений к репликам
+    :type _replicas: ReplicaBalancer | None
+    :ivar query_cache: кеш результатов запросов. Включается настройкой DB_QUERY_CACHE_ENABLED
+    :type query_cache: QueryCache | None
     :ivar _async_session: менеджер асинхронных сессий
-    :type _async_session: async_sessionmaker[AsyncSession]
+    :type _async_session: async_sessionmaker[AsyncSession] | None
     """
 
-    def __init__(self, url: PostgresDsn) -> None:
+    def __init__(self, url: PostgresDsn, replica_urls: list[PostgresDsn] | None = None) -> None:
         """
         Инициализация класса работы с сессиями БД
 
         :param url: адрес для подключения к БД
         :type url: PostgresDsn
+        :param replica_urls: адреса подключения к репликам БД для запросов на чтение
+        :type replica_urls: list[PostgresDsn] | None
+        """
+        self._url: PostgresDsn = url
+        self._replica_urls: list[PostgresDsn] = list(replica_urls or [])
+
+        self._engine: AsyncEngine | None = None
+        self._read_engine: AsyncEngine | None = None
+        self._replicas: ReplicaBalancer | None = None
+        self._async_session: async_sessionmaker[AsyncSession] | None = None
+
+        self.query_cache: QueryCache | None = None
+        if base_settings.DB_QUERY_CACHE_ENABLED:
+            self.query_cache = QueryCache(
+                max_size=base_settings.DB_QUERY_CACHE_SIZE, default_ttl=base_settings.DB_QUERY_CACHE_TTL
+            )
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """Подключение к основной БД"""
+        if self._engine is None:
+            self._initialize()
+
+        return self._engine
+
+    @property
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Менеджер асинхронных сессий"""
+        if self._async_session is None:
+            self._initialize()
+
+        return self._async_session
+
+    def _initialize(self) -> None:
+        """Создание подключений к основной БД, репликам и менеджера сессий"""
+        self._engine = self._create_engine(self._url, "primary")
+        self._read_engine = self._engine.execution_options(postgresql_readonly=True)
+
+        if self._replica_urls:
+            self._replicas = ReplicaBalancer(
+                [
+                    self._create_engine(replica_url, f"replica_{index}").execution_options(postgresql_readonly=True)
+                    for index, replica_url in enumerate(self._replica_urls)
+                ],
+                strategy=base_settings.DB_REPLICA_BALANCE_STRATEGY,
+                retry_interval=base_settings.DB_REPLICA_RETRY_INTERVAL,
+            )
+
+        cache_options: dict = {}
+        if self.query_cache is not None:
+            # Обработчики событий кеша подключаются только к сессиям CachedSession
+            cache_options = {"sync_session_class": CachedSession, "query_cache": self.query_cache}
+
+        self._async_session = async_sessionmaker(
+            self._engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False,
+            **cache_options,
+        )
+
+    async def start(self, warmup: int = 0) -> None:
+        """
+        Создание подключений и предварительное открытие соединений пула
+
+        :param warmup: количество соединений, открываемых заранее в пуле основной БД и каждой реплики
+        :type warmup: int
+        """
+        engines: list[AsyncEngine] = [self.engine, *(self._replicas.engines if self._replicas else [])]
+
+        for engine in engines:
+            await self._warmup(engine, min(warmup, base_settings.DB_POOL_SIZE))
+
+    @staticmethod
+    async def _warmup(engine: AsyncEngine, count: int) -> None:
+        """
+        Открытие соединений пула с возвратом их в пул. Ошибки подключения не прерывают запуск приложения
+
+        :param engine: подключение к БД
+        :type engine: AsyncEngine
+        :param count: количество соединений
+        :type count: int
+        """
+        if count <= 0:
+            return
+
+        connections: list[AsyncConnection | BaseException] = await asyncio.gather(
+            *(engine.connect() for _ in range(count)), return_exceptions=True
+        )
+
+        for connection in connections:
+            if isinstance(connection, AsyncConnection):
+                await connection.close()
+            else:
+                logger.warning(
+                    "Не удалось открыть соединение с БД при запуске",
+                    extra={"database": engine.url.render_as_string(hide_password=True), "error": str(connection)},
+                )
+
+    @staticmethod
+    def _create_engine(url: PostgresDsn, name: str) -> AsyncEngine:
+        """
+        Создание подключения к БД с настройками пула
+
+        :param url: адрес для подключения к БД
+        :type url: PostgresDsn
+        :param name: название пула в метриках
+        :type name: str
+        :return: подключение к БД
+        :rtype: AsyncEngine
         """
-        self._engine: AsyncEngine = create_async_engine(
+        pool_options: dict = {}
+        if base_settings.DB_POOL_METRICS_ENABLED:
+            pool_options["poolclass"] = InstrumentedAsyncQueuePool
+
+        engine: AsyncEngine = create_async_engine(
             str(url),
             echo=base_settings.DB_ECHO,
             future=True,
             pool_size=base_settings.DB_POOL_SIZE,
             max_overflow=base_settings.DB_MAX_OVERFLOW,
+            **pool_options,
         )
 
-        self._async_session: async_sessionmaker[AsyncSession] = async_sessionmaker(
-            self._engine,
-            class_=AsyncSession,
-            expire_on_commit=False,
-            autoflush=False,
-        )
+        if base_settings.DB_POOL_METRICS_ENABLED:
+            instrument_pool(engine, name)
+
+        install_query_timing(engine)
+
+        if base_settings.DB_SLOW_QUERY_THRESHOLD > 0:
+            SlowQueryDetector(
+                engine,
+                threshold=base_settings.DB_SLOW_QUERY_THRESHOLD,
+                explain_rate=base_settings.DB_SLOW_QUERY_EXPLAIN_RATE,
+            ).install()
+
+        return engine
 
     @asynccontextmanager
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
@@ -51,17 +199,101 @@ class DatabaseSessionManager:
         :return: асинхронный генератор сессий
         :rtype: AsyncGenerator[AsyncSession, None]
         """
-        session = self._async_session()
+        session = self.session_factory()
 
         try:
             yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+    @asynccontextmanager
+    async def get_transaction_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Получение сессии с одной транзакцией на весь блок (unit of work). Транзакция фиксируется один раз при выходе
+        из блока без ошибок и откатывается при ошибке. Изменения накапливаются в сессии и отправляются в БД одним
+        flush при фиксации. Для вложенных блоков используется точка сохранения session.begin_nested()
+
+        :return: асинхронный генератор сессий
+        :rtype: AsyncGenerator[AsyncSession, None]
+
+        .. code-block:: python
+        >>> async with session_manager.get_transaction_session() as session:
+        >>>     session.add(order)
+        >>>     try:
+        >>>         async with session.begin_nested():
+        >>>             session.add(bonus)
+        >>>     except IntegrityError:
+        >>>         # Откатывается только точка сохранения, order будет сохранен
+        >>>         ...
+        """
+        session = self.session_factory()
+
+        try:
+            async with session.begin():
+                yield session
+        finally:
             await session.close()
+
+    @asynccontextmanager
+    async def get_read_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Получение сессии только для чтения. Запросы направляются на реплики согласно стратегии балансировки,
+        при недоступности всех реплик - на основную БД
+
+        :return: асинхронный генератор сессий
+        :rtype: AsyncGenerator[AsyncSession, None]
+        """
+        session_factory: async_sessionmaker[AsyncSession] = self.session_factory
+        session: AsyncSession = await self._connect_replica() or session_factory(bind=self._read_engine)
+
+        try:
+            yield session
         except Exception:
             await session.rollback()
             raise
         finally:
             await session.close()
 
+    async def _connect_replica(self) -> AsyncSession | None:
+        """
+        Открытие сессии на первой доступной реплике
+
+        :return: сессия с установленным подключением или None, если ни одна реплика недоступна
+        :rtype: AsyncSession | None
+        """
+        if not self._replicas:
+            return None
+
+        for engine in self._replicas.candidates():
+            session: AsyncSession = self.session_factory(bind=engine)
+
+            try:
+                await session.connection()
+            except (DBAPIError, OSError, TimeoutError) as ex:
+                await session.close()
+                self._replicas.mark_down(engine)
+                logger.warning(
+                    "Реплика БД недоступна",
+                    extra={"replica": engine.url.render_as_string(hide_password=True), "error": str(ex)},
+                )
+                continue
+
+            self._replicas.mark_up(engine)
+            return session
+
+        return None
+
     async def connection_close(self) -> None:
-        """Закрытие подключения к БД"""
+        """Закрытие подключения к БД. При следующем обращении подключения будут созданы заново"""
+        if self._engine is None:
+            return
+
         await self._engine.dispose()
+
+        if self._replicas:
+            await self._replicas.dispose()
+
+        self._engine = self._read_engine = self._replicas = self._async_session = None
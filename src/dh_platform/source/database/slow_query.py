@@ -0,0 +1,201 @@
+# pylint: disable=too-few-public-methods
+"""Модуль обнаружения медленных SQL запросов"""
+
+__author__: str = "Старков Е.П."
+
+import asyncio
+import hashlib
+import random
+import re
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from dh_platform.consts import ENCODING
+from dh_platform.consts.database import SKIP_QUERY_LOG_OPTION
+from dh_platform.utils import get_request_id, logger
+
+# Атрибут контекста выполнения со временем начала запроса
+_START_TIME_ATTR: str = "dh_query_start_time"
+# Строковые и числовые литералы, заменяемые при нормализации SQL
+_SQL_LITERALS: re.Pattern = re.compile(r"'(?:[^']|'')*'|(?<![\w$])\d+(?:\.\d+)?\b")
+# Максимальная длина нормализованного SQL в логе
+_MAX_SQL_LENGTH: int = 2000
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Нормализация SQL для группировки одинаковых запросов: литералы заменяются на ?, пробельные символы схлопываются
+
+    :param statement: текст SQL запроса
+    :type statement: str
+    :return: нормализованный SQL
+    :rtype: str
+
+    .. code-block:: python
+    >>> from dh_platform.source.database.slow_query import normalize_sql
+    >>>
+    >>> print(normalize_sql("SELECT *\\n  FROM users WHERE id = 10")) # SELECT * FROM users WHERE id = ?
+    """
+    return " ".join(_SQL_LITERALS.sub("?", statement).split())[:_MAX_SQL_LENGTH]
+
+
+def params_fingerprint(parameters: Any) -> str:
+    """
+    Отпечаток параметров запроса. Позволяет отличать вызовы с разными параметрами без записи значений в лог
+
+    :param parameters: параметры запроса
+    :type parameters: Any
+    :return: короткий хеш параметров
+    :rtype: str
+    """
+    return hashlib.sha1(repr(parameters).encode(ENCODING), usedforsecurity=False).hexdigest()[:12]
+
+
+class SlowQueryDetector:
+    """
+    Замер времени выполнения каждого SQL запроса на уровне курсора. Запросы дольше порога пишутся в лог
+    с нормализованным SQL, отпечатком параметров, временем выполнения и идентификатором HTTP запроса.
+    Для доли медленных SELECT запросов в фоне снимается план EXPLAIN (ANALYZE, BUFFERS)
+
+    :ivar _engine: подключение к БД
+    :type _engine: AsyncEngine
+    :ivar _threshold: порог времени выполнения в секундах
+    :type _threshold: float
+    :ivar _explain_rate: доля медленных запросов, для которых снимается план, от 0 до 1
+    :type _explain_rate: float
+    :ivar _tasks: фоновые задачи получения планов
+    :type _tasks: set[asyncio.Task]
+
+    .. code-block:: python
+    >>> from sqlalchemy.ext.asyncio import create_async_engine
+    >>> from dh_platform.source.database.slow_query import SlowQueryDetector
+    >>>
+    >>> engine = create_async_engine("postgresql+asyncpg://host/db")
+    >>> SlowQueryDetector(engine, threshold=0.2, explain_rate=0.05).install()
+    """
+
+    def __init__(self, engine: AsyncEngine, threshold: float, explain_rate: float = 0.0) -> None:
+        """
+        Инициализация детектора
+
+        :param engine: подключение к БД
+        :type engine: AsyncEngine
+        :param threshold: порог времени выполнения в секундах
+        :type threshold: float
+        :param explain_rate: доля медленных запросов, для которых снимается план, от 0 до 1
+        :type explain_rate: float
+        """
+        self._engine: AsyncEngine = engine
+        self._threshold: float = threshold
+        self._explain_rate: float = explain_rate
+        self._tasks: set[asyncio.Task] = set()
+
+    def install(self) -> None:
+        """Подключение обработчиков событий выполнения запросов"""
+        event.listen(self._engine.sync_engine, "before_cursor_execute", self._before_execute)
+        event.listen(self._engine.sync_engine, "after_cursor_execute", self._after_execute)
+
+    @staticmethod
+    def _before_execute(
+        _conn: Connection,
+        _cursor: Any,
+        _statement: str,
+        _parameters: Any,
+        context: ExecutionContext,
+        _executemany: bool,
+    ) -> None:
+        """Запоминание времени начала запроса"""
+        setattr(context, _START_TIME_ATTR, time.perf_counter())
+
+    def _after_execute(
+        self,
+        _conn: Connection,
+        _cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext,
+        executemany: bool,
+    ) -> None:
+        """Проверка времени выполнения запроса"""
+        start: float | None = getattr(context, _START_TIME_ATTR, None)
+        if start is None:
+            return
+
+        duration: float = time.perf_counter() - start
+
+        if duration < self._threshold or context.execution_options.get(SKIP_QUERY_LOG_OPTION):
+            return
+
+        sql: str = normalize_sql(statement)
+        request_id: str | None = get_request_id()
+
+        logger.warning(
+            "Медленный SQL запрос",
+            extra={
+                "sql": sql,
+                "params_fingerprint": params_fingerprint(parameters),
+                "execution_time": f"{duration:.3f}s",
+                "threshold": f"{self._threshold}s",
+                "request_id": request_id,
+            },
+        )
+
+        if (
+            self._explain_rate > 0
+            and not executemany
+            and statement.lstrip()[:6].upper() == "SELECT"
+            and random.random() < self._explain_rate
+        ):
+            self._schedule_explain(statement, parameters, sql, request_id)
+
+    def _schedule_explain(self, statement: str, parameters: Any, sql: str, request_id: str | None) -> None:
+        """
+        Запуск фоновой задачи получения плана запроса
+
+        :param statement: текст SQL запроса в формате драйвера
+        :type statement: str
+        :param parameters: параметры запроса в формате драйвера
+        :type parameters: Any
+        :param sql: нормализованный SQL для лога
+        :type sql: str
+        :param request_id: идентификатор HTTP запроса
+        :type request_id: str | None
+        """
+        try:
+            loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        task: asyncio.Task = loop.create_task(self._explain(statement, parameters, sql, request_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, statement: str, parameters: Any, sql: str, request_id: str | None) -> None:
+        """
+        Получение плана медленного запроса на отдельном соединении
+
+        :param statement: текст SQL запроса в формате драйвера
+        :type statement: str
+        :param parameters: параметры запроса в формате драйвера
+        :type parameters: Any
+        :param sql: нормализованный SQL для лога
+        :type sql: str
+        :param request_id: идентификатор HTTP запроса
+        :type request_id: str | None
+        """
+        try:
+            async with self._engine.connect() as connection:
+                connection = await connection.execution_options(**{SKIP_QUERY_LOG_OPTION: True})
+                result = await connection.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                plan: str = "\n".join(str(row[0]) for row in result)
+                # EXPLAIN ANALYZE выполняет запрос, поэтому транзакция всегда откатывается
+                await connection.rollback()
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            logger.warning("Не удалось получить план SQL запроса", extra={"sql": sql, "error": str(ex)})
+            return
+
+        logger.info("План медленного SQL запроса", extra={"sql": sql, "plan": plan, "request_id": request_id})
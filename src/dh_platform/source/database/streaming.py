@@ -0,0 +1,140 @@
+"""Модуль потоковой выдачи результатов запросов к БД"""
+
+__author__: str = "Старков Е.П."
+
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import AbstractAsyncContextManager
+from typing import Any
+
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import StreamingResponse
+
+from dh_platform.consts import ENCODING
+from dh_platform.consts.database import STREAM_CHUNK_SIZE
+from dh_platform.utils import json_serialize
+
+from .dependency import session_manager
+
+# Типы содержимого потоковых ответов
+NDJSON_MEDIA_TYPE: str = "application/x-ndjson"
+JSON_MEDIA_TYPE: str = "application/json"
+
+
+def _row_to_dict(row: Row) -> Any:
+    """
+    Преобразование строки результата в объект для сериализации
+
+    :param row: строка результата
+    :type row: Row
+    :return: словарь ORM объекта (to_dict) или словарь колонок строки
+    :rtype: Any
+    """
+    if len(row) == 1 and hasattr(row[0], "to_dict"):
+        return row[0].to_dict()
+
+    return row._asdict()
+
+
+async def _iter_partitions(session: AsyncSession, statement: Select, chunk_size: int) -> AsyncIterator[list[str]]:
+    """
+    Чтение результата запроса через серверный курсор частями по chunk_size строк
+
+    :param session: сессия БД
+    :type session: AsyncSession
+    :param statement: запрос
+    :type statement: Select
+    :param chunk_size: количество строк в части
+    :type chunk_size: int
+    :return: части результата, сериализованные в JSON построчно
+    :rtype: AsyncIterator[list[str]]
+    """
+    result = await session.stream(statement.execution_options(yield_per=chunk_size))
+
+    async for partition in result.partitions():
+        yield [json_serialize(_row_to_dict(row)) for row in partition]
+        # Прочитанные ORM объекты не нужны после сериализации, иначе карта идентичности растет вместе с выборкой
+        session.expunge_all()
+
+
+async def _stream_body(
+    session: AsyncSession | AbstractAsyncContextManager[AsyncSession],
+    statement: Select,
+    ndjson: bool,
+    chunk_size: int,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Генерация тела ответа. Сессия закрывается по завершении выдачи
+
+    :param session: сессия БД или контекстный менеджер, выдающий сессию
+    :type session: AsyncSession | AbstractAsyncContextManager[AsyncSession]
+    :param statement: запрос
+    :type statement: Select
+    :param ndjson: формат NDJSON (объект на строку), иначе JSON массив
+    :type ndjson: bool
+    :param chunk_size: количество строк, вычитываемых за раз
+    :type chunk_size: int
+    :return: части тела ответа
+    :rtype: AsyncGenerator[bytes, None]
+    """
+    # Сессия из зависимости закрывается до отправки ответа, поэтому здесь она используется заново и закрывается
+    # после выдачи последней части
+    async with session as active_session:
+        first: bool = True
+
+        if not ndjson:
+            yield b"["
+
+        async for lines in _iter_partitions(active_session, statement, chunk_size):
+            if not lines:
+                continue
+
+            if ndjson:
+                yield ("\n".join(lines) + "\n").encode(ENCODING)
+            else:
+                yield (("" if first else ",") + ",".join(lines)).encode(ENCODING)
+
+            first = False
+
+        if not ndjson:
+            yield b"]"
+
+
+def stream_query_response(
+    statement: Select,
+    session: AsyncSession | None = None,
+    ndjson: bool = True,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    **kwargs: Any,
+) -> StreamingResponse:
+    """
+    Потоковый ответ с результатами запроса. Строки вычитываются через серверный курсор частями по chunk_size,
+    поэтому потребление памяти не зависит от размера выборки
+
+    :param statement: запрос
+    :type statement: Select
+    :param session: сессия БД. По умолчанию открывается сессия только для чтения на время выдачи ответа
+    :type session: AsyncSession | None
+    :param ndjson: формат NDJSON (объект на строку), иначе JSON массив
+    :type ndjson: bool
+    :param chunk_size: количество строк, вычитываемых за раз
+    :type chunk_size: int
+    :param kwargs: дополнительные параметры StreamingResponse (status_code, headers)
+    :return: потоковый ответ
+    :rtype: StreamingResponse
+
+    .. code-block:: python
+    >>> from sqlalchemy import select
+    >>> from dh_platform.source.database import stream_query_response
+    >>>
+    >>> @app.get("/users/export")
+    >>> async def export_users():
+    >>>     return stream_query_response(select(User).order_by(User.ID))
+    """
+    return StreamingResponse(
+        _stream_body(
+            session if session is not None else session_manager.get_read_session(), statement, ndjson, chunk_size
+        ),
+        media_type=NDJSON_MEDIA_TYPE if ndjson else JSON_MEDIA_TYPE,
+        **kwargs,
+    )
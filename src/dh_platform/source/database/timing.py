@@ -0,0 +1,63 @@
+"""Модуль учета времени SQL запросов в этапах HTTP запроса"""
+
+__author__: str = "Старков Е.П."
+
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from dh_platform.utils import get_server_timing
+
+# Название этапа SQL запросов в Server-Timing
+DB_SPAN: str = "db"
+# Атрибут контекста выполнения со временем начала запроса
+_START_TIME_ATTR: str = "dh_span_start_time"
+
+
+def _before_execute(
+    _conn: Connection,
+    _cursor: Any,
+    _statement: str,
+    _parameters: Any,
+    context: ExecutionContext,
+    _executemany: bool,
+) -> None:
+    """Запоминание времени начала запроса, если он выполняется в рамках HTTP запроса"""
+    if get_server_timing() is not None:
+        setattr(context, _START_TIME_ATTR, time.perf_counter())
+
+
+def _after_execute(
+    _conn: Connection,
+    _cursor: Any,
+    _statement: str,
+    _parameters: Any,
+    context: ExecutionContext,
+    _executemany: bool,
+) -> None:
+    """Учет времени выполнения запроса в этапе db"""
+    start: float | None = getattr(context, _START_TIME_ATTR, None)
+
+    if start is not None and (timing := get_server_timing()) is not None:
+        timing.add(DB_SPAN, time.perf_counter() - start)
+
+
+def install_query_timing(engine: AsyncEngine) -> None:
+    """
+    Подключение учета времени SQL запросов. Время суммируется в этап db текущего HTTP запроса
+
+    :param engine: подключение к БД
+    :type engine: AsyncEngine
+
+    .. code-block:: python
+    >>> from sqlalchemy.ext.asyncio import create_async_engine
+    >>> from dh_platform.source.database.timing import install_query_timing
+    >>>
+    >>> engine = create_async_engine("postgresql+asyncpg://host/db")
+    >>> install_query_timing(engine)
+    """
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_execute)
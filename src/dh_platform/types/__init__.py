@@ -2,6 +2,6 @@
 
 __author__ = "Старков Е.П."
 
-from .common import NavigationType
+from .common import CursorNavigationType, NavigationType
 from .logger import LogLevelType
 from .security import PasswordStrengthValidationType
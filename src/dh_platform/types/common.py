@@ -6,5 +6,7 @@ from typing import Any, TypeAlias
 
 # Навигация в системе
 NavigationType: TypeAlias = dict[str, int]
+# Навигация по курсору в системе
+CursorNavigationType: TypeAlias = dict[str, str | int | None]
 # Детали для исключений
 ExceptionDetailsType: TypeAlias = dict[str, Any]
@@ -2,12 +2,53 @@
 
 __author__ = "Старков Е.П."
 
-from .helpers import DateTimeHelper, deep_update, get_pagination_params, json_serialize, to_camel_case, to_snake_case
-from .logger import logger, setup_logger
+from .context import (
+    RequestContext,
+    RequestContextFilter,
+    get_request_context,
+    get_request_id,
+    request_context_var,
+    request_id_var,
+)
+from .helpers import (
+    DateTimeHelper,
+    decode_cursor,
+    deep_update,
+    encode_cursor,
+    get_cursor_pagination_params,
+    get_pagination_params,
+    json_serialize,
+    to_camel_case,
+    to_snake_case,
+)
+from .log_files import CompressingFileHandler
+from .log_filters import ExceptionDeduplicationFilter, exception_fingerprint
+from .logger import BoundedQueueHandler, JSONFormatter, logger, setup_logger
+from .metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    get_metrics_app,
+    get_metrics_router,
+    log_buckets,
+    metrics_registry,
+)
 from .security import (
     SecurityUtils,
     generate_random_string,
     generate_secure_filename,
     get_password_hash,
+    get_password_hash_async,
     verify_password,
+    verify_password_async,
+)
+from .timing import (
+    ServerTiming,
+    TimedRoute,
+    get_server_timing,
+    instrument_route_timing,
+    record_span,
+    server_timing_var,
+    timing_span,
 )
@@ -0,0 +1,123 @@
+# pylint: disable=too-few-public-methods
+"""Модуль контекста обрабатываемого запроса"""
+
+__author__: str = "Старков Е.П."
+
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any
+
+# Идентификатор текущего HTTP запроса. Доступен в любом коде, выполняемом в рамках запроса
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+
+class RequestContext:
+    """
+    Контекст HTTP запроса. Задачи asyncio, созданные во время обработки запроса, копируют контекстные переменные
+    при создании и получают тот же объект, поэтому контекст доступен и в фоновых задачах запроса
+
+    :ivar request_id: идентификатор запроса
+    :type request_id: str
+    :ivar method: метод запроса
+    :type method: str
+    :ivar path: путь запроса
+    :type path: str
+    :ivar client: адрес клиента
+    :type client: str | None
+    :ivar start_time: время начала обработки запроса (unix time)
+    :type start_time: float
+    :ivar _scope: параметры соединения, маршрут в них появляется после обработки запроса роутером
+    :type _scope: dict[str, Any]
+    """
+
+    __slots__ = ("request_id", "method", "path", "client", "start_time", "_scope")
+
+    def __init__(self, request_id: str, scope: dict[str, Any]) -> None:
+        """
+        Инициализация контекста
+
+        :param request_id: идентификатор запроса
+        :type request_id: str
+        :param scope: параметры соединения ASGI
+        :type scope: dict[str, Any]
+        """
+        client: tuple[str, int] | None = scope.get("client")
+
+        self.request_id: str = request_id
+        self.method: str = scope.get("method", "")
+        self.path: str = scope.get("path", "")
+        self.client: str | None = client[0] if client else None
+        self.start_time: float = time.time()
+        self._scope: dict[str, Any] = scope
+
+    @property
+    def route(self) -> str | None:
+        """Шаблон маршрута, например /users/{user_id}. None, пока роутер не выбрал маршрут"""
+        return getattr(self._scope.get("route"), "path", None)
+
+
+# Контекст текущего HTTP запроса
+request_context_var: ContextVar[RequestContext | None] = ContextVar("request_context", default=None)
+
+
+def get_request_id() -> str | None:
+    """
+    Идентификатор текущего HTTP запроса
+
+    :return: значение X-Request-ID или None вне обработки запроса
+    :rtype: str | None
+
+    .. code-block:: python
+    >>> from dh_platform.utils import get_request_id
+    >>>
+    >>> async def service_method() -> None:
+    >>>     await client.post("/notify", headers={"X-Request-ID": get_request_id()})
+    """
+    return request_id_var.get()
+
+
+def get_request_context() -> RequestContext | None:
+    """
+    Контекст текущего HTTP запроса
+
+    :return: контекст или None вне обработки запроса
+    :rtype: RequestContext | None
+    """
+    return request_context_var.get()
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Фильтр, добавляющий в каждую запись лога поля контекста текущего запроса: request_id, route, client
+    и request_start. Поля, переданные в extra явно, не перезаписываются. Вне обработки запроса поля не добавляются,
+    при RequestIDMiddleware без контекста запроса добавляется только request_id
+
+    .. code-block:: python
+    >>> import logging
+    >>> from dh_platform.utils import RequestContextFilter
+    >>>
+    >>> logging.getLogger("uvicorn.error").addFilter(RequestContextFilter())
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Добавление полей контекста в запись
+
+        :param record: запись лога
+        :type record: logging.LogRecord
+        :return: запись пропускается всегда
+        :rtype: bool
+        """
+        context: RequestContext | None = request_context_var.get()
+        fields: dict[str, Any] = record.__dict__
+
+        if context is not None:
+            fields.setdefault("request_id", context.request_id)
+            fields.setdefault("route", context.route)
+            fields.setdefault("client", context.client)
+            fields.setdefault("request_start", context.start_time)
+        elif (request_id := request_id_var.get()) is not None:
+            fields.setdefault("request_id", request_id)
+
+        return True
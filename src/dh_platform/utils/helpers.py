@@ -2,17 +2,22 @@
 
 __author__ = "Старков Е.П."
 
+import base64
+import binascii
 import datetime
 import json
 import re
 from datetime import timedelta
 from typing import Any
 
-from dh_platform.consts import BASE_SQL_DATE_FORMAT, MAX_NAV_LIMIT
-from dh_platform.types import NavigationType
+from dh_platform.consts import BASE_SQL_DATE_FORMAT, ENCODING, MAX_NAV_LIMIT
+from dh_platform.types import CursorNavigationType, NavigationType
 
 from .private import JSONEncoder
 
+# Переиспользуемый экземпляр энкодера, чтобы не создавать его на каждый вызов json_serialize
+_json_encoder: JSONEncoder = JSONEncoder(ensure_ascii=False)
+
 
 def json_serialize(obj: Any) -> str:
     """
@@ -29,7 +34,7 @@ def json_serialize(obj: Any) -> str:
     >>>
     >>> print(json_serialize({"a": 1, "b": 2, "c": datetime.now()}))
     """
-    return json.dumps(obj, cls=JSONEncoder, ensure_ascii=False)
+    return _json_encoder.encode(obj)
 
 
 def to_camel_case(snake_str: str) -> str:
@@ -121,6 +126,75 @@ def get_pagination_params(skip: int = 0, limit: int = 100) -> NavigationType:
     return {"skip": skip, "limit": limit}
 
 
+def get_cursor_pagination_params(cursor: str | None = None, limit: int = 100) -> CursorNavigationType:
+    """
+    Валидация параметров пагинации по курсору
+
+    :param cursor: непрозрачный курсор следующей или предыдущей страницы. Без курсора - первая страница
+    :type cursor: str | None
+    :param limit: сколько записей нужно вычитать. Не более MAX_NAV_LIMIT
+    :type limit: int
+    :return: параметры навигации
+    :rtype: CursorNavigationType
+
+    .. code-block:: python
+    >>> from dh_platform.utils import get_cursor_pagination_params
+    >>>
+    >>> # первая страница из 10 записей
+    >>> print(get_cursor_pagination_params(limit=10))
+    >>> # страница после курсора из ответа предыдущего запроса
+    >>> print(get_cursor_pagination_params(cursor="WyJuIiwxMCwxMF0", limit=10))
+    """
+    limit: int = min(MAX_NAV_LIMIT, max(1, limit))
+
+    return {"cursor": cursor or None, "limit": limit}
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """
+    Кодирование значений курсора в непрозрачную строку
+
+    :param values: значения курсора
+    :type values: list[Any]
+    :return: курсор в формате base64url без выравнивания
+    :rtype: str
+
+    .. code-block:: python
+    >>> from dh_platform.utils import encode_cursor
+    >>>
+    >>> print(encode_cursor(["n", 10, 10])) # WyJuIiwxMCwxMF0
+    """
+    raw: bytes = json.dumps(values, cls=JSONEncoder, separators=(",", ":")).encode(ENCODING)
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode(ENCODING)
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    """
+    Декодирование курсора, созданного encode_cursor
+
+    :param cursor: курсор
+    :type cursor: str
+    :return: значения курсора
+    :rtype: list[Any]
+    :raises ValueError: курсор поврежден
+
+    .. code-block:: python
+    >>> from dh_platform.utils import decode_cursor
+    >>>
+    >>> print(decode_cursor("WyJuIiwxMCwxMF0")) # ["n", 10, 10]
+    """
+    try:
+        raw: bytes = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values: Any = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as ex:
+        raise ValueError("Некорректный курсор") from ex
+
+    if not isinstance(values, list):
+        raise ValueError("Некорректный курсор")
+
+    return values
+
+
 class DateTimeHelper:
     """Утилиты для работы с датой и временем"""
 
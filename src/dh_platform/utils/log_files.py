@@ -0,0 +1,240 @@
+# pylint: disable=too-many-instance-attributes, too-many-arguments, too-many-positional-arguments, consider-using-with
+"""Модуль буферизованной записи логов в файл со сжатием ротированных файлов"""
+
+__author__: str = "Старков Е.П."
+
+import gzip
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO
+
+# Расширение сжатых ротированных файлов
+_GZIP_SUFFIX: str = ".gz"
+# Размер блока копирования при сжатии
+_COPY_CHUNK_SIZE: int = 1024 * 1024
+
+# Поток сжатия ротированных файлов, общий для всех обработчиков
+_compress_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-compress")
+
+
+class CompressingFileHandler(logging.FileHandler):
+    """
+    Обработчик записи логов в файл через буфер в памяти. Буфер записывается на диск при заполнении, не реже
+    flush_interval секунд и сразу после записи уровня flush_level и выше.
+
+    При достижении max_bytes файл переименовывается в <файл>.<время ротации> и сжимается gzip в фоновом потоке.
+    Ротированные файлы хранятся, пока их суммарный размер не превышает max_total_bytes и возраст - max_age
+
+    :ivar max_bytes: размер файла в байтах, после которого выполняется ротация. 0 - без ротации
+    :type max_bytes: int
+    :ivar max_total_bytes: суммарный размер ротированных файлов в байтах. None - без ограничения
+    :type max_total_bytes: int | None
+    :ivar max_age: максимальный возраст ротированных файлов в секундах. None - без ограничения
+    :type max_age: float | None
+    :ivar buffer_size: размер буфера записи в байтах
+    :type buffer_size: int
+    :ivar flush_interval: максимальное время хранения записей в буфере в секундах
+    :type flush_interval: float
+    :ivar flush_level: уровень записей, после которых буфер записывается сразу
+    :type flush_level: int
+
+    .. code-block:: python
+    >>> import logging
+    >>> from dh_platform.utils import CompressingFileHandler
+    >>>
+    >>> handler: logging.Handler = CompressingFileHandler(
+    >>>     "logs/app.log", max_bytes=100 * 1024 * 1024, max_total_bytes=5 * 1024**3, max_age=30 * 24 * 3600
+    >>> )
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = 0,
+        max_total_bytes: int | None = None,
+        max_age: float | None = None,
+        buffer_size: int = 256 * 1024,
+        flush_interval: float = 1.0,
+        flush_level: int = logging.ERROR,
+        encoding: str = "utf-8",
+    ) -> None:
+        """
+        Инициализация обработчика
+
+        :param filename: файл для логов
+        :type filename: str
+        :param max_bytes: размер файла в байтах, после которого выполняется ротация. 0 - без ротации
+        :type max_bytes: int
+        :param max_total_bytes: суммарный размер ротированных файлов в байтах. None - без ограничения
+        :type max_total_bytes: int | None
+        :param max_age: максимальный возраст ротированных файлов в секундах. None - без ограничения
+        :type max_age: float | None
+        :param buffer_size: размер буфера записи в байтах
+        :type buffer_size: int
+        :param flush_interval: максимальное время хранения записей в буфере в секундах
+        :type flush_interval: float
+        :param flush_level: уровень записей, после которых буфер записывается сразу
+        :type flush_level: int
+        :param encoding: кодировка файла
+        :type encoding: str
+        """
+        super().__init__(filename, mode="ab", encoding=None, delay=True)
+        self.max_bytes: int = max_bytes
+        self.max_total_bytes: int | None = max_total_bytes
+        self.max_age: float | None = max_age
+        self.buffer_size: int = buffer_size
+        self.flush_interval: float = flush_interval
+        self.flush_level: int = flush_level
+        self._encoding: str = encoding
+        self._size: int = 0
+        self._dirty: bool = False
+        self._stop_flush: threading.Event = threading.Event()
+
+        # Ротированные файлы, оставшиеся несжатыми после предыдущего запуска
+        _compress_executor.submit(self._compress_pending)
+
+        self._flusher: threading.Thread = threading.Thread(target=self._flush_loop, name="log-flush", daemon=True)
+        self._flusher.start()
+
+    def _open(self) -> BinaryIO:  # type: ignore[override]
+        """
+        Открытие файла с буфером записи
+
+        :return: файл
+        :rtype: BinaryIO
+        """
+        stream: BinaryIO = open(self.baseFilename, "ab", buffering=self.buffer_size)
+        self._size = stream.tell()
+
+        return stream
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Запись в буфер. Размер файла учитывается по записанным байтам, без обращения к файловой системе
+
+        :param record: запись лога
+        :type record: logging.LogRecord
+        """
+        try:
+            data: bytes = (self.format(record) + self.terminator).encode(self._encoding, "backslashreplace")
+
+            if self.stream is None:
+                self.stream = self._open()
+            if 0 < self.max_bytes <= self._size + len(data) and self._size > 0:
+                self.do_rollover()
+
+            self.stream.write(data)
+            self._size += len(data)
+            self._dirty = True
+
+            if record.levelno >= self.flush_level:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.handleError(record)
+
+    def flush(self) -> None:
+        """Запись буфера на диск"""
+        with self.lock:
+            if self.stream is not None and self._dirty:
+                self.stream.flush()
+                self._dirty = False
+
+    def close(self) -> None:
+        """Запись буфера на диск и закрытие файла"""
+        self._stop_flush.set()
+        super().close()
+
+    def do_rollover(self) -> None:
+        """Ротация файла. Переименование выполняется сразу, сжатие и удаление старых файлов - в фоновом потоке"""
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None  # type: ignore[assignment]
+
+        rotated: str = f"{self.baseFilename}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+        if os.path.exists(self.baseFilename):
+            os.replace(self.baseFilename, rotated)
+            _compress_executor.submit(self._compress, rotated)
+
+        self.stream = self._open()
+        self._dirty = False
+
+    def _flush_loop(self) -> None:
+        """Периодическая запись буфера на диск, чтобы записи не задерживались в буфере при отсутствии новых"""
+        while not self._stop_flush.wait(self.flush_interval):
+            try:
+                self.flush()
+            except (OSError, ValueError):
+                pass
+
+    def _rotated_files(self) -> list[Path]:
+        """
+        Ротированные файлы лога
+
+        :return: сжатые и несжатые ротированные файлы
+        :rtype: list[Path]
+        """
+        base: Path = Path(self.baseFilename)
+        return [path for path in base.parent.glob(f"{base.name}.*") if path.is_file()]
+
+    def _compress(self, path: str) -> None:
+        """
+        Сжатие ротированного файла и удаление файлов сверх ограничений хранения
+
+        :param path: ротированный файл
+        :type path: str
+        """
+        target: str = path + _GZIP_SUFFIX
+        temp: str = target + ".tmp"
+
+        try:
+            with open(path, "rb") as source, gzip.open(temp, "wb") as destination:
+                shutil.copyfileobj(source, destination, _COPY_CHUNK_SIZE)
+            os.replace(temp, target)
+            os.remove(path)
+        except OSError:
+            # Файл остается несжатым и будет сжат при следующем запуске
+            return
+
+        self._apply_retention()
+
+    def _compress_pending(self) -> None:
+        """Сжатие ротированных файлов, оставшихся несжатыми, например после аварийного завершения"""
+        for path in self._rotated_files():
+            if path.suffix == ".tmp":
+                path.unlink(missing_ok=True)
+            elif path.suffix != _GZIP_SUFFIX:
+                self._compress(str(path))
+
+        self._apply_retention()
+
+    def _apply_retention(self) -> None:
+        """Удаление ротированных файлов старше max_age и самых старых файлов сверх max_total_bytes"""
+        if self.max_total_bytes is None and self.max_age is None:
+            return
+
+        now: float = time.time()
+        total: int = 0
+        files: list[tuple[float, int, Path]] = []
+
+        for path in self._rotated_files():
+            try:
+                stat: os.stat_result = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        for mtime, size, path in sorted(files, reverse=True):
+            total += size
+            expired: bool = self.max_age is not None and now - mtime > self.max_age
+            oversize: bool = self.max_total_bytes is not None and total > self.max_total_bytes
+
+            if expired or oversize:
+                path.unlink(missing_ok=True)
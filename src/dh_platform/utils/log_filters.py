@@ -0,0 +1,216 @@
+"""Модуль фильтров записей лога"""
+
+__author__: str = "Старков Е.П."
+
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from types import TracebackType
+
+# Период проверки окончания интервалов ExceptionDeduplicationFilter фоновым потоком в секундах
+_FLUSH_PERIOD: float = 1.0
+# Фильтры, интервалы которых проверяет общий фоновый поток
+_dedup_filters: weakref.WeakSet = weakref.WeakSet()
+_dedup_filters_lock: threading.Lock = threading.Lock()
+# Общий фоновый поток, запускается при создании первого фильтра
+_flushers: list[threading.Thread] = []
+
+
+def exception_fingerprint(exc: BaseException) -> tuple[str, ...]:
+    """
+    Отпечаток исключения: тип и место возникновения (файл и строка самого глубокого кадра трассировки).
+    Исключения одного типа из одного места считаются похожими независимо от текста сообщения
+
+    :param exc: исключение
+    :type exc: BaseException
+    :return: отпечаток
+    :rtype: tuple[str, ...]
+    """
+    exc_type: type[BaseException] = type(exc)
+    tb: TracebackType | None = exc.__traceback__
+
+    if tb is None:
+        return exc_type.__module__, exc_type.__qualname__
+
+    while tb.tb_next is not None:
+        tb = tb.tb_next
+
+    return exc_type.__module__, exc_type.__qualname__, tb.tb_frame.f_code.co_filename, str(tb.tb_lineno)
+
+
+def _flush_loop() -> None:
+    """Общий фоновый поток: запись количества повторов по закончившимся интервалам всех фильтров"""
+    while True:
+        time.sleep(_FLUSH_PERIOD)
+
+        with _dedup_filters_lock:
+            filters: list[ExceptionDeduplicationFilter] = list(_dedup_filters)
+
+        for dedup_filter in filters:
+            dedup_filter.flush()
+
+
+def _register(dedup_filter: "ExceptionDeduplicationFilter") -> None:
+    """
+    Регистрация фильтра в общем фоновом потоке. Поток запускается при регистрации первого фильтра
+
+    :param dedup_filter: фильтр
+    :type dedup_filter: ExceptionDeduplicationFilter
+    """
+    with _dedup_filters_lock:
+        _dedup_filters.add(dedup_filter)
+
+        if not _flushers:
+            _flushers.append(threading.Thread(target=_flush_loop, name="log-exception-dedup", daemon=True))
+            _flushers[0].start()
+
+
+class ExceptionDeduplicationFilter(logging.Filter):
+    """
+    Фильтр повторяющихся исключений. Первая запись с исключением пишется полностью, похожие исключения
+    (см. exception_fingerprint) в течение interval секунд только подсчитываются и отбрасываются до форматирования
+    трассировки, поэтому стоимость логирования при массовой ошибке ограничена.
+
+    После окончания интервала количество отброшенных записей пишется одной записью уровня WARNING через logger
+    с полем suppressed. Интервалы всех фильтров проверяет один общий фоновый поток раз в секунду. Если похожее
+    исключение записывается раньше проверки, количество добавляется в эту запись (поле suppressed).
+
+    Записи без исключений пропускаются без изменений. Один экземпляр можно добавить в несколько обработчиков:
+    запись учитывается один раз, решение по ней сохраняется в поле exception_suppressed. Количество
+    отслеживаемых отпечатков ограничено max_fingerprints, при превышении забываются давно не встречавшиеся
+
+    :ivar interval: интервал подавления похожих исключений в секундах
+    :type interval: float
+    :ivar max_fingerprints: максимальное количество отслеживаемых отпечатков
+    :type max_fingerprints: int
+    :ivar logger: логгер итоговых записей о количестве повторов
+    :type logger: logging.Logger
+    :ivar _windows: время начала интервала и количество отброшенных записей по отпечаткам
+    :type _windows: OrderedDict[tuple[str, ...], list]
+
+    .. code-block:: python
+    >>> import logging
+    >>> from dh_platform.utils import ExceptionDeduplicationFilter, logger
+    >>>
+    >>> dedup_filter: logging.Filter = ExceptionDeduplicationFilter(interval=30, logger=logger)
+    >>> for handler in logger.handlers:
+    >>>     handler.addFilter(dedup_filter)
+    """
+
+    def __init__(
+        self, interval: float = 60.0, max_fingerprints: int = 1024, logger: logging.Logger | None = None
+    ) -> None:
+        """
+        Инициализация фильтра
+
+        :param interval: интервал подавления похожих исключений в секундах
+        :type interval: float
+        :param max_fingerprints: максимальное количество отслеживаемых отпечатков
+        :type max_fingerprints: int
+        :param logger: логгер итоговых записей о количестве повторов. None - логгер модуля
+        :type logger: logging.Logger | None
+        """
+        super().__init__()
+        self.interval: float = interval
+        self.max_fingerprints: int = max_fingerprints
+        self.logger: logging.Logger = logger or logging.getLogger(__name__)
+        self._windows: OrderedDict[tuple[str, ...], list] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+        _register(self)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Проверка записи
+
+        :param record: запись лога
+        :type record: logging.LogRecord
+        :return: запись пишется в лог
+        :rtype: bool
+        """
+        if not record.exc_info or record.exc_info[1] is None:
+            return True
+        # Запись уже проверена этим фильтром в другом обработчике
+        if hasattr(record, "exception_suppressed"):
+            return not record.exception_suppressed
+
+        fingerprint: tuple[str, ...] = exception_fingerprint(record.exc_info[1])
+        now: float = time.monotonic()
+        evicted: tuple[tuple[str, ...], list] | None = None
+        suppressed: int = 0
+
+        with self._lock:
+            window: list | None = self._windows.get(fingerprint)
+            duplicate: bool = window is not None and now - window[0] < self.interval
+
+            if duplicate:
+                window[1] += 1
+            else:
+                suppressed = window[1] if window is not None else 0
+                self._windows[fingerprint] = [now, 0]
+                self._windows.move_to_end(fingerprint)
+
+                if len(self._windows) > self.max_fingerprints:
+                    evicted = self._windows.popitem(last=False)
+
+        if evicted is not None and evicted[1][1]:
+            self._log_summary(*evicted)
+
+        record.exception_suppressed = duplicate
+        if suppressed:
+            record.suppressed = suppressed
+
+        return not duplicate
+
+    def flush(self) -> None:
+        """Запись количества отброшенных записей и удаление отпечатков с закончившимся интервалом"""
+        self._flush(time.monotonic())
+
+    def close(self) -> None:
+        """Запись количества отброшенных записей по всем отпечаткам и отключение от фонового потока"""
+        with _dedup_filters_lock:
+            _dedup_filters.discard(self)
+
+        self._flush(None)
+
+    def _flush(self, now: float | None) -> None:
+        """
+        Запись количества отброшенных записей по отпечаткам с закончившимся интервалом
+
+        :param now: текущее время time.monotonic. None - все отпечатки независимо от интервала
+        :type now: float | None
+        """
+        expired: list[tuple[tuple[str, ...], list]] = []
+
+        with self._lock:
+            for fingerprint, window in list(self._windows.items()):
+                if now is None or now - window[0] >= self.interval:
+                    expired.append((fingerprint, window))
+                    del self._windows[fingerprint]
+
+        # Запись вне блокировки: итоговая запись проходит через этот же фильтр
+        for fingerprint, window in expired:
+            if window[1]:
+                self._log_summary(fingerprint, window)
+
+    def _log_summary(self, fingerprint: tuple[str, ...], window: list) -> None:
+        """
+        Итоговая запись о количестве отброшенных записей с исключением
+
+        :param fingerprint: отпечаток исключения
+        :type fingerprint: tuple[str, ...]
+        :param window: время начала интервала и количество отброшенных записей
+        :type window: list
+        """
+        self.logger.warning(
+            "Подавлено похожих исключений %s: %s",
+            ".".join(fingerprint[:2]),
+            window[1],
+            extra={
+                "suppressed": window[1],
+                "exception_location": ":".join(fingerprint[2:]) or None,
+                "interval": f"{self.interval:g}s",
+            },
+        )
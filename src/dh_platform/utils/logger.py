@@ -1,16 +1,361 @@
+# pylint: disable=too-many-arguments
 """Модуль логирования в приложении"""
 
 __author__: str = "Старков Е.П."
 
+import atexit
+import copy
+import datetime
 import logging
+import math
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Any
 
 from dh_platform.config import base_settings
-from dh_platform.consts.logger import FILE_SIZE_DELIMITER, LogLevel
+from dh_platform.consts import ENCODING
+from dh_platform.consts.logger import FILE_SIZE_DELIMITER, LogFormat, LogLevel, LogQueueOverflow
 from dh_platform.types import LogLevelType
 
+from .context import RequestContextFilter
+from .log_files import CompressingFileHandler
+from .log_filters import ExceptionDeduplicationFilter
+from .private import JSONEncoder
+
+# Запущенные фоновые потоки записи логов, останавливаются при завершении процесса
+_listeners: list[QueueListener] = []
+# Стандартные атрибуты записи лога. Остальные атрибуты записи - поля extra
+_RESERVED_ATTRS: frozenset[str] = frozenset(
+    (*vars(logging.LogRecord("", logging.NOTSET, "", 0, "", None, None)), "message", "asctime", "taskName")
+)
+
+
+class _LogJSONEncoder(JSONEncoder):
+    """JSON encoder записей лога. Значения неизвестных типов записываются строкой, а не прерывают запись"""
+
+    def default(self, o: Any) -> Any:
+        """Основной обработчик энкодера"""
+        try:
+            return super().default(o)
+        except (TypeError, ValueError):
+            return repr(o)
+
+
+def _to_json_safe(value: Any) -> Any:
+    """
+    Приведение значения к виду, допустимому в JSON: нечисловые float (nan, inf) и ключи словарей, не являющиеся
+    строками, записываются строкой, bytes декодируются с экранированием некорректных байтов
+
+    :param value: значение поля записи
+    :type value: Any
+    :return: значение для сериализации
+    :rtype: Any
+    """
+    if isinstance(value, float):
+        return value if math.isfinite(value) else str(value)
+    if isinstance(value, bytes):
+        return value.decode(ENCODING, "backslashreplace")
+    if isinstance(value, dict):
+        return {key if isinstance(key, str) else str(key): _to_json_safe(item) for key, item in value.items()}
+    if isinstance(value, list | tuple | set | frozenset):
+        return [_to_json_safe(item) for item in value]
+
+    return value
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Форматтер записей лога в JSON объект на строку (JSON Lines). Помимо стандартных полей timestamp, level,
+    logger, message и location записываются все поля extra и поля контекста запроса. Поля extra
+    не перезаписывают стандартные поля. Значения, которые нельзя записать в JSON, записываются строкой
+
+    .. code-block:: python
+    >>> import logging
+    >>> from dh_platform.utils import JSONFormatter
+    >>>
+    >>> handler: logging.Handler = logging.StreamHandler()
+    >>> handler.setFormatter(JSONFormatter())
+    >>> # {"timestamp":"2024-01-01T00:00:00.000+00:00","level":"INFO","logger":"dh_app","message":"Запрос завершен",
+    >>> #  "location":"request.py:120","method":"GET","status_code":200,"execution_time":"0.012s"}
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._encoder: JSONEncoder = _LogJSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Форматирование записи
+
+        :param record: запись лога
+        :type record: logging.LogRecord
+        :return: JSON строка
+        :rtype: str
+        """
+        payload: dict[str, Any] = {
+            "timestamp": datetime.datetime.fromtimestamp(record.created, datetime.UTC).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "location": f"{record.filename}:{record.lineno}",
+        }
+
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and key not in payload:
+                payload[key] = value
+
+        if record.exc_info:
+            # Текст исключения кэшируется в записи, как в logging.Formatter
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+
+        try:
+            return self._encoder.encode(payload)
+        except (TypeError, ValueError):
+            # Медленный путь только для записей со значениями, недопустимыми в JSON
+            return self._encoder.encode({key: _to_json_safe(value) for key, value in payload.items()})
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Обработчик, передающий записи лога в ограниченную очередь для записи в фоновом потоке. Сообщение записи
+    собирается в вызывающем потоке, форматирование и ввод-вывод выполняются в потоке QueueListener.
+
+    При переполнении очереди с политикой DROP запись отбрасывается без ожидания, а количество отброшенных записей
+    пишется в лог предупреждением, как только в очереди появится место
+
+    :ivar overflow: поведение при переполнении очереди
+    :type overflow: LogQueueOverflow
+    :ivar dropped: количество отброшенных записей, еще не записанных в лог
+    :type dropped: int
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow: LogQueueOverflow = LogQueueOverflow.DROP) -> None:
+        """
+        Инициализация обработчика
+
+        :param log_queue: очередь записей
+        :type log_queue: queue.Queue
+        :param overflow: поведение при переполнении очереди
+        :type overflow: LogQueueOverflow
+        """
+        super().__init__(log_queue)
+        self.overflow: LogQueueOverflow = overflow
+        self.dropped: int = 0
+        self._dropped_lock: threading.Lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Подготовка записи к передаче в другой поток: аргументы подставляются в сообщение сразу, так как могут
+        измениться до записи. Исключение сохраняется и форматируется обработчиками фонового потока
+
+        :param record: запись лога
+        :type record: logging.LogRecord
+        :return: копия записи
+        :rtype: logging.LogRecord
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Передача записи в очередь
+
+        :param record: подготовленная запись лога
+        :type record: logging.LogRecord
+        """
+        if self.overflow == LogQueueOverflow.BLOCK:
+            self.queue.put(record)
+            return
+
+        if self.dropped:
+            self._report_dropped(record)
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def _report_dropped(self, record: logging.LogRecord) -> None:
+        """
+        Запись в лог количества отброшенных записей
+
+        :param record: текущая запись лога, от ее имени пишется предупреждение
+        :type record: logging.LogRecord
+        """
+        with self._dropped_lock:
+            dropped: int = self.dropped
+            self.dropped = 0
+
+        warning: logging.LogRecord = logging.LogRecord(
+            record.name, logging.WARNING, __file__, 0, "Отброшено записей лога: %d", (dropped,), None
+        )
+        warning.msg = warning.getMessage()
+        warning.args = None
+
+        try:
+            self.queue.put_nowait(warning)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += dropped
+
+
+class _BlockingSentinelListener(QueueListener):
+    """Фоновый поток записи логов, ожидающий места в заполненной очереди для сигнала остановки"""
+
+    def enqueue_sentinel(self) -> None:
+        """Передача сигнала остановки после всех записей, уже находящихся в очереди"""
+        self.queue.put(self._sentinel)
+
+
+def _stop_listeners() -> None:
+    """Запись оставшихся в очередях записей и остановка фоновых потоков при завершении процесса"""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(_stop_listeners)
+
+
+def _build_formatter(log_format: LogFormat) -> logging.Formatter:
+    """
+    Форматтер записей лога
+
+    :param log_format: формат записей
+    :type log_format: LogFormat
+    :return: форматтер
+    :rtype: logging.Formatter
+    """
+    if log_format == LogFormat.JSON:
+        return JSONFormatter()
+
+    return logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(request_id)s - %(message)s [%(filename)s:%(lineno)d]",
+        defaults={"request_id": "-"},
+    )
+
+
+def _build_file_handler(log_file: str, max_bytes: int, backup_count: int, compress_files: bool) -> logging.Handler:
+    """
+    Обработчик записи логов в файл. Директория файла создается, если не существует
+
+    :param log_file: файл для логов
+    :type log_file: str
+    :param max_bytes: максимальный размер в байтах
+    :type max_bytes: int
+    :param backup_count: количество файлов бекапа
+    :type backup_count: int
+    :param compress_files: запись через буфер со сжатием ротированных файлов
+    :type compress_files: bool
+    :return: обработчик
+    :rtype: logging.Handler
+    """
+    Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+
+    if not compress_files:
+        return RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+
+    retention_mb: int | None = base_settings.LOG_FILE_RETENTION_MB
+    retention_days: int | None = base_settings.LOG_FILE_RETENTION_DAYS
+
+    return CompressingFileHandler(
+        log_file,
+        max_bytes=max_bytes,
+        max_total_bytes=retention_mb * FILE_SIZE_DELIMITER * FILE_SIZE_DELIMITER if retention_mb else None,
+        max_age=retention_days * 24 * 3600 if retention_days else None,
+        flush_interval=base_settings.LOG_FILE_FLUSH_INTERVAL,
+    )
+
+
+def _build_handlers(
+    log_format: LogFormat, log_file: str | None, max_bytes: int, backup_count: int, compress_files: bool
+) -> list[logging.Handler]:
+    """
+    Обработчики записи логов в консоль и файл (если указан) с форматтером log_format
+
+    :param log_format: формат записей
+    :type log_format: LogFormat
+    :param log_file: файл для логов
+    :type log_file: str | None
+    :param max_bytes: максимальный размер в байтах
+    :type max_bytes: int
+    :param backup_count: количество файлов бекапа
+    :type backup_count: int
+    :param compress_files: запись файла через буфер со сжатием ротированных файлов
+    :type compress_files: bool
+    :return: обработчики
+    :rtype: list[logging.Handler]
+    """
+    formatter: logging.Formatter = _build_formatter(log_format)
+    handlers: list[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+
+    # File handler (если указан файл)
+    if log_file:
+        handlers.append(_build_file_handler(log_file, max_bytes, backup_count, compress_files))
+
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    return handlers
+
+
+def _add_filters(handler: logging.Handler, filters: list[logging.Filter]) -> None:
+    """
+    Добавление фильтров в обработчик
+
+    :param handler: обработчик
+    :type handler: logging.Handler
+    :param filters: фильтры записей
+    :type filters: list[logging.Filter]
+    """
+    for log_filter in filters:
+        handler.addFilter(log_filter)
+
+
+def _attach_queue(
+    app_logger: logging.Logger,
+    handlers: list[logging.Handler],
+    filters: list[logging.Filter],
+    queue_size: int,
+    queue_overflow: LogQueueOverflow,
+) -> None:
+    """
+    Подключение обработчиков через очередь и фоновый поток QueueListener. Фильтры стоят на обработчике очереди:
+    контекст запроса доступен только в вызывающем потоке, а повторы исключений не попадают в очередь
+
+    :param app_logger: логгер
+    :type app_logger: logging.Logger
+    :param handlers: обработчики, выполняемые в фоновом потоке
+    :type handlers: list[logging.Handler]
+    :param filters: фильтры записей
+    :type filters: list[logging.Filter]
+    :param queue_size: максимальное количество записей в очереди
+    :type queue_size: int
+    :param queue_overflow: поведение при переполнении очереди
+    :type queue_overflow: LogQueueOverflow
+    """
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = BoundedQueueHandler(log_queue, queue_overflow)
+    _add_filters(queue_handler, filters)
+    app_logger.addHandler(queue_handler)
+
+    listener = _BlockingSentinelListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
 
 def setup_logger(
     name: str = base_settings.LOG_NAME,
@@ -18,9 +363,22 @@ def setup_logger(
     log_file: str | None = None,
     max_bytes: int = base_settings.LOG_FILE_SIZE_MB * FILE_SIZE_DELIMITER * FILE_SIZE_DELIMITER,
     backup_count: int = 5,
+    *,
+    use_queue: bool = base_settings.LOG_QUEUE_ENABLED,
+    queue_size: int = base_settings.LOG_QUEUE_SIZE,
+    queue_overflow: LogQueueOverflow = base_settings.LOG_QUEUE_OVERFLOW,
+    log_format: LogFormat = base_settings.LOG_FORMAT,
+    compress_files: bool = base_settings.LOG_FILE_COMPRESSION_ENABLED,
+    exception_dedup_interval: float = base_settings.LOG_EXCEPTION_DEDUP_INTERVAL,
 ) -> logging.Logger:
     """
-    Настройка логгера для приложения
+    Настройка логгера для приложения. Обработчики дополняют записи полями контекста текущего запроса
+    (RequestContextFilter), в том числе записи дочерних логгеров, например dh_app.services.
+    Повторяющиеся исключения подавляются ExceptionDeduplicationFilter с итоговой записью о количестве.
+
+    При use_queue записи передаются в ограниченную очередь, а форматирование, запись в консоль и файл и ротация
+    выполняются в фоновом потоке QueueListener. Оставшиеся в очереди записи записываются при завершении процесса.
+    Параметры после backup_count передаются только по имени
 
     :param name: название логгера
     :type name: str
@@ -32,6 +390,20 @@ def setup_logger(
     :type max_bytes: int
     :param backup_count: количество файлов бекапа
     :type backup_count: int
+    :param use_queue: запись логов в фоновом потоке через очередь
+    :type use_queue: bool
+    :param queue_size: максимальное количество записей в очереди
+    :type queue_size: int
+    :param queue_overflow: поведение при переполнении очереди
+    :type queue_overflow: LogQueueOverflow
+    :param log_format: формат записей: текст или JSON со всеми полями extra
+    :type log_format: LogFormat
+    :param compress_files: запись файла через буфер со сжатием ротированных файлов. Хранение ограничивается
+        LOG_FILE_RETENTION_MB и LOG_FILE_RETENTION_DAYS, backup_count не используется
+    :type compress_files: bool
+    :param exception_dedup_interval: интервал подавления похожих исключений в секундах
+        (ExceptionDeduplicationFilter). 0 - подавление отключено
+    :type exception_dedup_interval: float
     :return: логгер
     :rtype: logging.Logger
 
@@ -47,23 +419,20 @@ def setup_logger(
     app_logger: logging.Logger = logging.getLogger(name)
     app_logger.setLevel(getattr(logging, log_level.upper()))
 
-    # Форматтер
-    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s [%(filename)s:%(lineno)d]")
+    # Фильтры стоят на обработчиках, а не на логгере, чтобы проверялись и записи дочерних логгеров.
+    # Один экземпляр ExceptionDeduplicationFilter на все обработчики, чтобы запись учитывалась один раз
+    filters: list[logging.Filter] = [RequestContextFilter()]
+    if exception_dedup_interval > 0:
+        filters.append(ExceptionDeduplicationFilter(exception_dedup_interval, logger=app_logger))
 
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    app_logger.addHandler(console_handler)
-
-    # File handler (если указан файл)
-    if log_file:
-        # Создаем директорию если не существует
-        log_path = Path(log_file)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+    handlers: list[logging.Handler] = _build_handlers(log_format, log_file, max_bytes, backup_count, compress_files)
 
-        file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
-        file_handler.setFormatter(formatter)
-        app_logger.addHandler(file_handler)
+    if use_queue:
+        _attach_queue(app_logger, handlers, filters, queue_size, queue_overflow)
+    else:
+        for handler in handlers:
+            _add_filters(handler, filters)
+            app_logger.addHandler(handler)
 
     return app_logger
 
@@ -0,0 +1,386 @@
+# pylint: disable=too-few-public-methods
+"""Модуль метрик приложения в формате Prometheus"""
+
+__author__: str = "Старков Е.П."
+
+import math
+from bisect import bisect_left
+from collections.abc import Callable, Iterator, Sequence
+from typing import TypeVar
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Тип содержимого текстового формата Prometheus
+PROMETHEUS_CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def log_buckets(start: float, factor: float, count: int) -> tuple[float, ...]:
+    """
+    Границы корзин гистограммы в логарифмической шкале
+
+    :param start: верхняя граница первой корзины
+    :type start: float
+    :param factor: множитель между соседними границами
+    :type factor: float
+    :param count: количество корзин
+    :type count: int
+    :return: границы корзин по возрастанию
+    :rtype: tuple[float, ...]
+
+    .. code-block:: python
+    >>> from dh_platform.utils import log_buckets
+    >>>
+    >>> print(log_buckets(0.001, 2, 5)) # (0.001, 0.002, 0.004, 0.008, 0.016)
+    """
+    return tuple(start * factor**index for index in range(count))
+
+
+def _format_value(value: float) -> str:
+    """Форматирование значения метрики"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    """Экранирование значения метки"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Форматирование меток метрики"""
+    pairs: list[str] = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """
+    Базовая метрика с метками. Значения для каждого набора меток хранятся в отдельном дочернем объекте, который
+    создается один раз и может быть сохранен вызывающим кодом для записи без поиска по меткам.
+
+    Запись не использует блокировки и рассчитана на вызов из потока цикла событий
+
+    :cvar kind: тип метрики Prometheus
+    :type kind: str
+    :ivar name: название метрики
+    :type name: str
+    :ivar documentation: описание метрики
+    :type documentation: str
+    :ivar labelnames: названия меток
+    :type labelnames: tuple[str, ...]
+    """
+
+    kind: str = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        """
+        Инициализация метрики
+
+        :param name: название метрики
+        :type name: str
+        :param documentation: описание метрики
+        :type documentation: str
+        :param labelnames: названия меток
+        :type labelnames: Sequence[str]
+        """
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: tuple[str, ...] = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """
+        Значение метрики для набора меток
+
+        :param values: значения меток в порядке labelnames
+        :return: дочерний объект метрики
+        """
+        child = self._children.get(values)
+
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"Метрика {self.name} ожидает метки {self.labelnames}")
+            child = self._children[values] = self._new_child()
+
+        return child
+
+    def _new_child(self) -> object:
+        """Создание дочернего объекта значения"""
+        raise NotImplementedError
+
+    def _samples(self) -> Iterator[str]:
+        """Строки значений в текстовом формате Prometheus"""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """
+        Метрика в текстовом формате Prometheus
+
+        :return: описание, тип и значения метрики
+        :rtype: str
+        """
+        header: str = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(f"{sample}\n" for sample in self._samples())
+
+
+class _CounterValue:
+    """Значение счетчика"""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value: float = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Увеличение счетчика"""
+        self.value += amount
+
+
+class Counter(Metric):
+    """
+    Монотонно возрастающий счетчик
+
+    .. code-block:: python
+    >>> from dh_platform.utils import Counter, metrics_registry
+    >>>
+    >>> requests_total: Counter = metrics_registry.register(Counter("requests_total", "Количество запросов", ["route"]))
+    >>> requests_total.labels("/users").inc()
+    """
+
+    kind: str = "counter"
+
+    def _new_child(self) -> _CounterValue:
+        return _CounterValue()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Увеличение счетчика без меток"""
+        self.labels().inc(amount)
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class _GaugeValue:
+    """Значение показателя"""
+
+    __slots__ = ("value", "function")
+
+    def __init__(self) -> None:
+        self.value: float = 0.0
+        self.function: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        """Установка значения"""
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Увеличение значения"""
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Уменьшение значения"""
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Вычисление значения функцией в момент выгрузки метрик"""
+        self.function = function
+
+    def get(self) -> float:
+        """Текущее значение"""
+        return self.function() if self.function is not None else self.value
+
+
+class Gauge(Metric):
+    """
+    Показатель, который может увеличиваться и уменьшаться
+
+    .. code-block:: python
+    >>> from dh_platform.utils import Gauge, metrics_registry
+    >>>
+    >>> in_flight: Gauge = metrics_registry.register(Gauge("in_flight", "Запросов в обработке"))
+    >>> in_flight.labels().inc()
+    """
+
+    kind: str = "gauge"
+
+    def _new_child(self) -> _GaugeValue:
+        return _GaugeValue()
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.get())}"
+
+
+class _HistogramValue:
+    """Значение гистограммы"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets: tuple[float, ...] = buckets
+        # Последняя корзина - +Inf
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        """Учет наблюдения"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(Metric):
+    """
+    Гистограмма с фиксированными границами корзин
+
+    .. code-block:: python
+    >>> from dh_platform.utils import Histogram, log_buckets, metrics_registry
+    >>>
+    >>> latency: Histogram = metrics_registry.register(
+    >>>     Histogram("latency_seconds", "Время обработки", ["route"], buckets=log_buckets(0.001, 2, 15))
+    >>> )
+    >>> latency.labels("/users").observe(0.012)
+    """
+
+    kind: str = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = log_buckets(0.001, 2, 15),
+    ) -> None:
+        """
+        Инициализация гистограммы
+
+        :param name: название метрики
+        :type name: str
+        :param documentation: описание метрики
+        :type documentation: str
+        :param labelnames: названия меток
+        :type labelnames: Sequence[str]
+        :param buckets: верхние границы корзин по возрастанию
+        :type buckets: Sequence[float]
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Учет наблюдения без меток"""
+        self.labels().observe(value)
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            cumulative: int = 0
+            for bound, count in zip((*self.buckets, math.inf), child.counts):
+                cumulative += count
+                labels: str = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {child.count}"
+
+
+MetricT = TypeVar("MetricT", bound=Metric)
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик приложения
+
+    :ivar _metrics: метрики по названиям
+    :type _metrics: dict[str, Metric]
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: MetricT) -> MetricT:
+        """
+        Регистрация метрики. Повторная регистрация метрики с тем же названием возвращает уже
+        зарегистрированную метрику
+
+        :param metric: метрика
+        :type metric: MetricT
+        :return: зарегистрированная метрика
+        :rtype: MetricT
+        """
+        return self._metrics.setdefault(metric.name, metric)  # type: ignore[return-value]
+
+    def render(self) -> str:
+        """
+        Все метрики в текстовом формате Prometheus
+
+        :return: текст выгрузки
+        :rtype: str
+        """
+        return "".join(metric.render() for metric in list(self._metrics.values()))
+
+
+# Глобальный реестр метрик
+metrics_registry: MetricsRegistry = MetricsRegistry()
+
+
+def get_metrics_router(path: str = "/metrics", registry: MetricsRegistry = metrics_registry) -> APIRouter:
+    """
+    Роутер с эндпоинтом выгрузки метрик в формате Prometheus
+
+    :param path: путь эндпоинта
+    :type path: str
+    :param registry: реестр метрик
+    :type registry: MetricsRegistry
+    :return: роутер
+    :rtype: APIRouter
+
+    .. code-block:: python
+    >>> from fastapi import FastAPI
+    >>> from dh_platform.utils import get_metrics_router
+    >>>
+    >>> app: FastAPI = FastAPI()
+    >>> app.include_router(get_metrics_router())
+    """
+    router: APIRouter = APIRouter()
+
+    @router.get(path, include_in_schema=False)
+    async def metrics() -> PlainTextResponse:
+        """Выгрузка метрик"""
+        return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    return router
+
+
+def get_metrics_app(registry: MetricsRegistry = metrics_registry) -> ASGIApp:
+    """
+    ASGI приложение выгрузки метрик для монтирования в приложение или запуска на отдельном порту
+
+    :param registry: реестр метрик
+    :type registry: MetricsRegistry
+    :return: ASGI приложение
+    :rtype: ASGIApp
+
+    .. code-block:: python
+    >>> from fastapi import FastAPI
+    >>> from dh_platform.utils import get_metrics_app
+    >>>
+    >>> app: FastAPI = FastAPI()
+    >>> app.mount("/metrics", get_metrics_app())
+    """
+
+    async def metrics_app(scope: Scope, receive: Receive, send: Send) -> None:
+        response: PlainTextResponse = PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+        await response(scope, receive, send)
+
+    return metrics_app
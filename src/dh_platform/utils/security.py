@@ -1,25 +1,173 @@
+# pylint: disable=too-few-public-methods
 """Вспомогательные функции для обеспечения защиты"""
 
 __author__: str = "Старков Е.П."
 
+import asyncio
+import functools
 import html
 import re
 import secrets
+import threading
+import time
 import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, TypeVar
 
 from passlib.context import CryptContext
 
+from dh_platform.config import base_settings
 from dh_platform.consts.security import EMAIL_REGEXP, MIN_PASSWORD_LENGTH
+from dh_platform.excerptions import ServiceUnavailableException
 from dh_platform.types import PasswordStrengthValidationType
 
+from .metrics import Counter, Histogram, log_buckets, metrics_registry
+
 # Контекст для хеширования паролей
 pwd_context: CryptContext = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+ResultT = TypeVar("ResultT")
+
+password_hash_queue_time: Histogram = metrics_registry.register(
+    Histogram(
+        "password_hash_queue_seconds",
+        "Время ожидания потока хеширования паролей",
+        ["operation"],
+        buckets=log_buckets(0.001, 2, 14),
+    )
+)
+password_hash_duration: Histogram = metrics_registry.register(
+    Histogram(
+        "password_hash_duration_seconds",
+        "Время хеширования или проверки пароля",
+        ["operation"],
+        buckets=log_buckets(0.01, 2, 10),
+    )
+)
+password_hash_rejected: Counter = metrics_registry.register(
+    Counter(
+        "password_hash_rejected_total", "Количество операций с паролями, отклоненных из-за перегрузки", ["operation"]
+    )
+)
+
+
+class _PasswordHashExecutor:
+    """
+    Выделенный пул потоков для операций с паролями. bcrypt освобождает GIL, поэтому хеширование в пуле
+    не блокирует event loop, а количество потоков ограничивает нагрузку на CPU при массовых входах
+
+    :ivar _executor: пул потоков, создается при первой операции
+    :type _executor: ThreadPoolExecutor | None
+    :ivar _pending: количество операций в обработке и очереди
+    :type _pending: int
+    """
+
+    def __init__(self) -> None:
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock: threading.Lock = threading.Lock()
+        self._pending: int = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Пул потоков
+
+        :return: пул потоков на PASSWORD_HASH_WORKERS потоков
+        :rtype: ThreadPoolExecutor
+        """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=base_settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+                    )
+
+        return self._executor
+
+    async def run(self, operation: str, func: Callable[..., ResultT], *args: Any) -> ResultT:
+        """
+        Выполнение операции в пуле потоков. Операция учитывается в очереди до завершения в потоке, а не до отмены
+        ожидания: при разрыве соединения клиентом bcrypt продолжает занимать поток
+
+        :param operation: название операции для метрик
+        :type operation: str
+        :param func: операция
+        :type func: Callable[..., ResultT]
+        :param args: аргументы операции
+        :type args: Any
+        :return: результат операции
+        :rtype: ResultT
+        :raises ServiceUnavailableException: количество операций в обработке и очереди превышает
+            PASSWORD_HASH_MAX_PENDING
+        """
+        if self._pending >= base_settings.PASSWORD_HASH_MAX_PENDING:
+            password_hash_rejected.labels(operation).inc()
+            raise ServiceUnavailableException({"reason": "password_hash_queue_full"}, retry_after=1)
+
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        submitted: float = time.perf_counter()
+        timings: list[float] = []
+
+        def task() -> ResultT:
+            timings.append(time.perf_counter())
+            try:
+                return func(*args)
+            finally:
+                timings.append(time.perf_counter())
+
+        self._pending += 1
+        future: Future = self._get_executor().submit(task)
+        future.add_done_callback(functools.partial(self._on_done, loop, operation, submitted, timings))
+
+        return await asyncio.wrap_future(future)
+
+    def _on_done(
+        self, loop: asyncio.AbstractEventLoop, operation: str, submitted: float, timings: list[float], _: Future
+    ) -> None:
+        """
+        Завершение операции в потоке или ее отмена до начала выполнения. Счетчик и метрики изменяются в потоке
+        event loop, поэтому обходятся без блокировок
+
+        :param loop: event loop, из которого запущена операция
+        :type loop: asyncio.AbstractEventLoop
+        :param operation: название операции для метрик
+        :type operation: str
+        :param submitted: время постановки в очередь (perf_counter)
+        :type submitted: float
+        :param timings: время начала и окончания выполнения в потоке
+        :type timings: list[float]
+        """
+        try:
+            loop.call_soon_threadsafe(self._finish, operation, submitted, timings)
+        except RuntimeError:
+            # Event loop закрыт, метрики не учитываются
+            self._pending -= 1
+
+    def _finish(self, operation: str, submitted: float, timings: list[float]) -> None:
+        """
+        Учет завершенной операции
+
+        :param operation: название операции для метрик
+        :type operation: str
+        :param submitted: время постановки в очередь (perf_counter)
+        :type submitted: float
+        :param timings: время начала и окончания выполнения в потоке
+        :type timings: list[float]
+        """
+        self._pending -= 1
+        if len(timings) == 2:
+            password_hash_queue_time.labels(operation).observe(timings[0] - submitted)
+            password_hash_duration.labels(operation).observe(timings[1] - timings[0])
+
+
+_password_hash_executor: _PasswordHashExecutor = _PasswordHashExecutor()
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Проверка пароля на совпадение с кешем
+    Проверка пароля на совпадение с кешем. Занимает поток на время работы bcrypt, в async коде следует
+    использовать verify_password_async
 
     :param plain_password: пароль для проверки
     :type plain_password: str
@@ -42,7 +190,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """
-    Хеширование пароля
+    Хеширование пароля. В async коде следует использовать get_password_hash_async
 
     :param password: текст пароля для хеширования
     :type password: str
@@ -56,6 +204,48 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Проверка пароля на совпадение с кешем в выделенном пуле потоков без блокировки event loop.
+    Количество потоков задается PASSWORD_HASH_WORKERS, время ожидания и проверки учитывается в метриках
+
+    :param plain_password: пароль для проверки
+    :type plain_password: str
+    :param hashed_password: хеш пароля из БД
+    :type hashed_password: str
+    :return: совпадение паролей
+    :rtype: bool
+    :raises ServiceUnavailableException: превышено PASSWORD_HASH_MAX_PENDING операций в обработке и очереди
+
+    .. code-block:: python
+    >>> from dh_platform.utils import verify_password_async
+
+    >>> @app.post("/login")
+    >>> async def login(data: LoginData, db: AsyncSession = Depends(get_db)):
+    >>>     user: User = await UserRepository(db).get_by_email(data.email)
+    >>>     if not await verify_password_async(data.password, user.password):
+    >>>         raise UnauthorizedException()
+    """
+    return await _password_hash_executor.run("verify", pwd_context.verify, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Хеширование пароля в выделенном пуле потоков без блокировки event loop
+
+    :param password: текст пароля для хеширования
+    :type password: str
+    :return: хеш пароля
+    :rtype: str
+    :raises ServiceUnavailableException: превышено PASSWORD_HASH_MAX_PENDING операций в обработке и очереди
+
+    .. code-block:: python
+    >>> from dh_platform.utils import get_password_hash_async
+    >>> print(await get_password_hash_async("1234")) # хеш пароля
+    """
+    return await _password_hash_executor.run("hash", pwd_context.hash, password)
+
+
 def generate_random_string(length: int = 32) -> str:
     """
     Генерация случайной строки
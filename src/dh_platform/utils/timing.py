@@ -0,0 +1,245 @@
+"""Модуль замера времени этапов обработки запроса"""
+
+__author__: str = "Старков Е.П."
+
+import functools
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi import routing as fastapi_routing
+from fastapi.datastructures import Default, DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.responses import Response
+
+# Этап выполнения функции эндпоинта
+HANDLER_SPAN: str = "handler"
+# Этап сериализации результата эндпоинта: валидация response_model и приведение к JSON совместимым типам
+SERIALIZE_SPAN: str = "serialize"
+# Этап формирования тела ответа классом ответа, например json.dumps в JSONResponse
+RENDER_SPAN: str = "render"
+# Атрибут функций и классов ответа, время выполнения которых уже учитывается как этап
+_SPAN_ATTR: str = "server_timing_span"
+
+
+class ServerTiming:
+    """
+    Этапы обработки запроса. Длительности этапов с одинаковым названием суммируются
+
+    :ivar start: время начала обработки запроса (perf_counter)
+    :type start: float
+    :ivar _spans: суммарная длительность в секундах и количество по названиям этапов
+    :type _spans: dict[str, list]
+    """
+
+    __slots__ = ("start", "_spans")
+
+    def __init__(self) -> None:
+        self.start: float = time.perf_counter()
+        self._spans: dict[str, list] = {}
+
+    def add(self, name: str, duration: float) -> None:
+        """
+        Учет длительности этапа
+
+        :param name: название этапа
+        :type name: str
+        :param duration: длительность в секундах
+        :type duration: float
+        """
+        span: list | None = self._spans.get(name)
+
+        if span is None:
+            self._spans[name] = [duration, 1]
+        else:
+            span[0] += duration
+            span[1] += 1
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """
+        Замер этапа
+
+        :param name: название этапа
+        :type name: str
+        """
+        start: float = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def header(self, total: float) -> str:
+        """
+        Значение заголовка Server-Timing. Длительности в миллисекундах
+
+        :param total: общее время обработки запроса в секундах
+        :type total: float
+        :return: значение заголовка
+        :rtype: str
+        """
+        metrics: list[str] = [f"{name};dur={duration * 1000:.1f}" for name, (duration, _) in self._spans.items()]
+        metrics.append(f"total;dur={total * 1000:.1f}")
+
+        return ", ".join(metrics)
+
+    def as_dict(self) -> dict[str, float | int]:
+        """
+        Этапы для записи в лог: длительность в миллисекундах и количество, если этап выполнялся несколько раз
+
+        :return: поля лога по названиям этапов
+        :rtype: dict[str, float | int]
+        """
+        fields: dict[str, float | int] = {}
+
+        for name, (duration, count) in self._spans.items():
+            fields[f"{name}_ms"] = round(duration * 1000, 1)
+            if count > 1:
+                fields[f"{name}_count"] = count
+
+        return fields
+
+
+# Этапы текущего HTTP запроса
+server_timing_var: ContextVar[ServerTiming | None] = ContextVar("server_timing", default=None)
+
+
+def get_server_timing() -> ServerTiming | None:
+    """
+    Этапы текущего HTTP запроса
+
+    :return: этапы запроса или None вне обработки запроса
+    :rtype: ServerTiming | None
+    """
+    return server_timing_var.get()
+
+
+def record_span(name: str, duration: float) -> None:
+    """
+    Учет длительности этапа текущего запроса. Вне обработки запроса ничего не делает
+
+    :param name: название этапа
+    :type name: str
+    :param duration: длительность в секундах
+    :type duration: float
+    """
+    if (timing := server_timing_var.get()) is not None:
+        timing.add(name, duration)
+
+
+@contextmanager
+def timing_span(name: str) -> Iterator[None]:
+    """
+    Замер этапа текущего запроса. Этап попадает в заголовок Server-Timing и в лог завершения запроса
+
+    :param name: название этапа
+    :type name: str
+
+    .. code-block:: python
+    >>> from dh_platform.utils import timing_span
+    >>>
+    >>> async def get_report():
+    >>>     with timing_span("external_api"):
+    >>>         data = await client.get_report()
+    """
+    start: float = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+
+def _timed_coroutine(func: Callable[..., Any], name: str) -> Callable[..., Any]:
+    """
+    Обертка корутинной функции с замером этапа текущего запроса
+
+    :param func: корутинная функция
+    :type func: Callable[..., Any]
+    :param name: название этапа
+    :type name: str
+    :return: обертка
+    :rtype: Callable[..., Any]
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start: float = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            record_span(name, time.perf_counter() - start)
+
+    setattr(wrapper, _SPAN_ATTR, name)
+    return wrapper
+
+
+def instrument_route_timing() -> None:
+    """
+    Замер этапов handler и serialize во всех маршрутах FastAPI. Оборачиваются функции fastapi.routing, которые
+    обработчик маршрута вызывает для функции эндпоинта и для сериализации ее результата, поэтому время разбора
+    зависимостей и завершения зависимостей с yield (например, COMMIT транзакции) в этапы не попадает.
+    Повторный вызов ничего не делает. Вызывается RequestMiddleware
+
+    .. code-block:: python
+    >>> from dh_platform.utils import instrument_route_timing
+    >>>
+    >>> instrument_route_timing()
+    """
+    for attr, name in (("run_endpoint_function", HANDLER_SPAN), ("serialize_response", SERIALIZE_SPAN)):
+        func: Callable[..., Any] = getattr(fastapi_routing, attr)
+        if getattr(func, _SPAN_ATTR, None) is None:
+            setattr(fastapi_routing, attr, _timed_coroutine(func, name))
+
+
+@functools.cache
+def _timed_response_class(response_class: type[Response]) -> type[Response]:
+    """
+    Класс ответа с замером этапа render
+
+    :param response_class: класс ответа
+    :type response_class: type[Response]
+    :return: подкласс с замером render
+    :rtype: type[Response]
+    """
+    if getattr(response_class, _SPAN_ATTR, None) is not None:
+        return response_class
+
+    def render(self: Response, content: Any) -> bytes | memoryview:
+        start: float = time.perf_counter()
+        try:
+            return response_class.render(self, content)
+        finally:
+            record_span(RENDER_SPAN, time.perf_counter() - start)
+
+    return type(response_class.__name__, (response_class,), {"render": render, _SPAN_ATTR: RENDER_SPAN})
+
+
+class TimedRoute(APIRoute):
+    """
+    Маршрут с замером формирования тела ответа (этап render, например json.dumps в JSONResponse) в дополнение
+    к этапам handler и serialize, которые учитываются во всех маршрутах (см. instrument_route_timing)
+
+    .. code-block:: python
+    >>> from fastapi import APIRouter, FastAPI
+    >>> from dh_platform.utils import TimedRoute
+    >>>
+    >>> app: FastAPI = FastAPI()
+    >>> app.router.route_class = TimedRoute
+    >>> router: APIRouter = APIRouter(route_class=TimedRoute)
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        response_class: type[Response] | DefaultPlaceholder = kwargs.get("response_class", Default(JSONResponse))
+
+        # Класс по умолчанию остается DefaultPlaceholder, чтобы include_router мог заменить его классом роутера
+        if isinstance(response_class, DefaultPlaceholder):
+            kwargs["response_class"] = Default(_timed_response_class(response_class.value))
+        else:
+            kwargs["response_class"] = _timed_response_class(response_class)
+
+        super().__init__(path, endpoint, **kwargs)
@@ -0,0 +1,155 @@
+"""Проверка объединения одинаковых одновременных запросов"""
+
+__author__: str = "Старков Е.П."
+
+import asyncio
+
+from starlette.types import Message, Receive, Scope, Send
+
+from dh_platform.middleware import CoalescingMiddleware
+
+
+class _CountingApp:
+    """
+    ASGI приложение, считающее вызовы обработчика
+
+    :ivar calls: количество вызовов
+    :type calls: int
+    :ivar status: код ответа
+    :type status: int
+    :ivar body: тело ответа
+    :type body: bytes
+    :ivar fail_first: первый вызов завершается исключением
+    :type fail_first: bool
+    """
+
+    def __init__(self, status: int = 200, body: bytes = b"ok", fail_first: bool = False) -> None:
+        self.calls: int = 0
+        self.status: int = status
+        self.body: bytes = body
+        self.fail_first: bool = fail_first
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.calls += 1
+        call: int = self.calls
+        # Ожидание, пока одинаковые запросы встанут в очередь за ведущим
+        await asyncio.sleep(0.01)
+
+        if self.fail_first and call == 1:
+            raise RuntimeError("Ошибка обработчика")
+
+        await send({"type": "http.response.start", "status": self.status, "headers": [(b"x-call", str(call).encode())]})
+        await send({"type": "http.response.body", "body": self.body})
+
+
+async def _call(app: CoalescingMiddleware, method: str = "GET", headers: list | None = None) -> list[Message]:
+    """
+    Выполнение запроса
+
+    :param app: middleware
+    :type app: CoalescingMiddleware
+    :param method: метод запроса
+    :type method: str
+    :param headers: заголовки запроса
+    :type headers: list | None
+    :return: отправленные сообщения ответа
+    :rtype: list[Message]
+    """
+    messages: list[Message] = []
+    scope: Scope = {
+        "type": "http",
+        "method": method,
+        "path": "/items",
+        "query_string": b"page=1",
+        "headers": headers or [],
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages
+
+
+def _response(messages: list[Message]) -> tuple[int, list, bytes]:
+    """
+    Ответ из отправленных сообщений
+
+    :param messages: сообщения ответа
+    :type messages: list[Message]
+    :return: код, заголовки и тело ответа
+    :rtype: tuple[int, list, bytes]
+    """
+    return messages[0]["status"], messages[0]["headers"], b"".join(message.get("body", b"") for message in messages)
+
+
+def _gather(app: CoalescingMiddleware, *requests: dict) -> list:
+    """
+    Одновременное выполнение запросов
+
+    :param app: middleware
+    :type app: CoalescingMiddleware
+    :param requests: параметры запросов для _call
+    :type requests: dict
+    :return: сообщения ответов или исключения
+    :rtype: list
+    """
+
+    async def run() -> list:
+        return await asyncio.gather(*(_call(app, **request) for request in requests), return_exceptions=True)
+
+    return asyncio.run(run())
+
+
+def test_followers_share_leader_response() -> None:
+    """Одинаковые запросы получают ответ ведущего без повторного вызова обработчика"""
+    app: _CountingApp = _CountingApp()
+    results: list = _gather(CoalescingMiddleware(app), {}, {}, {})
+
+    assert app.calls == 1
+    assert [_response(messages) for messages in results] == [(200, [(b"x-call", b"1")], b"ok")] * 3
+
+
+def test_server_error_is_shared() -> None:
+    """Ответ 5xx передается ожидающим и не вызывает повторное выполнение обработчика"""
+    app: _CountingApp = _CountingApp(status=503)
+    results: list = _gather(CoalescingMiddleware(app), {}, {}, {})
+
+    assert app.calls == 1
+    assert [messages[0]["status"] for messages in results] == [503, 503, 503]
+
+
+def test_leader_failure_elects_new_leader() -> None:
+    """При исключении ведущего ведущим становится один из ожидающих, остальные ждут его ответ"""
+    app: _CountingApp = _CountingApp(fail_first=True)
+    results: list = _gather(CoalescingMiddleware(app), {}, {}, {})
+
+    assert isinstance(results[0], RuntimeError)
+    assert app.calls == 2
+    assert [_response(messages) for messages in results[1:]] == [(200, [(b"x-call", b"2")], b"ok")] * 2
+
+
+def test_vary_headers_and_methods() -> None:
+    """Запросы с разными заголовками vary_headers и запросы не GET выполняются отдельно"""
+    app: _CountingApp = _CountingApp()
+    _gather(
+        CoalescingMiddleware(app),
+        {"headers": [(b"authorization", b"Bearer a")]},
+        {"headers": [(b"authorization", b"Bearer b")]},
+        {"method": "POST"},
+        {"method": "POST"},
+    )
+
+    assert app.calls == 4
+
+
+def test_large_response_not_shared() -> None:
+    """Ответ больше max_body_size не передается, ожидающие выполняют запрос самостоятельно"""
+    app: _CountingApp = _CountingApp(body=b"x" * 100)
+    results: list = _gather(CoalescingMiddleware(app, max_body_size=10), {}, {})
+
+    assert app.calls == 2
+    assert [messages[-1]["body"] for messages in results] == [b"x" * 100, b"x" * 100]
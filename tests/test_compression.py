@@ -0,0 +1,36 @@
+"""Проверка выбора алгоритма сжатия"""
+
+__author__: str = "Старков Е.П."
+
+import pytest
+
+from dh_platform.consts.middleware import ContentEncoding
+from dh_platform.middleware.compression import negotiate_encoding
+
+# Алгоритмы без zstd, чтобы результат не зависел от установленного пакета zstandard
+_AVAILABLE: tuple[ContentEncoding, ...] = (ContentEncoding.GZIP, ContentEncoding.DEFLATE)
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip, deflate", ContentEncoding.GZIP),
+        ("deflate, gzip;q=0.8", ContentEncoding.DEFLATE),
+        ("GZIP;Q=0.5, Deflate;q=0.9", ContentEncoding.DEFLATE),
+        ("br, *;q=0.1", ContentEncoding.GZIP),
+        ("*, gzip;q=0", ContentEncoding.DEFLATE),
+        ("identity", None),
+        ("gzip;q=0, deflate;q=0", None),
+        ("gzip;q=abc", None),
+        ("", None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding: str, expected: ContentEncoding | None) -> None:
+    """Выбирается доступный алгоритм с наибольшим весом, при равных весах - более предпочтительный"""
+    assert negotiate_encoding(accept_encoding, _AVAILABLE) == expected
+
+
+def test_negotiate_encoding_zstd_preferred() -> None:
+    """При равных весах zstd предпочитается gzip, если доступен"""
+    available: tuple[ContentEncoding, ...] = (ContentEncoding.ZSTD, *_AVAILABLE)
+    assert negotiate_encoding("gzip, zstd", available) == ContentEncoding.ZSTD
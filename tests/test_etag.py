@@ -0,0 +1,41 @@
+"""Проверка ETag и условных GET запросов"""
+
+__author__: str = "Старков Е.П."
+
+from datetime import datetime, timezone
+
+import pytest
+
+from dh_platform.middleware import etag_matches, make_weak_etag
+
+
+def test_make_weak_etag() -> None:
+    """Слабый ETag зависит только от версии ресурса"""
+    updated_at: datetime = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    etag: str = make_weak_etag(updated_at, 10)
+
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == make_weak_etag(updated_at, 10)
+    assert etag != make_weak_etag(updated_at, 11)
+
+
+@pytest.mark.parametrize(
+    ("if_none_match", "expected"),
+    [
+        ('W/"abc"', True),
+        ('"abc"', True),
+        ('"other", W/"abc"', True),
+        ("*", True),
+        ('"other"', False),
+        ("", False),
+        (None, False),
+    ],
+)
+def test_etag_matches(if_none_match: str | None, expected: bool) -> None:
+    """If-None-Match сравнивается слабым сравнением, поддерживаются списки и *"""
+    assert etag_matches(if_none_match, 'W/"abc"') is expected
+
+
+def test_etag_matches_strong_etag() -> None:
+    """Сильный ETag совпадает со своей слабой формой"""
+    assert etag_matches('W/"abc"', '"abc"')
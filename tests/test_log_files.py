@@ -0,0 +1,126 @@
+"""Проверка записи логов в файл со сжатием ротированных файлов"""
+
+__author__: str = "Старков Е.П."
+
+import gzip
+import logging
+import os
+import time
+from pathlib import Path
+
+from dh_platform.utils import CompressingFileHandler
+from dh_platform.utils.log_files import _compress_executor
+
+
+def _record(message: str, level: int = logging.INFO) -> logging.LogRecord:
+    """
+    Запись лога
+
+    :param message: сообщение
+    :type message: str
+    :param level: уровень записи
+    :type level: int
+    :return: запись лога
+    :rtype: logging.LogRecord
+    """
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+
+def _wait_compression() -> None:
+    """Ожидание выполнения задач сжатия, поставленных в очередь ранее"""
+    _compress_executor.submit(lambda: None).result()
+
+
+def _rotated(log_file: Path, age: float, size: int) -> Path:
+    """
+    Сжатый ротированный файл заданного возраста и размера
+
+    :param log_file: файл лога
+    :type log_file: Path
+    :param age: возраст файла в секундах
+    :type age: float
+    :param size: размер файла в байтах
+    :type size: int
+    :return: путь к файлу
+    :rtype: Path
+    """
+    path: Path = log_file.with_name(f"{log_file.name}.{age:08.0f}.gz")
+    path.write_bytes(b"x" * size)
+    mtime: float = time.time() - age
+    os.utime(path, (mtime, mtime))
+
+    return path
+
+
+def test_flush_level(tmp_path: Path) -> None:
+    """Записи ниже flush_level остаются в буфере, запись уровня flush_level записывается сразу"""
+    log_file: Path = tmp_path / "app.log"
+    handler: CompressingFileHandler = CompressingFileHandler(str(log_file), flush_interval=3600)
+
+    try:
+        handler.handle(_record("info"))
+        assert log_file.read_text() == ""
+
+        handler.handle(_record("error", logging.ERROR))
+        assert log_file.read_text() == "info\nerror\n"
+    finally:
+        handler.close()
+
+
+def test_rollover_compresses_rotated_files(tmp_path: Path) -> None:
+    """При достижении max_bytes файл ротируется и сжимается, записи не теряются и не повторяются"""
+    log_file: Path = tmp_path / "app.log"
+    handler: CompressingFileHandler = CompressingFileHandler(str(log_file), max_bytes=30)
+    messages: list[str] = [f"message {index:02d}" for index in range(10)]
+
+    try:
+        for message in messages:
+            handler.handle(_record(message))
+    finally:
+        handler.close()
+
+    _wait_compression()
+
+    rotated: list[Path] = sorted(tmp_path.glob("app.log.*"))
+    assert rotated and all(path.suffix == ".gz" for path in rotated)
+    assert all(path.stat().st_size > 0 for path in rotated)
+
+    content: str = "".join(gzip.decompress(path.read_bytes()).decode() for path in rotated) + log_file.read_text()
+    assert content.splitlines() == messages
+
+
+def test_compress_pending_on_start(tmp_path: Path) -> None:
+    """Несжатые ротированные файлы предыдущего запуска сжимаются, незаконченные временные файлы удаляются"""
+    log_file: Path = tmp_path / "app.log"
+    (tmp_path / "app.log.20250101-000000-000000").write_text("old\n")
+    (tmp_path / "app.log.20250101-000001-000000.gz.tmp").write_bytes(b"partial")
+
+    CompressingFileHandler(str(log_file)).close()
+    _wait_compression()
+
+    assert [path.name for path in tmp_path.glob("app.log.*")] == ["app.log.20250101-000000-000000.gz"]
+    assert gzip.decompress((tmp_path / "app.log.20250101-000000-000000.gz").read_bytes()) == b"old\n"
+
+
+def test_retention_by_age(tmp_path: Path) -> None:
+    """Ротированные файлы старше max_age удаляются"""
+    log_file: Path = tmp_path / "app.log"
+    fresh: Path = _rotated(log_file, 10, 10)
+    old: Path = _rotated(log_file, 7200, 10)
+
+    CompressingFileHandler(str(log_file), max_age=3600).close()
+    _wait_compression()
+
+    assert fresh.exists()
+    assert not old.exists()
+
+
+def test_retention_by_total_size(tmp_path: Path) -> None:
+    """Самые старые ротированные файлы удаляются, пока суммарный размер превышает max_total_bytes"""
+    log_file: Path = tmp_path / "app.log"
+    files: list[Path] = [_rotated(log_file, age, 100) for age in (10, 20, 30)]
+
+    CompressingFileHandler(str(log_file), max_total_bytes=250).close()
+    _wait_compression()
+
+    assert [path.exists() for path in files] == [True, True, False]
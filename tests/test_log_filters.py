@@ -0,0 +1,170 @@
+"""Проверка фильтра повторяющихся исключений"""
+
+__author__: str = "Старков Е.П."
+
+import logging
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from dh_platform.utils import ExceptionDeduplicationFilter, log_filters
+
+
+class _ListHandler(logging.Handler):
+    """
+    Обработчик, сохраняющий записи в список
+
+    :ivar records: записи лога
+    :type records: list[logging.LogRecord]
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def _error_record(error: type[Exception] = ValueError) -> logging.LogRecord:
+    """
+    Запись с исключением, возникшим в одном и том же месте
+
+    :param error: тип исключения
+    :type error: type[Exception]
+    :return: запись лога
+    :rtype: logging.LogRecord
+    """
+    try:
+        raise error("Ошибка")
+    except Exception:  # pylint: disable=broad-exception-caught
+        return logging.LogRecord("test", logging.ERROR, __file__, 1, "Ошибка", None, sys.exc_info())
+
+
+def _other_location_record() -> logging.LogRecord:
+    """
+    Запись с исключением того же типа из другого места
+
+    :return: запись лога
+    :rtype: logging.LogRecord
+    """
+    try:
+        raise ValueError("Ошибка")
+    except ValueError:
+        return logging.LogRecord("test", logging.ERROR, __file__, 1, "Ошибка", None, sys.exc_info())
+
+
+@pytest.fixture(name="summary_logger")
+def fixture_summary_logger() -> logging.Logger:
+    """Логгер итоговых записей фильтра с обработчиком _ListHandler"""
+    summary_logger: logging.Logger = logging.getLogger("tests.log_filters")
+    summary_logger.propagate = False
+    summary_logger.handlers = [_ListHandler()]
+
+    return summary_logger
+
+
+@pytest.fixture(name="clock", autouse=True)
+def fixture_clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Управляемое время фильтра, общее с фоновым потоком"""
+    now: list[float] = [1000.0]
+    monkeypatch.setattr(log_filters, "time", SimpleNamespace(monotonic=lambda: now[0], sleep=time.sleep))
+
+    return now
+
+
+def _suppressed(summary_logger: logging.Logger) -> list[int]:
+    """
+    Количество отброшенных записей из итоговых записей фильтра
+
+    :param summary_logger: логгер итоговых записей
+    :type summary_logger: logging.Logger
+    :return: значения поля suppressed
+    :rtype: list[int]
+    """
+    return [record.suppressed for record in summary_logger.handlers[0].records]
+
+
+def test_duplicates_dropped(summary_logger: logging.Logger, clock: list[float]) -> None:
+    """Похожие исключения в течение интервала отбрасываются, записи без исключений пропускаются"""
+    dedup_filter: ExceptionDeduplicationFilter = ExceptionDeduplicationFilter(60, logger=summary_logger)
+
+    assert dedup_filter.filter(_error_record())
+    assert [dedup_filter.filter(_error_record()) for _ in range(5)] == [False] * 5
+    assert dedup_filter.filter(_other_location_record())
+    assert dedup_filter.filter(_error_record(KeyError))
+    assert dedup_filter.filter(logging.LogRecord("test", logging.INFO, __file__, 1, "info", None, None))
+
+    clock[0] += 30
+    assert not dedup_filter.filter(_error_record())
+    assert not _suppressed(summary_logger)
+
+    dedup_filter.close()
+
+
+def test_summary_after_interval(summary_logger: logging.Logger, clock: list[float]) -> None:
+    """После окончания интервала количество отброшенных записей пишется одной записью"""
+    dedup_filter: ExceptionDeduplicationFilter = ExceptionDeduplicationFilter(60, logger=summary_logger)
+
+    for _ in range(50):
+        dedup_filter.filter(_error_record())
+
+    dedup_filter.flush()
+    assert not _suppressed(summary_logger)
+
+    clock[0] += 61
+    dedup_filter.flush()
+    dedup_filter.flush()
+
+    summary: logging.LogRecord = summary_logger.handlers[0].records[0]
+    assert _suppressed(summary_logger) == [49]
+    assert summary.levelno == logging.WARNING
+    assert "test_log_filters.py:" in summary.exception_location
+
+    # Новый интервал начинается с полной записи
+    assert dedup_filter.filter(_error_record())
+
+    dedup_filter.close()
+
+
+def test_close_writes_summary(summary_logger: logging.Logger) -> None:
+    """При закрытии количество отброшенных записей пишется независимо от интервала"""
+    dedup_filter: ExceptionDeduplicationFilter = ExceptionDeduplicationFilter(60, logger=summary_logger)
+
+    for _ in range(3):
+        dedup_filter.filter(_error_record())
+    dedup_filter.filter(_other_location_record())
+    dedup_filter.close()
+
+    assert _suppressed(summary_logger) == [2]
+
+
+def test_evicted_fingerprint_summary(summary_logger: logging.Logger) -> None:
+    """При превышении max_fingerprints забытый отпечаток записывает количество отброшенных записей"""
+    dedup_filter: ExceptionDeduplicationFilter = ExceptionDeduplicationFilter(
+        60, max_fingerprints=1, logger=summary_logger
+    )
+
+    dedup_filter.filter(_error_record())
+    dedup_filter.filter(_error_record())
+    dedup_filter.filter(_error_record(KeyError))
+
+    assert _suppressed(summary_logger) == [1]
+
+    dedup_filter.close()
+
+
+def test_shared_between_handlers(summary_logger: logging.Logger) -> None:
+    """Запись учитывается один раз, если фильтр добавлен в несколько обработчиков"""
+    dedup_filter: ExceptionDeduplicationFilter = ExceptionDeduplicationFilter(60, logger=summary_logger)
+    first: logging.LogRecord = _error_record()
+    second: logging.LogRecord = _error_record()
+
+    assert dedup_filter.filter(first) and dedup_filter.filter(first)
+    assert not dedup_filter.filter(second) and not dedup_filter.filter(second)
+
+    dedup_filter.close()
+
+    assert _suppressed(summary_logger) == [1]
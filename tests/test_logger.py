@@ -0,0 +1,134 @@
+"""Проверка обработчиков и форматтеров лога"""
+
+__author__: str = "Старков Е.П."
+
+import json
+import logging
+import queue
+import sys
+import uuid
+
+from dh_platform.consts.logger import LogQueueOverflow
+from dh_platform.utils import BoundedQueueHandler, JSONFormatter
+
+
+def _record(message: str, *args: object, level: int = logging.INFO) -> logging.LogRecord:
+    """
+    Запись лога
+
+    :param message: сообщение
+    :type message: str
+    :param args: аргументы сообщения
+    :type args: object
+    :param level: уровень записи
+    :type level: int
+    :return: запись лога
+    :rtype: logging.LogRecord
+    """
+    return logging.LogRecord("test", level, __file__, 1, message, args or None, None)
+
+
+def _drain(log_queue: queue.Queue) -> list[str]:
+    """
+    Извлечение всех записей из очереди
+
+    :param log_queue: очередь записей
+    :type log_queue: queue.Queue
+    :return: сообщения записей
+    :rtype: list[str]
+    """
+    messages: list[str] = []
+    while not log_queue.empty():
+        messages.append(log_queue.get_nowait().getMessage())
+
+    return messages
+
+
+def test_queue_handler_prepares_message() -> None:
+    """Сообщение собирается при передаче в очередь, последующие изменения аргументов не влияют на запись"""
+    log_queue: queue.Queue = queue.Queue()
+    handler: BoundedQueueHandler = BoundedQueueHandler(log_queue)
+    items: list[int] = [1]
+
+    handler.handle(_record("items %s", items))
+    items.append(2)
+
+    assert _drain(log_queue) == ["items [1]"]
+
+
+def test_queue_handler_drop_accounting() -> None:
+    """При переполнении записи отбрасываются, их количество пишется, когда в очереди появится место"""
+    log_queue: queue.Queue = queue.Queue(maxsize=2)
+    handler: BoundedQueueHandler = BoundedQueueHandler(log_queue, LogQueueOverflow.DROP)
+
+    for index in range(5):
+        handler.handle(_record(f"record {index}"))
+
+    assert handler.dropped == 3
+    assert _drain(log_queue) == ["record 0", "record 1"]
+
+    handler.handle(_record("record 5"))
+
+    assert handler.dropped == 0
+    assert _drain(log_queue) == ["Отброшено записей лога: 3", "record 5"]
+
+
+def test_queue_handler_keeps_count_when_report_dropped() -> None:
+    """Если для предупреждения нет места, количество отброшенных записей сохраняется"""
+    log_queue: queue.Queue = queue.Queue(maxsize=1)
+    handler: BoundedQueueHandler = BoundedQueueHandler(log_queue, LogQueueOverflow.DROP)
+
+    handler.handle(_record("record 0"))
+    handler.handle(_record("record 1"))
+    handler.handle(_record("record 2"))
+
+    assert handler.dropped == 2
+    assert _drain(log_queue) == ["record 0"]
+
+
+def test_json_formatter_fields() -> None:
+    """Стандартные поля и поля extra записываются в один JSON объект, extra не перезаписывает стандартные поля"""
+    record: logging.LogRecord = _record("Запрос %s", "завершен")
+    record.status_code = 200
+    record.request_uuid = uuid.UUID(int=1)
+    record.level = "подмена"
+
+    payload: dict = json.loads(JSONFormatter().format(record))
+
+    assert payload["message"] == "Запрос завершен"
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "test"
+    assert payload["location"].endswith(":1")
+    assert payload["status_code"] == 200
+    assert payload["request_uuid"] == str(uuid.UUID(int=1))
+    assert "args" not in payload and "msg" not in payload
+
+
+def test_json_formatter_unsafe_values() -> None:
+    """Значения, недопустимые в JSON, записываются строкой, а не прерывают запись"""
+    record: logging.LogRecord = _record("Значения")
+    record.ratio = float("nan")
+    record.raw = b"\xff"
+    record.mapping = {1: float("inf")}
+    record.custom = object()
+
+    payload: dict = json.loads(JSONFormatter().format(record))
+
+    assert payload["ratio"] == "nan"
+    assert payload["raw"] == "\\xff"
+    assert payload["mapping"] == {"1": "inf"}
+    assert payload["custom"].startswith("<object object")
+
+
+def test_json_formatter_exception() -> None:
+    """Трассировка исключения записывается в поле exception"""
+    try:
+        raise ValueError("Ошибка")
+    except ValueError:
+        record: logging.LogRecord = logging.LogRecord(
+            "test", logging.ERROR, __file__, 1, "Ошибка", None, sys.exc_info()
+        )
+
+    payload: dict = json.loads(JSONFormatter().format(record))
+
+    assert payload["exception"].endswith("ValueError: Ошибка")
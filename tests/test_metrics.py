@@ -0,0 +1,72 @@
+"""Проверка метрик в формате Prometheus"""
+
+__author__: str = "Старков Е.П."
+
+import pytest
+
+from dh_platform.utils import Counter, Gauge, Histogram, MetricsRegistry, log_buckets
+
+
+def test_log_buckets() -> None:
+    """Границы корзин растут с заданным множителем"""
+    assert log_buckets(0.001, 2, 4) == pytest.approx((0.001, 0.002, 0.004, 0.008))
+
+
+def test_counter_render() -> None:
+    """Счетчик выводится с описанием, типом и экранированными метками"""
+    counter: Counter = Counter("requests_total", "Количество запросов", ["route"])
+    counter.labels("/users").inc()
+    counter.labels("/users").inc(2)
+    counter.labels('/say"hi"\n').inc(0.5)
+
+    assert counter.render() == (
+        "# HELP requests_total Количество запросов\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{route="/users"} 3\n'
+        'requests_total{route="/say\\"hi\\"\\n"} 0.5\n'
+    )
+
+
+def test_gauge_render_function() -> None:
+    """Показатель с функцией вычисляется в момент выгрузки"""
+    gauge: Gauge = Gauge("pool_size", "Размер пула")
+    gauge.labels().set_function(lambda: 7)
+
+    assert gauge.render().endswith("pool_size 7\n")
+
+
+def test_histogram_render() -> None:
+    """Корзины гистограммы накопительные, последняя - +Inf"""
+    histogram: Histogram = Histogram("latency_seconds", "Время обработки", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.labels("/users").observe(value)
+
+    assert histogram.render().splitlines()[2:] == [
+        'latency_seconds_bucket{route="/users",le="0.1"} 2',
+        'latency_seconds_bucket{route="/users",le="1"} 3',
+        'latency_seconds_bucket{route="/users",le="+Inf"} 4',
+        'latency_seconds_sum{route="/users"} 2.65',
+        'latency_seconds_count{route="/users"} 4',
+    ]
+
+
+def test_labels_count_mismatch() -> None:
+    """Набор меток должен совпадать с labelnames"""
+    with pytest.raises(ValueError):
+        Counter("errors_total", "Количество ошибок", ["route"]).labels()
+
+
+def test_registry_returns_registered_metric() -> None:
+    """Повторная регистрация возвращает уже зарегистрированную метрику, выгрузка содержит все метрики"""
+    registry: MetricsRegistry = MetricsRegistry()
+    counter: Counter = registry.register(Counter("hits_total", "Попадания"))
+
+    assert registry.register(Counter("hits_total", "Попадания")) is counter
+
+    registry.register(Gauge("in_flight", "Запросов в обработке")).labels().inc()
+    counter.inc()
+
+    assert registry.render() == (
+        "# HELP hits_total Попадания\n# TYPE hits_total counter\nhits_total 1\n"
+        "# HELP in_flight Запросов в обработке\n# TYPE in_flight gauge\nin_flight 1\n"
+    )
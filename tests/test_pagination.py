@@ -0,0 +1,102 @@
+"""Проверка постраничной навигации по курсору"""
+
+__author__: str = "Старков Е.П."
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import DateTime, Numeric, Select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Mapped, mapped_column
+
+from dh_platform.consts import MAX_NAV_LIMIT
+from dh_platform.entities.models import BaseModel
+from dh_platform.excerptions import ValidationException
+from dh_platform.source.database import KeysetPaginator
+from dh_platform.utils import decode_cursor, encode_cursor
+
+
+class PaginationItem(BaseModel):
+    """Модель для проверки навигации"""
+
+    __tablename__ = "pagination_item"
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    price: Mapped[Decimal] = mapped_column(Numeric(12, 2))
+
+
+def _params(statement: Select) -> dict:
+    """
+    Параметры запроса, скомпилированного для PostgreSQL
+
+    :param statement: запрос
+    :type statement: Select
+    :return: параметры запроса
+    :rtype: dict
+    """
+    return statement.compile(dialect=postgresql.dialect()).params
+
+
+def test_cursor_round_trip() -> None:
+    """Курсор декодируется в исходные значения"""
+    values: list = ["n", 10, "text", None, 1.5]
+    assert decode_cursor(encode_cursor(values)) == values
+
+
+@pytest.mark.parametrize("cursor", ["!!!", "eyJhIjoxfQ", "bm90IGpzb24"])
+def test_decode_cursor_rejects_invalid(cursor: str) -> None:
+    """Поврежденный курсор или курсор не со списком значений отклоняется"""
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_build_statement_without_cursor() -> None:
+    """Первая страница: без условия, на одну запись больше limit"""
+    statement: Select = KeysetPaginator(PaginationItem).build_statement(limit=10)
+
+    assert statement.whereclause is None
+    assert _params(statement) == {"param_1": 11}
+
+
+@pytest.mark.parametrize(("limit", "expected"), [(0, 2), (-5, 2), (10**6, MAX_NAV_LIMIT + 1)])
+def test_build_statement_clamps_limit(limit: int, expected: int) -> None:
+    """Размер страницы ограничивается диапазоном от 1 до MAX_NAV_LIMIT"""
+    statement: Select = KeysetPaginator(PaginationItem).build_statement(limit=limit)
+    assert _params(statement)["param_1"] == expected
+
+
+def test_build_statement_parses_column_types() -> None:
+    """Значения курсора приводятся к типам колонок сортировки"""
+    created_at: datetime = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    cursor: str = encode_cursor(["n", created_at, 7])
+
+    statement: Select = KeysetPaginator(PaginationItem, order_by="created_at").build_statement(cursor=cursor)
+
+    assert created_at in _params(statement).values()
+    assert 7 in _params(statement).values()
+    assert ">" in str(statement.whereclause)
+
+
+def test_build_statement_keeps_decimal_precision() -> None:
+    """Decimal в курсоре сохраняет точность"""
+    cursor: str = encode_cursor(["n", "12345678901.23", 1])
+
+    statement: Select = KeysetPaginator(PaginationItem, order_by="price").build_statement(cursor=cursor)
+
+    assert Decimal("12345678901.23") in _params(statement).values()
+
+
+def test_build_statement_previous_page() -> None:
+    """Курсор предыдущей страницы инвертирует сравнение и сортировку"""
+    statement: Select = KeysetPaginator(PaginationItem).build_statement(cursor=encode_cursor(["p", 5]))
+
+    assert "<" in str(statement.whereclause)
+    assert "DESC" in str(statement)
+
+
+@pytest.mark.parametrize("values", [["x", 1], ["n", 1, 2], ["n", "not a number"]])
+def test_build_statement_rejects_foreign_cursor(values: list) -> None:
+    """Курсор другой сортировки или с некорректными значениями отклоняется"""
+    with pytest.raises(ValidationException):
+        KeysetPaginator(PaginationItem).build_statement(cursor=encode_cursor(values))
@@ -0,0 +1,99 @@
+"""Проверка ограничения частоты запросов"""
+
+__author__: str = "Старков Е.П."
+
+from pathlib import Path
+
+import pytest
+
+from dh_platform.middleware import MemoryRateLimitStore, RateLimit, SharedMemoryRateLimitStore
+from dh_platform.middleware.rate_limit import RateLimitResult, _check, fcntl
+
+# 4 запроса за 2 секунды: интервал 0.5 секунды точно представим в float
+_LIMIT: RateLimit = RateLimit(4, 2)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("100/minute", RateLimit(100, 60)),
+        ("10/5second", RateLimit(10, 5)),
+        (" 3 / hours ", RateLimit(3, 3600)),
+    ],
+)
+def test_rate_limit_parse(value: str, expected: RateLimit) -> None:
+    """Лимит разбирается из строки"""
+    assert RateLimit.parse(value) == expected
+
+
+def test_rate_limit_parse_invalid() -> None:
+    """Некорректная строка лимита отклоняется"""
+    with pytest.raises(ValueError):
+        RateLimit.parse("100 per minute")
+
+
+def test_check_burst() -> None:
+    """Новый ключ может израсходовать весь лимит сразу, следующий запрос ждет один интервал"""
+    tat: float | None = None
+    remaining: list[int] = []
+
+    for _ in range(_LIMIT.requests):
+        result, tat = _check(tat, 0.0, _LIMIT)
+        assert result.allowed
+        remaining.append(result.remaining)
+
+    assert remaining == [3, 2, 1, 0]
+
+    result, denied_tat = _check(tat, 0.0, _LIMIT)
+    assert result == RateLimitResult(False, 0, 0.5)
+    # Отклоненный запрос не расходует лимит
+    assert denied_tat == tat
+
+    result, _ = _check(tat, 0.5, _LIMIT)
+    assert result == RateLimitResult(True, 0, 0.0)
+
+
+def test_check_recovers_after_idle() -> None:
+    """После простоя дольше периода лимит восстанавливается полностью, но не накапливается сверх него"""
+    _, tat = _check(None, 0.0, _LIMIT)
+    result, _ = _check(tat, 100.0, _LIMIT)
+
+    assert result == RateLimitResult(True, _LIMIT.requests - 1, 0.0)
+
+
+def test_memory_store() -> None:
+    """Лимиты считаются по ключам отдельно"""
+    store: MemoryRateLimitStore = MemoryRateLimitStore()
+    limit: RateLimit = RateLimit(2, 3600)
+
+    assert [store.hit("a", limit).allowed for _ in range(3)] == [True, True, False]
+    assert store.hit("b", limit).allowed
+    assert store.hit("a", limit).retry_after > 0
+
+
+def test_memory_store_evicts_least_recently_used() -> None:
+    """При превышении max_keys вытесняется давно не использованный ключ"""
+    store: MemoryRateLimitStore = MemoryRateLimitStore(max_keys=1)
+    limit: RateLimit = RateLimit(1, 3600)
+
+    assert store.hit("a", limit).allowed
+    assert store.hit("b", limit).allowed
+    assert store.hit("a", limit).allowed
+    assert not store.hit("a", limit).allowed
+
+
+@pytest.mark.skipif(fcntl is None, reason="fcntl недоступен")
+def test_shared_memory_store(tmp_path: Path) -> None:
+    """Состояние общего хранилища видно другим подключениям к тому же файлу"""
+    limit: RateLimit = RateLimit(2, 3600)
+    first: SharedMemoryRateLimitStore = SharedMemoryRateLimitStore(str(tmp_path / "limits"), slots=16)
+    second: SharedMemoryRateLimitStore = SharedMemoryRateLimitStore(str(tmp_path / "limits"), slots=16)
+
+    try:
+        assert first.hit("a", limit).allowed
+        assert second.hit("a", limit).allowed
+        assert not first.hit("a", limit).allowed
+        assert second.hit("b", limit).allowed
+    finally:
+        first.close()
+        second.close()
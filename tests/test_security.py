@@ -0,0 +1,106 @@
+"""Проверка пула потоков операций с паролями"""
+
+__author__: str = "Старков Е.П."
+
+import asyncio
+import threading
+
+import pytest
+
+from dh_platform.config import base_settings
+from dh_platform.excerptions import ServiceUnavailableException
+from dh_platform.utils.security import _PasswordHashExecutor, password_hash_rejected
+
+
+def _blocking(release: threading.Event, result: str) -> str:
+    """
+    Операция, занимающая поток до сигнала
+
+    :param release: сигнал завершения
+    :type release: threading.Event
+    :param result: результат операции
+    :type result: str
+    :return: результат операции
+    :rtype: str
+    """
+    release.wait(5)
+    return result
+
+
+async def _wait_pending(executor: _PasswordHashExecutor, pending: int) -> None:
+    """
+    Ожидание учета завершенных операций в потоке event loop
+
+    :param executor: пул потоков
+    :type executor: _PasswordHashExecutor
+    :param pending: ожидаемое количество операций в обработке и очереди
+    :type pending: int
+    """
+    for _ in range(100):
+        if executor._pending == pending:  # pylint: disable=protected-access
+            return
+        await asyncio.sleep(0.01)
+
+    raise AssertionError(f"Операций в обработке: {executor._pending}")  # pylint: disable=protected-access
+
+
+def test_run_returns_result() -> None:
+    """Результат операции возвращается из потока пула"""
+    executor: _PasswordHashExecutor = _PasswordHashExecutor()
+
+    async def run() -> str:
+        result: str = await executor.run("hash", str.upper, "password")
+        await _wait_pending(executor, 0)
+        return result
+
+    assert asyncio.run(run()) == "PASSWORD"
+
+
+def test_run_rejects_over_max_pending(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Операции сверх PASSWORD_HASH_MAX_PENDING отклоняются без постановки в очередь"""
+    monkeypatch.setattr(base_settings, "PASSWORD_HASH_MAX_PENDING", 2)
+    executor: _PasswordHashExecutor = _PasswordHashExecutor()
+    release: threading.Event = threading.Event()
+    rejected: float = password_hash_rejected.labels("verify").value
+
+    async def run() -> list[str]:
+        tasks: list[asyncio.Task] = [
+            asyncio.create_task(executor.run("verify", _blocking, release, str(index))) for index in range(2)
+        ]
+        await asyncio.sleep(0)
+
+        with pytest.raises(ServiceUnavailableException):
+            await executor.run("verify", _blocking, release, "rejected")
+
+        release.set()
+        results: list[str] = await asyncio.gather(*tasks)
+        await _wait_pending(executor, 0)
+
+        # Место освобождается после завершения операций
+        results.append(await executor.run("verify", _blocking, release, "2"))
+        return results
+
+    assert asyncio.run(run()) == ["0", "1", "2"]
+    assert password_hash_rejected.labels("verify").value == rejected + 1
+
+
+def test_cancelled_operation_keeps_slot() -> None:
+    """Отмена ожидания не освобождает место, пока операция выполняется в потоке"""
+    executor: _PasswordHashExecutor = _PasswordHashExecutor()
+    release: threading.Event = threading.Event()
+
+    async def run() -> None:
+        task: asyncio.Task = asyncio.create_task(executor.run("hash", _blocking, release, "hash"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        await asyncio.sleep(0.05)
+        assert executor._pending == 1  # pylint: disable=protected-access
+
+        release.set()
+        await _wait_pending(executor, 0)
+
+    asyncio.run(run())
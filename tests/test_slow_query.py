@@ -0,0 +1,40 @@
+"""Проверка нормализации SQL медленных запросов"""
+
+__author__: str = "Старков Е.П."
+
+import pytest
+
+from dh_platform.source.database.slow_query import normalize_sql, params_fingerprint
+
+
+@pytest.mark.parametrize(
+    ("statement", "expected"),
+    [
+        ("SELECT *\n  FROM users WHERE id = 10", "SELECT * FROM users WHERE id = ?"),
+        ("SELECT 1.5, 'it''s', 'a'", "SELECT ?, ?, ?"),
+        ("SELECT * FROM t2 WHERE c1 = $1", "SELECT * FROM t2 WHERE c1 = $1"),
+        ("UPDATE users SET name = %(name)s", "UPDATE users SET name = %(name)s"),
+    ],
+)
+def test_normalize_sql(statement: str, expected: str) -> None:
+    """Литералы заменяются на ?, имена и параметры запроса сохраняются"""
+    assert normalize_sql(statement) == expected
+
+
+def test_normalize_sql_groups_statements() -> None:
+    """Запросы, отличающиеся только литералами и пробелами, нормализуются одинаково"""
+    assert normalize_sql("SELECT * FROM users WHERE id = 1") == normalize_sql("SELECT *  FROM users\nWHERE id = 42")
+
+
+def test_normalize_sql_truncates() -> None:
+    """Длина нормализованного SQL ограничена"""
+    assert len(normalize_sql("SELECT " + "column_name, " * 1000)) == 2000
+
+
+def test_params_fingerprint() -> None:
+    """Отпечаток зависит от параметров и не содержит их значений"""
+    fingerprint: str = params_fingerprint({"password": "secret"})
+
+    assert fingerprint == params_fingerprint({"password": "secret"})
+    assert fingerprint != params_fingerprint({"password": "other"})
+    assert "secret" not in fingerprint